@@ -0,0 +1,119 @@
+"""Headless Monte Carlo entry point for the Hornet Field
+
+Estimates the probability of the traveler getting through the field without being stung.
+This entry point must not import pygame (nor anything from visualization).
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+from typing import Dict, List, Mapping, Sequence
+
+import numpy as np
+
+from simulation.arguments import add_simulation_arguments
+from simulation.monte_carlo import TrialResult, TrialSettings, report
+from simulation.sweep import SweepValue, describe, parse_sweep, run_sweep, sweep_points
+
+
+def _parse_arguments(argv: Sequence[str]) -> argparse.Namespace:  # pragma: no cover
+    parser = argparse.ArgumentParser(description="Hornet Field Monte Carlo batch runner")
+    add_simulation_arguments(parser)
+    parser.add_argument(
+        "--trial-count",
+        default=1000,
+        type=int,
+        help="Number of independent simulations (trials).",
+    )
+    parser.add_argument(
+        "--crossing-count",
+        default=1,
+        type=int,
+        help="Number of crossings the traveler makes in each trial.",
+    )
+    parser.add_argument(
+        "--max-iteration",
+        default=float("inf"),
+        type=float,
+        help="Maximum iteration count per trial, after which the trial is cut short.",
+    )
+    parser.add_argument(
+        "--confidence",
+        default=0.95,
+        type=float,
+        help="Confidence level of the reported intervals.",
+    )
+    parser.add_argument(
+        "--sweep",
+        default=[],
+        action="append",
+        type=str,
+        help=(
+            "Sweep an argument over values, e.g. hornet-count=100,200 or "
+            "hornet-velocity-range=-5:5,-2:2 (repeat for a cartesian product)."
+        ),
+    )
+    parser.add_argument(
+        "--world-count",
+        default=256,
+        type=int,
+        help="Number of trials stepped together in one batched simulation (1: no batching).",
+    )
+    parser.add_argument(
+        "--workers",
+        default=os.cpu_count() or 1,
+        type=int,
+        help="Number of worker processes (1 runs the trials in the main process).",
+    )
+    return parser.parse_args(argv)
+
+
+def _print_report(
+    points: Sequence[argparse.Namespace],
+    sweeps: Mapping[str, Sequence[SweepValue]],
+    results: Mapping[int, List[TrialResult]],
+    confidence: float,
+):  # pragma: no cover
+    for point_idx, point in enumerate(points):
+        if sweeps:
+            print(describe(point, sweeps))
+        point_results = sorted(results[point_idx], key=lambda result: result.seed)
+        for line in report(point_results, confidence):
+            print(line)
+
+
+def main(argv: Sequence[str]):
+    # pylint: disable=missing-function-docstring
+    args = _parse_arguments(argv)
+    logging.basicConfig(level=logging.WARNING, format="%(asctime)s - %(levelname)s - %(message)s")
+    logger = logging.getLogger(__name__)
+    logger.setLevel(logging.INFO)
+
+    if args.seed is None:
+        args.seed = int(np.random.SeedSequence().generate_state(1)[0])
+    logger.info("Trial i is seeded with %d + i", args.seed)
+
+    sweeps = dict(parse_sweep(spec) for spec in args.sweep)
+    points = sweep_points(args, sweeps)
+    total = len(points) * args.trial_count
+    logger.info("Starting %d trials on %d worker(s)", total, args.workers)
+    start = time.perf_counter()
+    results: Dict[int, List[TrialResult]] = {idx: [] for idx in range(len(points))}
+    seeds = range(args.seed, args.seed + args.trial_count)
+    settings = TrialSettings(args.crossing_count, args.max_iteration, args.world_count)
+    trials = run_sweep(points, seeds, settings, args.workers)
+    for done, (point_idx, result) in enumerate(trials, start=1):
+        results[point_idx].append(result)
+        if len(results[point_idx]) == args.trial_count:
+            logger.info("Done (%d / %d): %s", done, total, describe(points[point_idx], sweeps))
+    elapsed_s = time.perf_counter() - start
+    logger.info("Ended %d trials in %.2f s", total, elapsed_s)
+
+    _print_report(points, sweeps, results, args.confidence)
+    return os.EX_OK
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
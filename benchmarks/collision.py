@@ -0,0 +1,76 @@
+"""Benchmark of the traveler-vs-swarm collision query
+
+Compares the per-hornet Agent.does_collide loop against the batched Swarm.colliding query.
+
+    python3 -m benchmarks.collision
+"""
+
+import argparse
+import sys
+import timeit
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+from simulation.agents import Agent, Collider, Pose, Position, Velocity
+from simulation.swarm import Swarm
+
+
+def _loop_colliding(traveler: Agent, hornets: List[Agent]) -> List[int]:
+    return [idx for idx, hornet in enumerate(hornets) if traveler.does_collide(hornet)]
+
+
+def _parse_arguments(argv: Sequence[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Collision query benchmark")
+    parser.add_argument(
+        "--hornet-counts",
+        default=[1_000, 10_000, 100_000],
+        nargs="+",
+        type=int,
+        help="Hornet counts to benchmark.",
+    )
+    parser.add_argument(
+        "--repeat",
+        default=5,
+        type=int,
+        help="Number of timed repetitions (the best one is reported).",
+    )
+    return parser.parse_args(argv)
+
+
+def _benchmark(hornet_count: int, repeat: int, rng: np.random.Generator) -> Tuple[float, float]:
+    field_size = (2400, 1200)
+    traveler = Agent(Pose(Position(1200, 600)), Velocity(2, 0), Collider(20))
+    positions = rng.uniform((0, 0), field_size, size=(hornet_count, 2))
+    swarm = Swarm(positions, np.zeros((hornet_count, 2)), np.full(hornet_count, 5.0))
+    hornets = [
+        Agent(Pose(Position(*position)), Velocity(0, 0), Collider(5.0))
+        for position in positions.tolist()
+    ]
+    position = traveler.pose.position.as_list()
+    radius = traveler.collider.radius
+    assert _loop_colliding(traveler, hornets) == swarm.colliding(position, radius).tolist()
+
+    loop_s = min(timeit.repeat(lambda: _loop_colliding(traveler, hornets), number=1, repeat=repeat))
+    batched_s = min(
+        timeit.repeat(lambda: swarm.colliding(position, radius), number=10, repeat=repeat)
+    )
+    return loop_s, batched_s / 10
+
+
+def main(argv: Sequence[str]):
+    # pylint: disable=missing-function-docstring
+    args = _parse_arguments(argv)
+    rng = np.random.default_rng(0)
+    print(f"{'hornets':>10} {'loop (ms)':>12} {'batched (ms)':>14} {'speedup':>10}")
+    for hornet_count in args.hornet_counts:
+        loop_s, batched_s = _benchmark(hornet_count, args.repeat, rng)
+        print(
+            f"{hornet_count:>10} {1e3 * loop_s:>12.3f} {1e3 * batched_s:>14.3f}"
+            f" {loop_s / batched_s:>9.0f}x"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
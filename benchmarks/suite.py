@@ -0,0 +1,230 @@
+"""Benchmark suite of the simulation, collision, rendering and initialization paths
+
+Times Simulator.tick, Simulator.collision, Visualizer.tick (under the dummy SDL video driver)
+and Simulator.from_cli_arguments over a grid of hornet counts and field sizes, writes the
+results as JSON and can compare them to a baseline (a former output), flagging the cases that
+got slower than the threshold allows. The exit status is 1 when any case is flagged.
+
+    python3 -m benchmarks.suite --output baseline.json
+    python3 -m benchmarks.suite --baseline baseline.json --threshold 0.2
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import timeit
+from typing import Any, Callable, Dict, List, Mapping, Sequence, Tuple
+
+import numpy as np
+
+from simulation.arguments import add_simulation_arguments
+from simulation.simulator import COLLISION_INDEX_CHOICES, Simulator
+
+BENCHMARK_CHOICES = ["tick", "collision", "render", "init"]
+
+_Case = Tuple[str, int, Tuple[int, int]]  # benchmark, hornet count, field size
+
+
+def _field_size(text: str) -> Tuple[int, int]:
+    width, height = text.lower().split("x")
+    return int(width), int(height)
+
+
+def _parse_arguments(argv: Sequence[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Hornet Field benchmark suite")
+    parser.add_argument(
+        "--benchmarks",
+        default=BENCHMARK_CHOICES,
+        nargs="+",
+        choices=BENCHMARK_CHOICES,
+        help="Benchmarks to run.",
+    )
+    parser.add_argument(
+        "--hornet-counts",
+        default=[100, 1_000, 10_000, 100_000, 1_000_000],
+        nargs="+",
+        type=int,
+        help="Hornet counts to benchmark.",
+    )
+    parser.add_argument(
+        "--field-sizes",
+        default=[(800, 600), (2400, 1200)],
+        nargs="+",
+        type=_field_size,
+        help="Field sizes to benchmark, as WIDTHxHEIGHT.",
+    )
+    parser.add_argument(
+        "--collision-index",
+        default="grid",
+        choices=COLLISION_INDEX_CHOICES,
+        type=str,
+        help="Collision index of the simulators.",
+    )
+    parser.add_argument(
+        "--repeat",
+        default=5,
+        type=int,
+        help="Number of timed repetitions (the best one is reported).",
+    )
+    parser.add_argument(
+        "--output",
+        default=None,
+        type=str,
+        help="Write the results to this JSON file (they are printed either way).",
+    )
+    parser.add_argument(
+        "--baseline",
+        default=None,
+        type=str,
+        help="Compare the results to this JSON file, a former --output.",
+    )
+    parser.add_argument(
+        "--threshold",
+        default=0.2,
+        type=float,
+        help="Relative slowdown over the baseline above which a case is flagged.",
+    )
+    return parser.parse_args(argv)
+
+
+def _simulation_arguments(
+    hornet_count: int, field_size: Tuple[int, int], collision_index: str
+) -> argparse.Namespace:
+    parser = argparse.ArgumentParser()
+    add_simulation_arguments(parser)
+    args = parser.parse_args([])
+    args.hornet_count = hornet_count
+    args.field_size = field_size
+    args.collision_index = collision_index
+    args.seed = 0
+    # for the render benchmark; a zero frame rate does not throttle Visualizer.tick
+    args.field_color, args.hornet_color = "black", "yellow"
+    args.traveler_color, args.traveler_collision_color = "blue", "red"
+    args.frame_rate = 0
+    args.dirty_rects = False
+    args.heatmap_hornet_count = 100_000
+    return args
+
+
+def _timed_call(benchmark: str, args: argparse.Namespace) -> Callable[[], Any]:
+    if benchmark == "init":
+        return lambda: Simulator.from_cli_arguments(args)
+    simulator = Simulator.from_cli_arguments(args)
+    simulator.tick()
+    if benchmark == "tick":
+        return simulator.tick
+    if benchmark == "collision":
+        return simulator.collision
+    # imported here, so that the other benchmarks never load pygame
+    from visualization.visualizer import (  # pylint: disable=import-outside-toplevel
+        Visualizer,
+    )
+
+    visualizer = Visualizer.from_cli_arguments(args)
+    hud_texts = [f"Iteration: {simulator.iteration:>12}"]
+    return lambda: visualizer.tick(simulator, hud_texts)
+
+
+def _run_case(case: _Case, collision_index: str, repeat: int) -> Dict[str, Any]:
+    benchmark, hornet_count, field_size = case
+    call = _timed_call(benchmark, _simulation_arguments(hornet_count, field_size, collision_index))
+    timer = timeit.Timer(call)
+    number, _ = timer.autorange()  # calls per repetition, for repetitions of at least 0.2 s
+    seconds = np.array(timer.repeat(repeat=repeat, number=number)) / number
+    return {
+        "benchmark": benchmark,
+        "hornet_count": hornet_count,
+        "field_size": list(field_size),
+        "best_s": float(seconds.min()),
+        "median_s": float(np.median(seconds)),
+        "number": number,
+        "repeat": repeat,
+    }
+
+
+def _case_key(result: Mapping[str, Any]) -> str:
+    width, height = result["field_size"]
+    return f"{result['benchmark']}/{result['hornet_count']}/{width}x{height}"
+
+
+def compare(
+    results: Sequence[Mapping[str, Any]],
+    baseline: Sequence[Mapping[str, Any]],
+    threshold: float,
+) -> List[Dict[str, Any]]:
+    """Return, for the cases found in both results and baseline, the ratio of their best times
+    and whether the slowdown exceeds threshold (e.g. 0.2: more than 20% slower)"""
+    baseline_s = {_case_key(result): result["best_s"] for result in baseline}
+    comparisons = []
+    for result in results:
+        key = _case_key(result)
+        if key not in baseline_s:
+            continue
+        ratio = result["best_s"] / baseline_s[key]
+        comparisons.append({"case": key, "ratio": ratio, "slower": ratio > 1 + threshold})
+    return comparisons
+
+
+def _environment() -> Dict[str, Any]:
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def _run_cases(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    results = []
+    print(f"{'case':>32} {'best (ms)':>12} {'median (ms)':>12}", file=sys.stderr)
+    for benchmark in args.benchmarks:
+        for field_size in args.field_sizes:
+            for hornet_count in args.hornet_counts:
+                case = (benchmark, hornet_count, field_size)
+                result = _run_case(case, args.collision_index, args.repeat)
+                results.append(result)
+                print(
+                    f"{_case_key(result):>32} {1e3 * result['best_s']:>12.3f}"
+                    f" {1e3 * result['median_s']:>12.3f}",
+                    file=sys.stderr,
+                )
+    return results
+
+
+def _compare_to_baseline(
+    results: Sequence[Mapping[str, Any]], args: argparse.Namespace
+) -> List[Dict[str, Any]]:
+    with open(args.baseline, encoding="utf-8") as file:
+        baseline = json.load(file)["results"]
+    comparisons = compare(results, baseline, args.threshold)
+    for comparison in comparisons:
+        flag = "SLOWER" if comparison["slower"] else ""
+        print(f"{comparison['case']:>32} {comparison['ratio']:>11.2f}x {flag}", file=sys.stderr)
+    return comparisons
+
+
+def main(argv: Sequence[str]):
+    # pylint: disable=missing-function-docstring
+    args = _parse_arguments(argv)
+    os.environ["SDL_VIDEODRIVER"] = "dummy"
+    os.environ["SDL_AUDIODRIVER"] = "dummy"
+    os.environ["PYGAME_HIDE_SUPPORT_PROMPT"] = "1"  # keep stdout to the JSON report
+    results = _run_cases(args)
+    report: Dict[str, Any] = {"environment": _environment(), "results": results}
+    exit_status = 0
+    if args.baseline is not None:
+        report["comparison"] = _compare_to_baseline(results, args)
+        exit_status = int(any(comparison["slower"] for comparison in report["comparison"]))
+    text = json.dumps(report, indent=2)
+    if args.output is not None:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(text + "\n")
+    print(text)
+    return exit_status
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -5,24 +5,30 @@ import logging
 import os
 import shutil
 import sys
+import time
 from datetime import datetime
-from typing import Sequence
+from typing import TYPE_CHECKING, Optional, Sequence
 
+from simulation.arguments import add_simulation_arguments
+from simulation.checkpoint import CheckpointWriter, load_simulator
+from simulation.events import CollisionEventWriter
+from simulation.recorder import Recording, TrajectoryRecorder
 from simulation.simulator import Simulator
 from visualization.colors import available_colors
-from visualization.visualizer import Visualizer, pygame_quit
+from visualization.video import VIDEO_FORMATS, open_video
+
+# pygame (and the font discovery) is only loaded by the runs that display or save frames, so
+# headless runs start faster: the visualization modules that need it are imported on use.
+if TYPE_CHECKING:  # pragma: no cover
+    from visualization.frame_writer import FrameWriter
+    from visualization.visualizer import Visualizer
 
 COLOR_CHOICES = available_colors()
 
 
 def _parse_arguments(argv: Sequence[str]) -> argparse.Namespace:  # pragma: no cover
     parser = argparse.ArgumentParser(description="Hornet Field entry point")
-    parser.add_argument(
-        "--hornet-count",
-        type=int,
-        default=200,
-        help="Number of hornet agents in the field.",
-    )
+    add_simulation_arguments(parser)
     parser.add_argument(
         "--hornet-color",
         default="yellow",
@@ -30,19 +36,6 @@ def _parse_arguments(argv: Sequence[str]) -> argparse.Namespace:  # pragma: no c
         type=str,
         help="The color of hornet agent.",
     )
-    parser.add_argument(
-        "--hornet-collider-radius",
-        default=5.0,
-        type=float,
-        help="The radius of the collider of hornet agent.",
-    )
-    parser.add_argument(
-        "--hornet-velocity-range",
-        default=(-5.0, 5.0),
-        nargs=2,
-        type=float,
-        help="The range from which random velocity for hornet agent are drawn.",
-    )
     parser.add_argument(
         "--traveler-color",
         default="blue",
@@ -50,12 +43,6 @@ def _parse_arguments(argv: Sequence[str]) -> argparse.Namespace:  # pragma: no c
         type=str,
         help="The color of traveler agent.",
     )
-    parser.add_argument(
-        "--traveler-collider-radius",
-        default=20.0,
-        type=float,
-        help="The radius of the collider of traveler agent.",
-    )
     parser.add_argument(
         "--traveler-collision-color",
         default="red",
@@ -70,19 +57,23 @@ def _parse_arguments(argv: Sequence[str]) -> argparse.Namespace:  # pragma: no c
         type=str,
         help="The color of field (selected color will be lightened e.g. black -> gray).",
     )
-    parser.add_argument(
-        "--field-size",
-        default=(2400, 1200),
-        nargs=2,
-        type=int,
-        help="The size (width, height) of the field.",
-    )
     parser.add_argument(
         "--frame-rate",
         default=200,
         type=float,
         help="The frame rate (fps).",
     )
+    parser.add_argument(
+        "--dirty-rects",
+        action="store_true",
+        help="Only redraw and update the parts of the display that changed since the last frame.",
+    )
+    parser.add_argument(
+        "--heatmap-hornet-count",
+        default=100_000,
+        type=int,
+        help="Above this many hornets, draw their density heatmap, and only the colliding ones.",
+    )
     parser.add_argument(
         "--max-iteration",
         default=float("inf"),
@@ -92,13 +83,79 @@ def _parse_arguments(argv: Sequence[str]) -> argparse.Namespace:  # pragma: no c
     parser.add_argument(
         "--save-to-file",
         action="store_true",
-        help="Save frames as images.",
+        help="Save frames as images, or as a video (see --save-format).",
+    )
+    parser.add_argument(
+        "--save-format",
+        default="png",
+        choices=["png"] + VIDEO_FORMATS,
+        type=str,
+        help="png: one image per frame, gif or y4m: one video file streamed from the frames.",
     )
     parser.add_argument(
         "--output-dir",
         default="output",
         type=str,
-        help="Path to output directory (to save images.)",
+        help="Path to output directory (to save images or video.)",
+    )
+    parser.add_argument(
+        "--headless",
+        action="store_true",
+        help="Run the simulation at full speed without any display (no Visualizer).",
+    )
+    parser.add_argument(
+        "--render-every",
+        default=1,
+        type=int,
+        help="Number of simulation iterations per rendered (and saved) frame.",
+    )
+    parser.add_argument(
+        "--checkpoint-every",
+        default=0,
+        type=int,
+        help="Save a checkpoint every that many iterations (0: never).",
+    )
+    parser.add_argument(
+        "--checkpoint-dir",
+        default="checkpoints",
+        type=str,
+        help="Path to the directory where checkpoints are saved.",
+    )
+    parser.add_argument(
+        "--resume",
+        default=None,
+        type=str,
+        help="Resume from a checkpoint file (the simulation arguments are then ignored).",
+    )
+    parser.add_argument(
+        "--profile-every",
+        default=0,
+        type=int,
+        help=(
+            "Time the phases of the simulation and rendering loops, show their percentiles in "
+            "the HUD and log them every that many iterations (0: no timing)."
+        ),
+    )
+    parser.add_argument(
+        "--record",
+        default=None,
+        type=str,
+        help="Record the positions and collisions of every iteration to this directory.",
+    )
+    parser.add_argument(
+        "--collision-events",
+        default=None,
+        type=str,
+        help="Write every collision event (a pair entering or leaving a collision) to this .npy.",
+    )
+    parser.add_argument(
+        "--replay",
+        default=None,
+        type=str,
+        help=(
+            "Replay a recording directory instead of simulating "
+            "(space: pause, left / right arrows: step backward / forward, escape: quit)."
+        ),
     )
     return parser.parse_args(argv)
 
@@ -133,43 +190,264 @@ def _setup_logging() -> logging.Logger:  # pragma: no cover
     return logger
 
 
-def _hud_text(simulator: Simulator, visualizer: Visualizer, max_iteration: float) -> Sequence[str]:
-    return [
+def _hud_text(simulator: Simulator, time_ms: int, max_iteration: float) -> Sequence[str]:
+    hud_texts = [
         f"Iteration: {simulator.iteration:>{12}} / {max_iteration}",
-        f"Time (ms): {visualizer.time_ms:>{12}}",
+        f"Time (ms): {time_ms:>{12}}",
         f"Run count: {simulator.traveler_run_count:>{12}}",
         f"collision count: {simulator.collision_count:>{6}}",
+        f"colliding now: {len(simulator.collision_snapshot.colliding_idx):>{8}}",
     ]
+    if simulator.phase_timer is not None:
+        hud_texts += simulator.phase_timer.summary()
+    return hud_texts
 
 
-def main(argv: Sequence[str]):
-    # pylint: disable=missing-function-docstring
-    args = _parse_arguments(argv)
-    logger = _setup_logging()
+def _log_phase_timer(simulator: Simulator, args: argparse.Namespace):
+    if simulator.phase_timer is not None and simulator.iteration % args.profile_every == 0:
+        logger = logging.getLogger()
+        for line in simulator.phase_timer.summary():
+            logger.info("Iteration %d phase timing: %s", simulator.iteration, line)
 
-    if args.save_to_file:
-        if args.max_iteration == float("inf"):
-            error_message = "--max-iteration must be set if --save-to-file is true"
-            logger.error(error_message)
-            raise ValueError(error_message)
-        _prepare_output_dir(args.output_dir)
 
-    simulator = Simulator.from_cli_arguments(args)
-    visualizer = Visualizer.from_cli_arguments(args)
+def _save_checkpoint(
+    checkpoint_writer: Optional[CheckpointWriter],
+    simulator: Simulator,
+    args: argparse.Namespace,
+):
+    if checkpoint_writer is not None and simulator.iteration % args.checkpoint_every == 0:
+        file_name = f"checkpoint_{simulator.iteration:08}.hfc"
+        checkpoint_writer.submit(simulator, os.path.join(args.checkpoint_dir, file_name))
 
-    logger.info("Starting the simulation")
-    while True:
-        logger.debug("Iteration: %d", simulator.iteration)
+
+def _run_headless(
+    simulator: Simulator,
+    checkpoint_writer: Optional[CheckpointWriter],
+    args: argparse.Namespace,
+) -> Sequence[str]:
+    start = time.perf_counter()
+    while simulator.iteration < args.max_iteration:
         simulator.tick()
-        hud_texts = _hud_text(simulator, visualizer, args.max_iteration)
+        _save_checkpoint(checkpoint_writer, simulator, args)
+    time_ms = int(1000 * (time.perf_counter() - start))
+    return _hud_text(simulator, time_ms, args.max_iteration)
+
+
+def _run_visualized(
+    simulator: Simulator,
+    visualizer: "Visualizer",
+    frame_writer: Optional["FrameWriter"],
+    checkpoint_writer: Optional[CheckpointWriter],
+    args: argparse.Namespace,
+) -> Sequence[str]:
+    # pylint: disable=import-outside-toplevel
+    from visualization.visualizer import pygame_quit
+
+    logger = logging.getLogger()
+    while True:
+        for _ in range(args.render_every):
+            logger.debug("Iteration: %d", simulator.iteration)
+            simulator.tick()
+            _save_checkpoint(checkpoint_writer, simulator, args)
+            if simulator.iteration >= args.max_iteration:
+                break
+        hud_texts = _hud_text(simulator, visualizer.time_ms, args.max_iteration)
         visualizer.tick(simulator, hud_texts)
-        if args.save_to_file:
-            visualizer.save_to_file(
-                os.path.join(args.output_dir, f"frame_{simulator.iteration:05}.png")
-            )
+        if frame_writer is not None:
+            file_path = None
+            if args.save_format == "png":
+                file_path = os.path.join(args.output_dir, f"frame_{simulator.iteration:05}.png")
+            frame_writer.submit(visualizer.frame(), file_path)
         if pygame_quit() or simulator.iteration >= args.max_iteration:
             break
-    logger.info("Ending the simulation")
+    return hud_texts
+
+
+def _replay_hud_text(recording: Recording, idx: int, paused: bool) -> Sequence[str]:
+    frame = recording.frame(idx)
+    return [
+        f"Replay: {idx + 1:>{12}} / {len(recording)}{' (paused)' if paused else ''}",
+        f"Iteration: {frame.iteration:>{12}}",
+        f"collision count: {frame.collision_count:>{6}}",
+        f"colliding now: {len(frame.colliding_idx):>{8}}",
+    ]
+
+
+def _run_replay(
+    recording: Recording,
+    visualizer: "Visualizer",
+    frame_writer: Optional["FrameWriter"],
+    args: argparse.Namespace,
+) -> Sequence[str]:
+    # pylint: disable=import-outside-toplevel
+    from visualization.visualizer import replay_commands
+
+    idx, paused = 0, False
+    last_idx = int(min(len(recording), args.max_iteration)) - 1
+    while True:
+        hud_texts = _replay_hud_text(recording, idx, paused)
+        visualizer.replay_tick(recording.frame(idx), hud_texts)
+        if frame_writer is not None:
+            file_path = None
+            if args.save_format == "png":
+                file_path = os.path.join(args.output_dir, f"frame_{idx:05}.png")
+            frame_writer.submit(visualizer.frame(), file_path)
+        commands = replay_commands()
+        if "quit" in commands:
+            break
+        paused ^= commands.count("pause") % 2 == 1
+        step = args.render_every
+        if "backward" in commands or "forward" in commands:
+            step *= commands.count("forward") - commands.count("backward")
+        elif paused:
+            continue
+        elif idx == last_idx:
+            break
+        idx = min(max(idx + step, 0), last_idx)
+    return hud_texts
+
+
+def _frame_writer(args: argparse.Namespace) -> Optional["FrameWriter"]:
+    # pylint: disable=import-outside-toplevel
+    from visualization.frame_writer import FrameWriter
+
+    if not args.save_to_file:
+        return None
+    if args.save_format == "png":
+        return FrameWriter()
+    video_path = os.path.join(args.output_dir, f"hornet_field.{args.save_format}")
+    return FrameWriter(video=open_video(video_path, args.field_size, args.frame_rate))
+
+
+def _run(
+    simulator: Simulator,
+    checkpoint_writer: Optional[CheckpointWriter],
+    args: argparse.Namespace,
+) -> Sequence[str]:
+    # pylint: disable=import-outside-toplevel
+    if args.headless:
+        return _run_headless(simulator, checkpoint_writer, args)
+    from visualization.visualizer import Visualizer
+
+    visualizer = Visualizer.from_cli_arguments(args)
+    if simulator.phase_timer is not None:
+        visualizer.profile_phases(simulator.phase_timer)
+    frame_writer = _frame_writer(args)
+    try:
+        return _run_visualized(simulator, visualizer, frame_writer, checkpoint_writer, args)
+    finally:
+        if frame_writer is not None:
+            frame_writer.close()
+
+
+def _replay(args: argparse.Namespace) -> Sequence[str]:
+    # pylint: disable=import-outside-toplevel
+    from visualization.visualizer import Visualizer
+
+    recording = Recording(args.replay)
+    if len(recording) == 0:
+        logging.getLogger().warning("Nothing to replay: empty recording %s", args.replay)
+        return []
+    args.field_size = recording.field_size  # for the display and the video
+    visualizer = Visualizer.from_cli_arguments(args)
+    frame_writer = _frame_writer(args)
+    try:
+        return _run_replay(recording, visualizer, frame_writer, args)
+    finally:
+        if frame_writer is not None:
+            frame_writer.close()
+
+
+def _simulator(args: argparse.Namespace) -> Simulator:
+    if args.resume is None:
+        return Simulator.from_cli_arguments(args)
+    simulator = load_simulator(args.resume)
+    args.field_size = simulator.field_size  # for the display and the video
+    return simulator
+
+
+def _checkpoint_writer(args: argparse.Namespace) -> Optional[CheckpointWriter]:
+    if args.checkpoint_every == 0:
+        return None
+    os.makedirs(args.checkpoint_dir, exist_ok=True)
+    return CheckpointWriter()
+
+
+def _event_writer(simulator: Simulator, args: argparse.Namespace) -> Optional[CollisionEventWriter]:
+    if args.collision_events is None:
+        return None
+    event_writer = CollisionEventWriter(simulator.log_collision_events(), args.collision_events)
+    simulator.add_tick_listener(lambda _: event_writer.write())
+    return event_writer
+
+
+def _validate_arguments(args: argparse.Namespace, logger: logging.Logger):
+    bounded = args.max_iteration != float("inf")
+    checks = [
+        (args.render_every >= 1, "--render-every must be at least 1"),
+        (
+            not (args.headless and args.save_to_file),
+            "--save-to-file cannot be set if --headless is true",
+        ),
+        (
+            not (args.headless and args.replay is not None),
+            "--replay cannot be set if --headless is true",
+        ),
+        (
+            bounded or not (args.headless or (args.save_to_file and args.replay is None)),
+            "--max-iteration must be set if --save-to-file or --headless is true",
+        ),
+        (
+            args.frame_rate > 0 or not (args.save_to_file and args.save_format != "png"),
+            "--frame-rate must be positive to save a video",
+        ),
+        (args.checkpoint_every >= 0, "--checkpoint-every cannot be negative"),
+        (args.profile_every >= 0, "--profile-every cannot be negative"),
+    ]
+    for valid, error_message in checks:
+        if not valid:
+            logger.error(error_message)
+            raise ValueError(error_message)
+
+
+def _simulate(args: argparse.Namespace) -> Sequence[str]:
+    simulator = _simulator(args)
+    checkpoint_writer = _checkpoint_writer(args)
+    recorder = None if args.record is None else TrajectoryRecorder(args.record)
+    if recorder is not None:
+        recorder.open(simulator)  # a valid recording even if no tick is run
+        simulator.add_tick_listener(recorder.record)
+    event_writer = _event_writer(simulator, args)
+    if args.profile_every != 0:
+        simulator.profile_phases()
+        simulator.add_tick_listener(lambda ticked: _log_phase_timer(ticked, args))
+    try:
+        return _run(simulator, checkpoint_writer, args)
+    finally:
+        if checkpoint_writer is not None:
+            checkpoint_writer.close()
+        if recorder is not None:
+            recorder.close()
+        if event_writer is not None:
+            event_writer.close()
+
+
+def main(argv: Sequence[str]):
+    # pylint: disable=missing-function-docstring
+    args = _parse_arguments(argv)
+    logger = _setup_logging()
+    _validate_arguments(args, logger)
+    if args.save_to_file:
+        _prepare_output_dir(args.output_dir)
+
+    if args.replay is None:
+        logger.info("Starting the simulation")
+        hud_texts = _simulate(args)
+        logger.info("Ending the simulation")
+    else:
+        logger.info("Starting the replay")
+        hud_texts = _replay(args)
+        logger.info("Ending the replay")
 
     for hud_text in hud_texts:
         logger.info("Last HUD: %s", hud_text)
@@ -3,7 +3,7 @@
 # pylint: disable=missing-class-docstring
 import logging
 from dataclasses import dataclass
-from typing import Any, Tuple
+from typing import Any, Optional, Tuple
 
 import numpy as np
 
@@ -27,31 +27,64 @@ class Cartesian:
         return np.array(self.as_list())
 
 
+def _validate_size(size: Tuple[int, int]):
+    width, height = size
+    if width <= 0 or height <= 0:
+        error_message = f"Size must be positive value; got {size}"
+        logger.error(error_message)
+        raise ValueError(error_message)
+
+
+def _validate_range(_range: Tuple[float, float]):
+    _min, _max = _range
+    if _min >= _max:
+        error_message = f"Min must be less than max; got {_range}"
+        logger.error(error_message)
+        raise ValueError(error_message)
+
+
 @dataclass(eq=False)
 class Position(Cartesian):
     @staticmethod
-    def random_position(size: Tuple[int, int]) -> "Position":
+    def random_position(
+        size: Tuple[int, int], rng: Optional[np.random.Generator] = None
+    ) -> "Position":
         """Return a random position bound to [0, width] and [0, height]"""
+        return Position(*Position.random_positions(size, 1, rng)[0].tolist())
+
+    @staticmethod
+    def random_positions(
+        size: Tuple[int, int], count: int, rng: Optional[np.random.Generator] = None
+    ) -> np.ndarray:
+        """Return a (count, 2) float array of random integer positions, drawn in bulk"""
+        _validate_size(size)
+        rng = np.random.default_rng() if rng is None else rng
         width, height = size
-        if width <= 0 or height <= 0:
-            error_message = f"Size must be positive value; got {size}"
-            logger.error(error_message)
-            raise ValueError(error_message)
-        return Position(np.random.randint(0, width), np.random.randint(0, height))
+        positions = np.empty((count, 2))
+        # scalar bounds per column are much faster than array bounds for integers()
+        positions[:, 0] = rng.integers(0, width, count)
+        positions[:, 1] = rng.integers(0, height, count)
+        return positions
 
 
 @dataclass
 class Velocity(Cartesian):
     @staticmethod
-    def random_velocity(_range: Tuple[float, float]) -> "Velocity":
+    def random_velocity(
+        _range: Tuple[float, float], rng: Optional[np.random.Generator] = None
+    ) -> "Velocity":
         """Return a random velocity bound to _range = [_min, _max]"""
+        return Velocity(*Velocity.random_velocities(_range, 1, rng)[0].tolist())
+
+    @staticmethod
+    def random_velocities(
+        _range: Tuple[float, float], count: int, rng: Optional[np.random.Generator] = None
+    ) -> np.ndarray:
+        """Return a (count, 2) array of random velocities, drawn in one call"""
+        _validate_range(_range)
+        rng = np.random.default_rng() if rng is None else rng
         _min, _max = _range
-        if _min >= _max:
-            error_message = f"Min must be less than max; got {_range}"
-            logger.error(error_message)
-            raise ValueError(error_message)
-        interval = _max - _min
-        return Velocity(np.random.rand() * interval + _min, np.random.rand() * interval + _min)
+        return rng.random((count, 2)) * (_max - _min) + _min
 
 
 @dataclass
@@ -0,0 +1,90 @@
+"""Command line arguments shared by the entry points that build a Simulator"""
+
+import argparse
+
+from simulation.simulator import COLLISION_INDEX_CHOICES
+from simulation.traveler_policy import TRAVELER_POLICY_CHOICES
+
+
+def add_simulation_arguments(parser: argparse.ArgumentParser):
+    """Add the arguments consumed by Simulator.from_cli_arguments to parser"""
+    parser.add_argument(
+        "--hornet-count",
+        type=int,
+        default=200,
+        help="Number of hornet agents in the field.",
+    )
+    parser.add_argument(
+        "--hornet-collider-radius",
+        default=5.0,
+        type=float,
+        help="The radius of the collider of hornet agent.",
+    )
+    parser.add_argument(
+        "--hornet-velocity-range",
+        default=(-5.0, 5.0),
+        nargs=2,
+        type=float,
+        help="The range from which random velocity for hornet agent are drawn.",
+    )
+    parser.add_argument(
+        "--hornet-interaction",
+        action="store_true",
+        help="Hornets steer by their neighbors (separation, alignment) and toward travelers.",
+    )
+    parser.add_argument(
+        "--hornet-sensing-radius",
+        default=20.0,
+        type=float,
+        help="The distance up to which hornets sense other hornets and travelers.",
+    )
+    parser.add_argument(
+        "--collision-index",
+        default="brute-force",
+        choices=COLLISION_INDEX_CHOICES,
+        type=str,
+        help="How hornets near the traveler are found (grid: uniform grid spatial hash).",
+    )
+    parser.add_argument(
+        "--swept-collisions",
+        action="store_true",
+        help="Also detect hornets that touch a traveler between two ticks (e.g. fast hornets).",
+    )
+    parser.add_argument(
+        "--traveler-count",
+        default=1,
+        type=int,
+        help="Number of travelers crossing the field together (spread along the left wall).",
+    )
+    parser.add_argument(
+        "--traveler-policy",
+        default="straight",
+        choices=TRAVELER_POLICY_CHOICES,
+        type=str,
+        help="How travelers move (planner: steer through the least crowded corridor ahead).",
+    )
+    parser.add_argument(
+        "--planner-cell-size",
+        default=50.0,
+        type=float,
+        help="The cell size of the hornet density grid of the planner traveler policy.",
+    )
+    parser.add_argument(
+        "--traveler-collider-radius",
+        default=20.0,
+        type=float,
+        help="The radius of the collider of traveler agent.",
+    )
+    parser.add_argument(
+        "--field-size",
+        default=(2400, 1200),
+        nargs=2,
+        type=int,
+        help="The size (width, height) of the field.",
+    )
+    parser.add_argument(
+        "--seed",
+        default=None,
+        type=int,
+        help="Seed of the random number generator (by default, runs are not reproducible).",
+    )
@@ -0,0 +1,174 @@
+"""K independent hornet fields stepped together in array operations"""
+
+import logging
+from typing import Sequence
+
+import numpy as np
+
+from simulation.simulator import Simulator
+from simulation.traveler_policy import StraightPolicy
+
+logger = logging.getLogger(__name__)
+
+
+class BatchedSimulator:
+    """K independent worlds of N hornets and one traveler each, held along a leading axis
+
+    Hornet positions and velocities are (K, N, 2) arrays and hornet radii a (K, N) array,
+    traveler positions and velocities are (K, 2) arrays and traveler radii a (K,) array.
+    One tick advances every world exactly as Simulator.tick would advance each of them."""
+
+    # pylint: disable=missing-function-docstring
+    # pylint: disable=too-many-instance-attributes
+    # pylint: disable=too-many-arguments
+    # pylint: disable=too-many-positional-arguments
+    def __init__(
+        self,
+        traveler_positions: np.ndarray,
+        traveler_velocities: np.ndarray,
+        traveler_radii: np.ndarray,
+        hornet_positions: np.ndarray,
+        hornet_velocities: np.ndarray,
+        hornet_radii: np.ndarray,
+        field_size: Sequence[int],
+    ):
+        self._traveler_positions = np.array(traveler_positions, dtype=float).reshape(-1, 2)
+        self._traveler_velocities = np.array(traveler_velocities, dtype=float).reshape(-1, 2)
+        self._traveler_radii = np.array(traveler_radii, dtype=float).reshape(-1)
+        world_count = self._traveler_positions.shape[0]
+        self._hornet_positions = np.array(hornet_positions, dtype=float).reshape(
+            (world_count, -1, 2)
+        )
+        self._hornet_velocities = np.array(hornet_velocities, dtype=float).reshape(
+            self._hornet_positions.shape
+        )
+        self._hornet_radii = np.array(hornet_radii, dtype=float).reshape(
+            self._hornet_positions.shape[:2]
+        )
+        if (
+            self._traveler_velocities.shape[0] != world_count
+            or self._traveler_radii.shape[0] != world_count
+        ):
+            error_message = "Traveler arrays must have the same world count"
+            logger.error(error_message)
+            raise ValueError(error_message)
+        if (self._traveler_radii < 0).any() or (self._hornet_radii < 0).any():
+            error_message = "Collider radius cannot be negative"
+            logger.error(error_message)
+            raise ValueError(error_message)
+        self._field_size = np.asarray(field_size, dtype=float)
+        self._colliding = np.zeros(self._hornet_radii.shape, dtype=bool)
+        self._collision_count = np.zeros(world_count, dtype=int)
+        self._traveler_run_count = np.zeros(world_count, dtype=int)
+        self._iteration = 0
+
+        logger.info("Created batched simulator")
+        logger.info("Batched simulator has %d world(s)", world_count)
+        logger.info("Batched simulator has %d hornets(s) per world", self._hornet_radii.shape[1])
+
+    @staticmethod
+    def _bounce(positions: np.ndarray, velocities: np.ndarray, field_size: np.ndarray):
+        positions += velocities
+        outside = positions < 0
+        outside |= positions > field_size
+        np.negative(velocities, out=velocities, where=outside)
+        return outside
+
+    def tick(self):
+        outside = self._bounce(
+            self._traveler_positions, self._traveler_velocities, self._field_size
+        )
+        # like Simulator.tick, flipping a null velocity component is not a bounce
+        bounced = (outside & (self._traveler_velocities != 0)).any(axis=1)
+        self._traveler_run_count += bounced
+
+        former_colliding = self._colliding
+        self._bounce(self._hornet_positions, self._hornet_velocities, self._field_size)
+        self._update_collision_mask()
+        new_colliding = self._colliding & ~former_colliding
+        self._collision_count += new_colliding.sum(axis=1)
+        self._iteration += 1
+
+    def _update_collision_mask(self):
+        # same operations, in the same order, as Swarm.colliding so results are identical
+        delta = self._hornet_positions - self._traveler_positions[:, np.newaxis, :]
+        delta *= delta
+        squared_distances = delta[..., 0]
+        squared_distances += delta[..., 1]
+        reach = self._hornet_radii + self._traveler_radii[:, np.newaxis]
+        reach *= reach
+        self._colliding = squared_distances < reach
+
+    def collision(self) -> np.ndarray:
+        """Return a (K,) boolean array, True for the worlds where the traveler is in collision"""
+        self._update_collision_mask()
+        return np.logical_or.reduce(self._colliding, axis=1)
+
+    @property
+    def world_count(self) -> int:
+        return self._traveler_radii.shape[0]
+
+    @property
+    def iteration(self) -> int:
+        return self._iteration
+
+    @property
+    def collision_count(self) -> np.ndarray:
+        return self._collision_count
+
+    @property
+    def traveler_run_count(self) -> np.ndarray:
+        return self._traveler_run_count
+
+    @property
+    def colliding(self) -> np.ndarray:
+        return self._colliding
+
+    @property
+    def traveler_positions(self) -> np.ndarray:
+        return self._traveler_positions
+
+    @property
+    def hornet_positions(self) -> np.ndarray:
+        return self._hornet_positions
+
+    @staticmethod
+    def from_simulators(simulators: Sequence[Simulator]) -> "BatchedSimulator":
+        """Gather the current state of simulators (same field size and hornet count, a single
+        traveler each)"""
+        if len({tuple(simulator.field_size) for simulator in simulators}) > 1:
+            error_message = "Simulators must have the same field size"
+            logger.error(error_message)
+            raise ValueError(error_message)
+        if len({len(simulator.swarm) for simulator in simulators}) > 1:
+            error_message = "Simulators must have the same hornet count"
+            logger.error(error_message)
+            raise ValueError(error_message)
+        if any(len(simulator.travelers) != 1 for simulator in simulators):
+            error_message = "Batched simulation only supports a single traveler per simulator"
+            logger.error(error_message)
+            raise ValueError(error_message)
+        if any(simulator.interaction is not None for simulator in simulators):
+            error_message = "Batched simulation does not support hornet interaction"
+            logger.error(error_message)
+            raise ValueError(error_message)
+        if any(simulator.swept_collisions for simulator in simulators):
+            error_message = "Batched simulation does not support swept collisions"
+            logger.error(error_message)
+            raise ValueError(error_message)
+        if any(not isinstance(simulator.policy, StraightPolicy) for simulator in simulators):
+            error_message = "Batched simulation only supports travelers going straight"
+            logger.error(error_message)
+            raise ValueError(error_message)
+        travelers = [simulator.traveler for simulator in simulators]
+        return BatchedSimulator(
+            traveler_positions=np.array(
+                [traveler.pose.position.as_list() for traveler in travelers]
+            ),
+            traveler_velocities=np.array([traveler.velocity.as_list() for traveler in travelers]),
+            traveler_radii=np.array([traveler.collider.radius for traveler in travelers]),
+            hornet_positions=np.stack([simulator.swarm.positions for simulator in simulators]),
+            hornet_velocities=np.stack([simulator.swarm.velocities for simulator in simulators]),
+            hornet_radii=np.stack([simulator.swarm.radii for simulator in simulators]),
+            field_size=simulators[0].field_size,
+        )
@@ -0,0 +1,167 @@
+"""Simulation checkpoints: the full state of a Simulator in a compact binary file
+
+A checkpoint file holds an 8 byte magic, the length of the header (little-endian uint64), the
+header (UTF-8 JSON with the metadata and the dtype, shape and offset of each array) and then
+the raw arrays, each aligned on 64 bytes. Loading only parses the header: the arrays are
+memory-mapped copy-on-write, so pages are read when the simulation first touches them and the
+file is never modified. Arrays are stored bit for bit, so a resumed simulation continues
+exactly as the original one would have."""
+
+import json
+import logging
+import os
+import queue
+import threading
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+from simulation.simulator import Simulator
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"HFCKPT01"
+_ALIGNMENT = 64
+
+_State = Tuple[Dict[str, Any], Dict[str, np.ndarray]]  # as returned by Simulator.checkpoint
+
+
+def _aligned(offset: int) -> int:
+    return -(-offset // _ALIGNMENT) * _ALIGNMENT
+
+
+def write_checkpoint(file_path: str, metadata: Mapping[str, Any], arrays: Mapping[str, np.ndarray]):
+    """Write metadata (JSON values) and arrays to file_path
+
+    The file is written next to file_path and then renamed, so file_path is never left half
+    written."""
+    # (unlike ascontiguousarray, require keeps 0-d arrays as they are)
+    contiguous = {name: np.require(array, requirements="C") for name, array in arrays.items()}
+    offsets = {}
+    offset = 0  # from the first array
+    for name, array in contiguous.items():
+        offsets[name] = offset
+        offset += _aligned(array.nbytes)
+    layout = {
+        name: {"dtype": array.dtype.str, "shape": list(array.shape), "offset": offsets[name]}
+        for name, array in contiguous.items()
+    }
+    header = json.dumps({"metadata": metadata, "arrays": layout}).encode("utf-8")
+    data_start = _aligned(len(MAGIC) + 8 + len(header))
+    temporary_path = f"{file_path}.tmp"
+    with open(temporary_path, "wb") as file:
+        file.write(MAGIC)
+        file.write(len(header).to_bytes(8, "little"))
+        file.write(header)
+        for name, array in contiguous.items():
+            file.seek(data_start + offsets[name])
+            file.write(array.data)
+    os.replace(temporary_path, file_path)
+
+
+def read_checkpoint(file_path: str) -> _State:
+    """Return the (metadata, arrays) of a checkpoint file, arrays memory-mapped copy-on-write"""
+    with open(file_path, "rb") as file:
+        magic = file.read(len(MAGIC))
+        if magic != MAGIC:
+            error_message = f"Not a checkpoint file (or an unsupported version): {file_path}"
+            logger.error(error_message)
+            raise ValueError(error_message)
+        header_length = int.from_bytes(file.read(8), "little")
+        header = json.loads(file.read(header_length).decode("utf-8"))
+    data_start = _aligned(len(MAGIC) + 8 + header_length)
+    arrays: Dict[str, np.ndarray] = {}
+    for name, layout in header["arrays"].items():
+        dtype, shape = np.dtype(layout["dtype"]), tuple(layout["shape"])
+        if np.prod(shape) == 0:  # empty arrays cannot be mapped
+            arrays[name] = np.empty(shape, dtype=dtype)
+            continue
+        mapped = np.memmap(
+            file_path,
+            dtype=dtype,
+            mode="c",
+            offset=data_start + layout["offset"],
+            shape=int(np.prod(shape)),
+        )
+        # memmap keeps at least one dimension, scalars are read out
+        arrays[name] = mapped.reshape(shape) if shape else np.array(mapped[0])
+    return header["metadata"], arrays
+
+
+def save_simulator(simulator: Simulator, file_path: str):
+    """Write the full state of simulator to file_path"""
+    write_checkpoint(file_path, *simulator.checkpoint())
+
+
+def load_simulator(file_path: str) -> Simulator:
+    """Return the simulator saved to file_path, its hornet arrays memory-mapped"""
+    simulator = Simulator.from_checkpoint(*read_checkpoint(file_path))
+    logger.info("Resumed simulation at iteration %d from %s", simulator.iteration, file_path)
+    return simulator
+
+
+class CheckpointWriter:
+    """Save checkpoints of a simulator from a background thread
+
+    submit copies the state (a memory copy of the arrays) and returns; the file is written by
+    the thread, so the simulation loop only blocks when more than max_pending checkpoints
+    are waiting to be written."""
+
+    # pylint: disable=missing-function-docstring
+    def __init__(self, max_pending: int = 2):
+        if max_pending < 1:
+            error_message = f"max_pending must be positive; got {max_pending}"
+            logger.error(error_message)
+            raise ValueError(error_message)
+        self._queue: "queue.Queue[Optional[Tuple[str, _State]]]" = queue.Queue(max_pending)
+        self._lock = threading.Lock()
+        self._written_count = 0
+        self._errors: List[str] = []
+        self._thread = threading.Thread(target=self._drain, daemon=True)
+        self._thread.start()
+
+    def _drain(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            file_path, (metadata, arrays) = item
+            try:
+                write_checkpoint(file_path, metadata, arrays)
+            except Exception as error:  # pylint: disable=broad-exception-caught
+                # whatever the error, keep draining: submit would block forever otherwise
+                if not isinstance(error, (OSError, TypeError, ValueError)):
+                    logger.exception("Checkpoint writer failed to save %s", file_path)
+                with self._lock:
+                    self._errors.append(f"{file_path}: {error}")
+            else:
+                with self._lock:
+                    self._written_count += 1
+
+    def submit(self, simulator: Simulator, file_path: str):
+        """Queue the current state of simulator to be saved to file_path"""
+        self._queue.put((file_path, simulator.checkpoint()))
+
+    @property
+    def written_count(self) -> int:
+        with self._lock:
+            return self._written_count
+
+    @property
+    def errors(self) -> List[str]:
+        with self._lock:
+            return list(self._errors)
+
+    def close(self):
+        """Wait for all queued checkpoints to be written and report the outcome to the logger"""
+        self._queue.put(None)
+        self._thread.join()
+        logger.info("Checkpoint writer saved %d checkpoint(s)", self.written_count)
+        for error in self.errors:
+            logger.error("Checkpoint writer failed to save %s", error)
+
+    def __enter__(self) -> "CheckpointWriter":
+        return self
+
+    def __exit__(self, *_):
+        self.close()
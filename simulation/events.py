@@ -0,0 +1,114 @@
+"""Collision events: each traveler-hornet pair entering or leaving a collision, tick by tick
+
+Events are rows of a structured array (see COLLISION_EVENT_DTYPE), appended a tick at a time
+from the arrays of colliding pairs, so there is no Python object per event."""
+
+import logging
+
+import numpy as np
+
+from simulation.npy_appender import NpyAppender
+
+logger = logging.getLogger(__name__)
+
+COLLISION_EVENT_DTYPE = np.dtype(
+    [
+        ("iteration", np.int64),
+        ("hornet_idx", np.int64),
+        ("traveler_idx", np.int64),
+        ("position", np.float64, (2,)),  # of the hornet, at the end of the iteration
+        ("enter", np.bool_),  # False: the pair stopped colliding
+    ]
+)
+
+
+class CollisionEventLog:
+    """Append-only buffer of collision events
+
+    Rows are kept in a structured array that doubles its capacity when full; events returns a
+    read-only view of them and drain hands them over (e.g. to be written to disk in bulk)."""
+
+    # pylint: disable=missing-function-docstring
+    def __init__(self, capacity: int = 1024):
+        if capacity < 1:
+            error_message = f"Capacity must be positive; got {capacity}"
+            logger.error(error_message)
+            raise ValueError(error_message)
+        self._buffer = np.empty(capacity, dtype=COLLISION_EVENT_DTYPE)
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def events(self) -> np.ndarray:
+        """The events logged so far, oldest first, as a read-only structured array"""
+        events = self._buffer[: self._count]
+        events.setflags(write=False)
+        return events
+
+    def append(
+        self,
+        iteration: int,
+        keys: np.ndarray,
+        hornet_positions: np.ndarray,
+        enter: bool,
+    ):
+        """Log an event per traveler-hornet pair key (traveler idx * hornet count + hornet idx)"""
+        count = len(keys)
+        if count == 0:
+            return
+        if self._count + count > len(self._buffer):
+            capacity = max(2 * len(self._buffer), self._count + count)
+            buffer = np.empty(capacity, dtype=COLLISION_EVENT_DTYPE)
+            buffer[: self._count] = self._buffer[: self._count]
+            self._buffer = buffer
+        rows = self._buffer[self._count : self._count + count]
+        hornet_count = len(hornet_positions)
+        rows["iteration"] = iteration
+        rows["hornet_idx"] = keys % hornet_count
+        rows["traveler_idx"] = keys // hornet_count
+        rows["position"] = hornet_positions[rows["hornet_idx"]]
+        rows["enter"] = enter
+        self._count += count
+
+    def drain(self) -> np.ndarray:
+        """Return (a copy of) the events logged so far and empty the log"""
+        events = self._buffer[: self._count].copy()
+        self._count = 0
+        return events
+
+
+class CollisionEventWriter:
+    """Stream the events of a log to a .npy file, flushing them in bulk
+
+    write drains the log to the file once it holds flush_size events; close writes what is
+    left. The file holds a single structured array of COLLISION_EVENT_DTYPE."""
+
+    # pylint: disable=missing-function-docstring
+    def __init__(self, log: CollisionEventLog, file_path: str, flush_size: int = 65536):
+        self._log = log
+        self._flush_size = flush_size
+        self._file = NpyAppender(file_path, COLLISION_EVENT_DTYPE, ())
+        self._written_count = 0
+
+    @property
+    def written_count(self) -> int:
+        return self._written_count
+
+    def write(self, force: bool = False):
+        if len(self._log) >= self._flush_size or (force and len(self._log) != 0):
+            events = self._log.drain()
+            self._file.append(events)
+            self._written_count += len(events)
+
+    def close(self):
+        self.write(force=True)
+        self._file.close()
+        logger.info("Wrote %d collision event(s)", self._written_count)
+
+    def __enter__(self) -> "CollisionEventWriter":
+        return self
+
+    def __exit__(self, *_):
+        self.close()
@@ -0,0 +1,135 @@
+"""Hornet-hornet (and hornet-traveler) interaction: separation, alignment and attraction"""
+
+import logging
+from dataclasses import dataclass
+from typing import Sequence
+
+import numpy as np
+
+from simulation.spatial_hash import SpatialHash, split_coordinates
+from simulation.swarm import Swarm
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class InteractionConfig:
+    """Parameters of the hornets' steering
+
+    Hornets sense the hornets and travelers closer than sensing_radius. They steer away from
+    the hornets closer than separation_radius, toward the mean velocity of the sensed hornets
+    (alignment) and toward the nearest sensed traveler (attraction); speeds are then capped at
+    max_speed."""
+
+    sensing_radius: float
+    separation_radius: float
+    max_speed: float
+    separation_weight: float = 1.0
+    alignment_weight: float = 0.05
+    attraction_weight: float = 0.2
+
+    def __post_init__(self):
+        if self.sensing_radius <= 0 or self.max_speed <= 0:
+            error_message = (
+                "Sensing radius and max speed must be positive values; "
+                f"got {self.sensing_radius}, {self.max_speed}"
+            )
+            logger.error(error_message)
+            raise ValueError(error_message)
+        if not 0 <= self.separation_radius <= self.sensing_radius:
+            error_message = (
+                "Separation radius must be in [0, sensing radius]; " f"got {self.separation_radius}"
+            )
+            logger.error(error_message)
+            raise ValueError(error_message)
+
+
+class Interaction:
+    """Steer a swarm according to an InteractionConfig
+
+    Neighbors are found with a cell list (SpatialHash with cells of the sensing radius)
+    rebucketed every tick, so a tick costs O(N) for a bounded hornet density."""
+
+    # pylint: disable=too-few-public-methods
+    def __init__(self, field_size: Sequence[int], config: InteractionConfig):
+        self._config = config
+        self._spatial_hash = SpatialHash(field_size, config.sensing_radius)
+
+    @property
+    def config(self) -> InteractionConfig:
+        # pylint: disable=missing-function-docstring
+        return self._config
+
+    @property
+    def spatial_hash(self) -> SpatialHash:
+        # pylint: disable=missing-function-docstring
+        return self._spatial_hash
+
+    def steer(self, swarm: Swarm, traveler_positions: np.ndarray):
+        """Update the swarm velocities in place (positions are then moved by Swarm.update)
+
+        traveler_positions is a (M, 2) array."""
+        positions, velocities = swarm.positions, swarm.velocities
+        self._spatial_hash.update(positions)
+        # neighbors are reduced in cell order, where the points of a cell are contiguous
+        order = self._spatial_hash.order
+        x, y = split_coordinates(positions, order)
+        i, j = self._spatial_hash.sorted_pairs(x, y, self._config.sensing_radius)
+        steering = self._config.separation_weight * self._separation(x, y, i, j)
+        steering += self._config.alignment_weight * self._alignment(velocities[order], i, j)
+        velocities[order] += steering
+        self._attract(positions, velocities, np.asarray(traveler_positions, dtype=float))
+        self._cap_speed(velocities)
+
+    def _separation(self, x: np.ndarray, y: np.ndarray, i: np.ndarray, j: np.ndarray) -> np.ndarray:
+        # away from each close neighbor, inversely proportional to the distance
+        count = len(x)
+        separation = np.empty((count, 2))
+        delta_x = x[i] - x[j]
+        delta_y = y[i] - y[j]
+        squared_distances = delta_x * delta_x + delta_y * delta_y
+        close = squared_distances < self._config.separation_radius**2
+        close &= squared_distances > 0
+        # as in SpatialHash.sorted_pairs, the close pairs are taken by index rather than masked
+        close_idx = np.flatnonzero(close)
+        i, j = i.take(close_idx), j.take(close_idx)
+        inverse = 1 / squared_distances.take(close_idx)
+        for axis, delta in enumerate((delta_x.take(close_idx), delta_y.take(close_idx))):
+            delta *= inverse
+            # pairs are listed once: i is pushed by +delta and j by -delta
+            separation[:, axis] = np.bincount(i, weights=delta, minlength=count)
+            separation[:, axis] -= np.bincount(j, weights=delta, minlength=count)
+        return separation
+
+    @staticmethod
+    def _alignment(velocities: np.ndarray, i: np.ndarray, j: np.ndarray) -> np.ndarray:
+        # toward the mean velocity of the sensed hornets
+        count = len(velocities)
+        neighbor_counts = np.bincount(i, minlength=count) + np.bincount(j, minlength=count)
+        sensing = neighbor_counts != 0
+        alignment = np.zeros_like(velocities)
+        for axis, axis_velocities in enumerate(split_coordinates(velocities)):
+            velocity_sums = np.bincount(i, weights=axis_velocities[j], minlength=count)
+            velocity_sums += np.bincount(j, weights=axis_velocities[i], minlength=count)
+            alignment[sensing, axis] = velocity_sums[sensing] / neighbor_counts[sensing]
+        alignment[sensing] -= velocities[sensing]
+        return alignment
+
+    def _attract(self, positions: np.ndarray, velocities: np.ndarray, travelers: np.ndarray):
+        # toward the nearest sensed traveler (travelers are few, distances to all are cheap)
+        if len(travelers) == 0 or len(positions) == 0:
+            return
+        delta = travelers.reshape(1, -1, 2) - positions[:, np.newaxis, :]
+        squared_distances = np.einsum("nmk,nmk->nm", delta, delta)
+        nearest = squared_distances.argmin(axis=1)
+        rows = np.arange(len(positions))
+        sensed = squared_distances[rows, nearest] < self._config.sensing_radius**2
+        sensed &= squared_distances[rows, nearest] > 0
+        direction = delta[rows[sensed], nearest[sensed]]
+        direction /= np.sqrt(squared_distances[rows[sensed], nearest[sensed]])[:, np.newaxis]
+        velocities[sensed] += self._config.attraction_weight * direction
+
+    def _cap_speed(self, velocities: np.ndarray):
+        speeds = np.hypot(velocities[:, 0], velocities[:, 1])
+        fast = speeds > self._config.max_speed
+        velocities[fast] *= (self._config.max_speed / speeds[fast])[:, np.newaxis]
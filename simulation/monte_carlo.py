@@ -0,0 +1,213 @@
+"""Monte Carlo estimation of the traveler's chance of getting through the field"""
+
+# pylint: disable=missing-class-docstring
+import argparse
+import logging
+import statistics
+from dataclasses import dataclass
+from typing import Iterable, List, Sequence, Tuple
+
+import numpy as np
+
+from simulation.batched_simulator import BatchedSimulator
+from simulation.simulator import Simulator
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class TrialResult:
+    seed: int
+    requested_crossing_count: int
+    crossing_count: int  # completed crossings (may be less than requested if capped)
+    stung_crossing_count: int  # crossings during which at least one new collision occurred
+    collision_count: int
+    iteration: int
+
+    @property
+    def survived(self) -> bool:
+        """True if the traveler completed all its crossings without being stung
+
+        A trial cut short at max_iteration before the last crossing did not survive: its
+        traveler was not stung yet, but has not got through either."""
+        return self.crossing_count >= self.requested_crossing_count and self.collision_count == 0
+
+
+@dataclass(frozen=True)
+class TrialSettings:
+    crossing_count: int
+    max_iteration: float
+    world_count: int = 1  # trials stepped together by a BatchedSimulator (1: one Simulator each)
+
+
+@dataclass(frozen=True)
+class Estimate:
+    successes: int
+    total: int
+    low: float
+    high: float
+
+    @property
+    def probability(self) -> float:
+        """successes / total (nan if there was no sample)"""
+        return self.successes / self.total if self.total else float("nan")
+
+
+def _seeded_simulator(args: argparse.Namespace, seed: int) -> Simulator:
+    if args.traveler_count != 1:
+        error_message = f"Trials are run with a single traveler; got {args.traveler_count}"
+        logger.error(error_message)
+        raise ValueError(error_message)
+    return Simulator.from_cli_arguments(args, np.random.default_rng(seed))
+
+
+def _batchable(args: argparse.Namespace) -> bool:
+    # the batched kernel only models independent hornets, travelers going straight and
+    # collisions at the end of the ticks
+    return (
+        not args.hornet_interaction
+        and args.traveler_policy == "straight"
+        and not args.swept_collisions
+    )
+
+
+def run_trial(
+    args: argparse.Namespace, seed: int, crossing_count: int, max_iteration: float
+) -> TrialResult:
+    """Run a simulation until the traveler completes crossing_count crossings
+
+    A crossing ends when the traveler bounces off a wall, i.e. when traveler_run_count
+    increases. The run is cut short at max_iteration."""
+    simulator = _seeded_simulator(args, seed)
+    stung_crossing_count = 0
+    crossing_collision_count = 0
+    while simulator.traveler_run_count < crossing_count and simulator.iteration < max_iteration:
+        run_count = simulator.traveler_run_count
+        simulator.tick()
+        if simulator.traveler_run_count != run_count:
+            if simulator.collision_count != crossing_collision_count:
+                stung_crossing_count += 1
+            crossing_collision_count = simulator.collision_count
+    return TrialResult(
+        seed=seed,
+        requested_crossing_count=crossing_count,
+        crossing_count=simulator.traveler_run_count,
+        stung_crossing_count=stung_crossing_count,
+        collision_count=simulator.collision_count,
+        iteration=simulator.iteration,
+    )
+
+
+def run_batched_trials(
+    args: argparse.Namespace, seeds: Sequence[int], crossing_count: int, max_iteration: float
+) -> List[TrialResult]:
+    """Run one trial per seed, all worlds stepped together by a BatchedSimulator
+
+    Returns the same results as calling run_trial for each seed: every world starts from the
+    state run_trial would draw, and its result is recorded at the iteration its trial ends."""
+    simulator = BatchedSimulator.from_simulators([_seeded_simulator(args, seed) for seed in seeds])
+    world_count = simulator.world_count
+    stung_crossing_count = np.zeros(world_count, dtype=int)
+    crossing_collision_count = np.zeros(world_count, dtype=int)
+    crossings = np.zeros(world_count, dtype=int)
+    collisions = np.zeros(world_count, dtype=int)
+    iterations = np.zeros(world_count, dtype=int)
+    running = simulator.traveler_run_count < crossing_count
+    while running.any() and simulator.iteration < max_iteration:
+        run_count = simulator.traveler_run_count.copy()
+        simulator.tick()
+        crossed = running & (simulator.traveler_run_count != run_count)
+        stung_crossing_count += crossed & (simulator.collision_count != crossing_collision_count)
+        np.copyto(crossing_collision_count, simulator.collision_count, where=crossed)
+        running &= simulator.traveler_run_count < crossing_count
+        ended = crossed & ~running
+        np.copyto(crossings, simulator.traveler_run_count, where=ended)
+        np.copyto(collisions, simulator.collision_count, where=ended)
+        iterations[ended] = simulator.iteration
+    # trials cut short at max_iteration
+    np.copyto(crossings, simulator.traveler_run_count, where=running)
+    np.copyto(collisions, simulator.collision_count, where=running)
+    iterations[running] = simulator.iteration
+    return [
+        TrialResult(
+            seed=seed,
+            requested_crossing_count=crossing_count,
+            crossing_count=int(crossings[idx]),
+            stung_crossing_count=int(stung_crossing_count[idx]),
+            collision_count=int(collisions[idx]),
+            iteration=int(iterations[idx]),
+        )
+        for idx, seed in enumerate(seeds)
+    ]
+
+
+def run_trials(
+    args: argparse.Namespace, seeds: Sequence[int], settings: TrialSettings
+) -> List[TrialResult]:
+    """Run one trial per seed, settings.world_count trials at a time (one at a time if the
+    trials use an option batching does not support: hornet interaction, a traveler policy or
+    swept collisions)"""
+    if settings.world_count <= 1 or not _batchable(args):
+        return [
+            run_trial(args, seed, settings.crossing_count, settings.max_iteration) for seed in seeds
+        ]
+    results = []
+    for begin in range(0, len(seeds), settings.world_count):
+        results += run_batched_trials(
+            args,
+            seeds[begin : begin + settings.world_count],
+            settings.crossing_count,
+            settings.max_iteration,
+        )
+    return results
+
+
+def wilson_interval(successes: int, total: int, confidence: float) -> Tuple[float, float]:
+    """Return the Wilson score interval of a binomial proportion"""
+    if not 0 < confidence < 1:
+        error_message = f"Confidence must be in (0, 1); got {confidence}"
+        logger.error(error_message)
+        raise ValueError(error_message)
+    if total == 0:
+        return 0.0, 1.0
+    z = statistics.NormalDist().inv_cdf(0.5 + confidence / 2)
+    p = successes / total
+    denominator = 1 + z**2 / total
+    center = (p + z**2 / (2 * total)) / denominator
+    half_width = z * np.sqrt(p * (1 - p) / total + z**2 / (4 * total**2)) / denominator
+    return max(center - half_width, 0.0), min(center + half_width, 1.0)
+
+
+def estimate(successes: int, total: int, confidence: float) -> Estimate:
+    # pylint: disable=missing-function-docstring
+    return Estimate(successes, total, *wilson_interval(successes, total, confidence))
+
+
+def survival_estimate(results: Iterable[TrialResult], confidence: float) -> Estimate:
+    """Probability that the traveler completes all its crossings without being stung"""
+    results = list(results)
+    successes = sum(result.survived for result in results)
+    return estimate(successes, len(results), confidence)
+
+
+def crossing_estimate(results: Iterable[TrialResult], confidence: float) -> Estimate:
+    """Probability that a single crossing is completed without being stung"""
+    results = list(results)
+    total = sum(result.crossing_count for result in results)
+    successes = total - sum(result.stung_crossing_count for result in results)
+    return estimate(successes, total, confidence)
+
+
+def report(results: List[TrialResult], confidence: float) -> List[str]:
+    """Return the human readable summary lines of the trials"""
+    lines = [f"Trials: {len(results)}"]
+    for name, value in [
+        ("Survival", survival_estimate(results, confidence)),
+        ("Crossing", crossing_estimate(results, confidence)),
+    ]:
+        lines.append(
+            f"{name} probability: {value.probability:.4f} "
+            f"({100 * confidence:g}% CI: {value.low:.4f} - {value.high:.4f}, "
+            f"{value.successes} / {value.total})"
+        )
+    return lines
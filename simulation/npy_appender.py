@@ -0,0 +1,46 @@
+"""Write .npy files row by row, without holding the rows in memory"""
+
+from typing import BinaryIO, Tuple
+
+import numpy as np
+
+
+class NpyAppender:
+    """A .npy file of shape (count, *row_shape) that grows by appending rows
+
+    The header is padded to a fixed size so it can be rewritten in place with the row count."""
+
+    # pylint: disable=missing-function-docstring
+    def __init__(self, file_path: str, dtype: np.dtype, row_shape: Tuple[int, ...]):
+        self._dtype = np.dtype(dtype)
+        self._row_shape = row_shape
+        self._count = 0
+        # large enough for any row count
+        self._header_size = -(-(len(self._header_text(10**19)) + 11) // 64) * 64
+        self._file: BinaryIO = open(file_path, "wb")  # pylint: disable=consider-using-with
+        self._write_header()
+
+    def _header_text(self, count: int) -> bytes:
+        header = {
+            "descr": np.lib.format.dtype_to_descr(self._dtype),
+            "fortran_order": False,
+            "shape": (count,) + self._row_shape,
+        }
+        return repr(header).encode("latin1")
+
+    def _write_header(self):
+        header = self._header_text(self._count)
+        header += b" " * (self._header_size - 11 - len(header)) + b"\n"
+        self._file.write(b"\x93NUMPY\x01\x00" + len(header).to_bytes(2, "little") + header)
+
+    def append(self, rows: np.ndarray):
+        rows = np.ascontiguousarray(rows, dtype=self._dtype)
+        self._file.write(rows.data)
+        self._count += len(rows)
+
+    def close(self):
+        if self._file.closed:
+            return
+        self._file.seek(0)
+        self._write_header()
+        self._file.close()
@@ -0,0 +1,55 @@
+"""Per-phase timing of the simulation and rendering loops"""
+
+import time
+from collections import deque
+from typing import Deque, Dict, List, Sequence
+
+import numpy as np
+
+PERCENTILES = (50, 90, 99)
+
+
+class PhaseTimer:
+    """Time the consecutive phases of a loop, over a rolling window
+
+    start marks the beginning of the first phase and lap(phase) the end of a phase (and the
+    beginning of the next one); the durations of the latest window laps of each phase are kept.
+    Timers are opt-in: the loops only time their phases when given one, so they do not pay
+    for the clock reads otherwise."""
+
+    # pylint: disable=missing-function-docstring
+    def __init__(self, window: int = 500):
+        self._window = window
+        self._durations: Dict[str, Deque[float]] = {}
+        self._last = time.perf_counter()
+
+    def start(self):
+        self._last = time.perf_counter()
+
+    def lap(self, phase: str):
+        now = time.perf_counter()
+        durations = self._durations.get(phase)
+        if durations is None:
+            durations = self._durations[phase] = deque(maxlen=self._window)
+        durations.append(now - self._last)
+        self._last = now
+
+    @property
+    def phases(self) -> List[str]:
+        """The phases timed so far, in the order of their first lap"""
+        return list(self._durations)
+
+    def percentiles(self, percentiles: Sequence[float] = PERCENTILES) -> Dict[str, np.ndarray]:
+        """Return the percentiles of the durations (in ms) of each phase over the window"""
+        return {
+            phase: 1e3 * np.percentile(np.fromiter(durations, dtype=float), percentiles)
+            for phase, durations in self._durations.items()
+        }
+
+    def summary(self) -> List[str]:
+        """Return a table of the PERCENTILES of each phase, one line per phase"""
+        header = "".join(f"{f'p{percentile}':>8}" for percentile in PERCENTILES)
+        lines = [f"{'phase (ms)':<12}{header}"]
+        for phase, values in self.percentiles().items():
+            lines.append(f"{phase:<12}" + "".join(f"{value:>8.3f}" for value in values))
+        return lines
@@ -0,0 +1,156 @@
+"""Trajectory recording: positions and collisions of every tick, in memory-mappable .npy files
+
+A recording is a directory of .npy files, one per column, with one row per recorded tick:
+    iterations (T,), hornet_positions (T, N, 2), traveler_positions (T, M, 2),
+    colliding_travelers (T, M), new_collision_counts (T,) and the colliding hornet indices of
+    all ticks concatenated in colliding_idx, those of tick t being
+    colliding_idx[colliding_offsets[t]:colliding_offsets[t + 1]].
+The radii (hornet_radii (N,) and traveler_radii (M,)) and the field size (recording.json)
+are stored once. Rows are appended to the files as they come, and the .npy headers get the
+final row counts on close; a recording can then be opened with np.load(mmap_mode="r")."""
+
+import json
+import logging
+import os
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from simulation.npy_appender import NpyAppender
+from simulation.simulator import Simulator
+
+logger = logging.getLogger(__name__)
+
+_METADATA_FILE = "recording.json"
+
+
+class TrajectoryRecorder:
+    """Record a simulator, tick by tick (see Simulator.add_tick_listener)
+
+    Positions are stored as dtype (float32 by default, which halves the size of the
+    recording and is far below a pixel). Files are created in directory by open, or else on
+    the first record."""
+
+    # pylint: disable=missing-function-docstring
+    def __init__(self, directory: str, dtype: np.dtype = np.dtype(np.float32)):
+        self._directory = directory
+        self._dtype = np.dtype(dtype)
+        self._columns: Dict[str, NpyAppender] = {}
+        self._collision_offset = 0
+        self._frame_count = 0
+
+    @property
+    def frame_count(self) -> int:
+        return self._frame_count
+
+    def open(self, simulator: Simulator):
+        """Create the files of the recording of simulator, so that it is a valid (empty)
+        recording even if no tick is recorded"""
+        if self._columns:
+            return
+        os.makedirs(self._directory, exist_ok=True)
+        with open(os.path.join(self._directory, _METADATA_FILE), "w", encoding="utf-8") as file:
+            json.dump({"field_size": [int(size) for size in simulator.field_size]}, file)
+        np.save(os.path.join(self._directory, "hornet_radii.npy"), simulator.swarm.radii)
+        traveler_radii = [traveler.collider.radius for traveler in simulator.travelers]
+        np.save(os.path.join(self._directory, "traveler_radii.npy"), np.array(traveler_radii))
+        hornet_count, traveler_count = len(simulator.swarm), len(simulator.travelers)
+        columns: List[Tuple[str, type, Tuple[int, ...]]] = [
+            ("iterations", np.int64, ()),
+            ("hornet_positions", self._dtype.type, (hornet_count, 2)),
+            ("traveler_positions", self._dtype.type, (traveler_count, 2)),
+            ("colliding_travelers", np.bool_, (traveler_count,)),
+            ("new_collision_counts", np.int64, ()),
+            ("colliding_offsets", np.int64, ()),
+            ("colliding_idx", np.int64, ()),
+        ]
+        for name, dtype, row_shape in columns:
+            file_path = os.path.join(self._directory, f"{name}.npy")
+            self._columns[name] = NpyAppender(file_path, np.dtype(dtype), row_shape)
+        self._columns["colliding_offsets"].append(np.zeros(1))
+
+    def record(self, simulator: Simulator):
+        """Append the current state of simulator"""
+        self.open(simulator)
+        snapshot = simulator.collision_snapshot
+        self._collision_offset += len(snapshot.colliding_idx)
+        columns = self._columns
+        columns["iterations"].append(np.array([simulator.iteration]))
+        columns["hornet_positions"].append(simulator.swarm.positions[np.newaxis])
+        columns["traveler_positions"].append(simulator.traveler_positions()[np.newaxis])
+        columns["colliding_travelers"].append(snapshot.colliding_travelers[np.newaxis])
+        columns["new_collision_counts"].append(np.array([snapshot.new_collision_count]))
+        columns["colliding_offsets"].append(np.array([self._collision_offset]))
+        columns["colliding_idx"].append(snapshot.colliding_idx)
+        self._frame_count += 1
+
+    def close(self):
+        for column in self._columns.values():
+            column.close()
+        logger.info("Recorded %d frame(s) to %s", self._frame_count, self._directory)
+
+    def __enter__(self) -> "TrajectoryRecorder":
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+
+@dataclass(frozen=True)
+class RecordedFrame:
+    # pylint: disable=missing-class-docstring
+    # pylint: disable=too-many-instance-attributes
+    iteration: int
+    hornet_positions: np.ndarray
+    hornet_radii: np.ndarray
+    traveler_positions: np.ndarray
+    traveler_radii: np.ndarray
+    colliding_idx: np.ndarray
+    colliding_travelers: np.ndarray
+    collision_count: int  # since the start of the recording
+
+
+class Recording:
+    """A recording made by TrajectoryRecorder, memory-mapped (read-only)"""
+
+    # pylint: disable=missing-function-docstring
+    def __init__(self, directory: str):
+        with open(os.path.join(directory, _METADATA_FILE), encoding="utf-8") as file:
+            self._field_size: Sequence[int] = tuple(json.load(file)["field_size"])
+        self._columns = {
+            file_name[: -len(".npy")]: np.load(os.path.join(directory, file_name), mmap_mode="r")
+            for file_name in os.listdir(directory)
+            if file_name.endswith(".npy")
+        }
+        self._collision_counts: Optional[np.ndarray] = None  # cumulated on demand
+
+    def __len__(self) -> int:
+        return len(self._columns["iterations"])
+
+    @property
+    def field_size(self) -> Sequence[int]:
+        return self._field_size
+
+    def column(self, name: str) -> np.ndarray:
+        """Return a whole column (e.g. hornet_positions), memory-mapped"""
+        return self._columns[name]
+
+    def frame(self, idx: int) -> RecordedFrame:
+        if not 0 <= idx < len(self):
+            error_message = f"Frame index must be in [0, {len(self)}); got {idx}"
+            logger.error(error_message)
+            raise IndexError(error_message)
+        if self._collision_counts is None:
+            self._collision_counts = np.cumsum(self._columns["new_collision_counts"])
+        begin, end = self._columns["colliding_offsets"][idx : idx + 2]
+        return RecordedFrame(
+            iteration=int(self._columns["iterations"][idx]),
+            hornet_positions=self._columns["hornet_positions"][idx],
+            hornet_radii=self._columns["hornet_radii"],
+            traveler_positions=self._columns["traveler_positions"][idx],
+            traveler_radii=self._columns["traveler_radii"],
+            colliding_idx=self._columns["colliding_idx"][begin:end],
+            colliding_travelers=self._columns["colliding_travelers"][idx],
+            collision_count=int(self._collision_counts[idx]),
+        )
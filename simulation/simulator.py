@@ -1,55 +1,291 @@
 """Entry point for the Hornet Field"""
 
 import argparse
-import copy
 import logging
-from typing import List, Sequence
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
 
 from simulation.agents import Agent, Collider, Pose, Position, Velocity
+from simulation.events import CollisionEventLog
+from simulation.interaction import Interaction, InteractionConfig
+from simulation.profiling import PhaseTimer
+from simulation.spatial_hash import SpatialHash
+from simulation.swarm import Swarm
+from simulation.traveler_policy import (
+    DensityPlanner,
+    PlannerConfig,
+    StraightPolicy,
+    TravelerPolicy,
+)
 
 logger = logging.getLogger(__name__)
 
+COLLISION_INDEX_CHOICES = ["brute-force", "grid"]
+
+
+@dataclass(frozen=True)
+class CollisionSnapshot:
+    """Result of the latest collision pass of a simulator
+
+    colliding_idx are the (sorted, read-only) indices of the hornets in collision with any
+    traveler, colliding_travelers the (read-only) flags of the travelers in collision with any
+    hornet and new_collision_count the number of traveler-hornet pairs that were not colliding
+    at the previous tick (always 0 for a pass made by Simulator.collision rather than by tick).
+    With swept collisions, pairs that were in contact at any time during the tick count as
+    colliding, not only the pairs overlapping at its end."""
+
+    iteration: int
+    colliding_idx: np.ndarray
+    new_collision_count: int
+    colliding_travelers: np.ndarray
+
+    def __post_init__(self):
+        self.colliding_idx.setflags(write=False)
+        self.colliding_travelers.setflags(write=False)
+
+    @property
+    def collision(self) -> bool:
+        # pylint: disable=missing-function-docstring
+        return len(self.colliding_idx) != 0
+
 
 class Simulator:
     # pylint: disable=missing-class-docstring
     # pylint: disable=missing-function-docstring
-    def __init__(self, traveler: Agent, hornets: List[Agent], field_size: Sequence[int]):
-        self._traveler = traveler
-        self._hornets = hornets
+    # pylint: disable=too-many-instance-attributes
+    # pylint: disable=too-many-public-methods
+    # pylint: disable=too-many-arguments
+    # pylint: disable=too-many-positional-arguments
+    def __init__(
+        self,
+        traveler: Union[Agent, List[Agent]],
+        hornets: Union[List[Agent], Swarm],
+        field_size: Sequence[int],
+        collision_index: str = "brute-force",
+        interaction: Optional[InteractionConfig] = None,
+        policy: Optional[TravelerPolicy] = None,
+        swept_collisions: bool = False,
+    ):
+        # Hornet state lives in the swarm arrays; hornet agents given as a list are rebound to
+        # views of those arrays, so they keep reflecting the simulation as it progresses.
+        self._travelers = [traveler] if isinstance(traveler, Agent) else list(traveler)
+        if not self._travelers:
+            error_message = "Simulator needs at least one traveler"
+            logger.error(error_message)
+            raise ValueError(error_message)
+        self._hornets: Optional[List[Agent]] = None
+        if isinstance(hornets, Swarm):
+            self._swarm = hornets
+        else:
+            self._swarm = Swarm.from_agents(hornets)
+            self._swarm.bind(hornets)
+            self._hornets = hornets
         self._field_size = field_size
-        self._traveler_run_count = 0
-        self._colliding_hornets_idx: List[int] = []  # those in collision with traveler
-        self._collision_count = 0  # count of total [unique] hornet-traveler collision
+        traveler_count = len(self._travelers)
+        self._traveler_run_counts: np.ndarray = np.zeros(traveler_count, dtype=int)
+        # colliding traveler-hornet pairs, as sorted keys: traveler idx * hornet count + hornet idx
+        self._colliding_keys: np.ndarray = np.empty(0, dtype=int)
+        self._collision_counts: np.ndarray = np.zeros(
+            traveler_count, dtype=int
+        )  # unique pairs, per traveler
         self._iteration = 0
+        self._collision_index = collision_index
+        self._spatial_hash = self._make_spatial_hash(collision_index)
+        self._interaction = None if interaction is None else Interaction(field_size, interaction)
+        self._policy = StraightPolicy() if policy is None else policy
+        self._swept_collisions = swept_collisions
+        self._collision_pass_done = False
+        self._new_collision_count = 0  # at the latest collision pass
+        self._collision_snapshot: Optional[CollisionSnapshot] = None  # built on demand
+        self._tick_listeners: List[Callable[["Simulator"], None]] = []
+        self._collision_events: Optional[CollisionEventLog] = None
+        self._phase_timer: Optional[PhaseTimer] = None
 
         logger.info("Created simulator")
         logger.info("Simulator has a of size: %d x %d", *field_size)
-        logger.info("Simulator has %d traveler(s)", 1)
-        logger.info("Simulator has %d hornets(s)", len(hornets))
+        logger.info("Simulator has %d traveler(s)", traveler_count)
+        logger.info("Simulator has %d hornets(s)", len(self._swarm))
+        logger.info("Simulator uses %s collision index", collision_index)
+        logger.info("Simulator hornet interaction: %s", interaction)
+        logger.info("Simulator traveler policy: %s", type(self._policy).__name__)
+        logger.info("Simulator swept collisions: %s", swept_collisions)
+
+    def _make_spatial_hash(self, collision_index: str) -> Optional[SpatialHash]:
+        if collision_index not in COLLISION_INDEX_CHOICES:
+            error_message = (
+                f"Collision index must be one of {COLLISION_INDEX_CHOICES}; got {collision_index}"
+            )
+            logger.error(error_message)
+            raise ValueError(error_message)
+        if collision_index == "brute-force":
+            return None
+        # a hornet colliding with a traveler is at most one cell away from the traveler's cell
+        hornet_radius = self._swarm.radii.max(initial=0.0)
+        traveler_radius = max(traveler.collider.radius for traveler in self._travelers)
+        cell_size = max(traveler_radius + hornet_radius, 1.0)
+        return SpatialHash(self._field_size, cell_size)
 
     def tick(self):
-        former_velocity = copy.copy(self._traveler.velocity)
-        self._traveler.update(self._field_size)
-        bounced = former_velocity != self._traveler.velocity
-        if bounced:
-            self._traveler_run_count += 1
-
-        former_indices = set(self._colliding_hornets_idx)
-        for hornet in self._hornets:
-            hornet.update(self._field_size)
-        if self.collision():
-            new_colliding_idx = set(self._colliding_hornets_idx) - former_indices
-            self._collision_count += len(new_colliding_idx)
+        # phases are only timed with a timer (see profile_phases), which costs a clock read each
+        timer = self._phase_timer
+        if timer is not None:
+            timer.start()
+        self._policy.steer(self._travelers, self._swarm)
+        # for swept collisions: the travelers' motion over this tick, before they may bounce
+        traveler_motions = (
+            [(agent.pose.position.as_list(), agent.velocity.as_list()) for agent in self._travelers]
+            if self._swept_collisions
+            else []
+        )
+        if timer is not None:
+            timer.lap("steer")
+        self._move_travelers()
+        if timer is not None:
+            timer.lap("travelers")
+
+        former_keys = self._colliding_keys
+        if self._interaction is not None:
+            self._interaction.steer(self._swarm, self.traveler_positions())
+            if timer is not None:
+                timer.lap("interaction")
+        swept_keys = None
+        if self._swept_collisions:
+            swept_keys = self._swept_keys(traveler_motions)
+            if timer is not None:
+                timer.lap("swept")
+        self._swarm.update(self._field_size)
+        if timer is not None:
+            timer.lap("hornets")
+        self._update_collision_list()
+        if swept_keys is not None:
+            self._colliding_keys = np.union1d(self._colliding_keys, swept_keys)
         self._iteration += 1
+        self._count_new_collisions(former_keys)
+        self._collision_snapshot = None
+        if timer is not None:
+            timer.lap("collisions")
+        for listener in self._tick_listeners:
+            listener(self)
+        if timer is not None and self._tick_listeners:
+            timer.lap("listeners")
+
+    def _move_travelers(self):
+        for idx, traveler in enumerate(self._travelers):
+            former_velocity = traveler.velocity.as_list()
+            traveler.update(self._field_size)
+            if former_velocity != traveler.velocity.as_list():
+                self._traveler_run_counts[idx] += 1
 
-    def _update_collision_list(self):  # pragma: no cover
-        self._colliding_hornets_idx = [
-            idx for idx, hornet in enumerate(self._hornets) if self._traveler.does_collide(hornet)
+    def _count_new_collisions(self, former_keys: np.ndarray):
+        new_keys = self._colliding_keys
+        if len(new_keys) != 0 and len(former_keys) != 0:
+            new_keys = np.setdiff1d(new_keys, former_keys, assume_unique=True)
+        if len(new_keys) != 0:
+            self._collision_counts += np.bincount(
+                new_keys // len(self._swarm), minlength=len(self._travelers)
+            )
+        self._new_collision_count = len(new_keys)
+        if self._collision_events is not None:
+            self._log_collision_events(self._collision_events, former_keys, new_keys)
+
+    def _log_collision_events(
+        self, log: CollisionEventLog, former_keys: np.ndarray, new_keys: np.ndarray
+    ):
+        positions = self._swarm.positions
+        log.append(self._iteration, new_keys, positions, enter=True)
+        if len(former_keys) != 0:
+            exit_keys = np.setdiff1d(former_keys, self._colliding_keys, assume_unique=True)
+            log.append(self._iteration, exit_keys, positions, enter=False)
+
+    def log_collision_events(self, log: Optional[CollisionEventLog] = None) -> CollisionEventLog:
+        """Log the collision events of every following tick to log (a new one by default)"""
+        self._collision_events = CollisionEventLog() if log is None else log
+        return self._collision_events
+
+    @property
+    def collision_events(self) -> Optional[CollisionEventLog]:
+        """The log of collision events (see log_collision_events), if any"""
+        return self._collision_events
+
+    def profile_phases(self, timer: Optional[PhaseTimer] = None) -> PhaseTimer:
+        """Time the phases of every following tick with timer (a new one by default)"""
+        self._phase_timer = PhaseTimer() if timer is None else timer
+        return self._phase_timer
+
+    @property
+    def phase_timer(self) -> Optional[PhaseTimer]:
+        return self._phase_timer
+
+    def add_tick_listener(self, listener: Callable[["Simulator"], None]):
+        """Have listener called with the simulator at the end of every tick (e.g. to record it)"""
+        self._tick_listeners.append(listener)
+
+    def _update_collision_list(self):
+        positions = self.traveler_positions()
+        radii = np.array([traveler.collider.radius for traveler in self._travelers])
+        candidates = None
+        if self._spatial_hash is not None:
+            self._spatial_hash.update(self._swarm.positions)
+            hornet_radius = self._swarm.radii.max(initial=0.0)
+            queries = [
+                self._spatial_hash.query(position, radius + hornet_radius)
+                for position, radius in zip(positions.tolist(), radii.tolist())
+            ]
+            candidates = queries[0] if len(queries) == 1 else np.unique(np.concatenate(queries))
+        traveler_idx, hornet_idx = self._swarm.colliding_pairs(positions, radii, candidates)
+        self._colliding_keys = traveler_idx * len(self._swarm) + hornet_idx
+        self._collision_pass_done = True
+
+    def _swept_keys(self, traveler_motions: List[Tuple[List[float], List[float]]]) -> np.ndarray:
+        # keys of the pairs in contact at any time during the tick, not only at its end
+        keys = [
+            idx * len(self._swarm)
+            + np.flatnonzero(
+                self._swarm.time_to_contact(
+                    position, velocity, traveler.collider.radius, self._field_size, horizon=1
+                )
+                <= 1
+            )
+            for idx, (traveler, (position, velocity)) in enumerate(
+                zip(self._travelers, traveler_motions)
+            )
         ]
+        return np.concatenate(keys)
+
+    def _snapshot(self) -> CollisionSnapshot:
+        if len(self._travelers) == 1:  # keys are the hornet indices
+            # a view, which the snapshot makes read-only without freezing the simulator's keys
+            colliding_idx = self._colliding_keys.view()
+            colliding_travelers = np.array([len(colliding_idx) != 0])
+        else:
+            hornet_count = max(len(self._swarm), 1)
+            colliding_idx = np.unique(self._colliding_keys % hornet_count)
+            colliding_travelers = np.zeros(len(self._travelers), dtype=bool)
+            colliding_travelers[self._colliding_keys // hornet_count] = True
+        return CollisionSnapshot(
+            iteration=self._iteration,
+            colliding_idx=colliding_idx,
+            new_collision_count=self._new_collision_count,
+            colliding_travelers=colliding_travelers,
+        )
 
     def collision(self) -> bool:
+        """Recompute the collisions of the current state (e.g. after agents were moved by hand)"""
         self._update_collision_list()
-        return len(self._colliding_hornets_idx) != 0
+        self._new_collision_count = 0
+        self._collision_snapshot = None
+        return len(self._colliding_keys) != 0
+
+    @property
+    def collision_snapshot(self) -> CollisionSnapshot:
+        """Collisions as of the latest tick (or collision call), without recomputing them"""
+        if not self._collision_pass_done:
+            self.collision()
+        if self._collision_snapshot is None:
+            self._collision_snapshot = self._snapshot()
+        return self._collision_snapshot
 
     @property
     def iteration(self) -> int:
@@ -57,33 +293,184 @@ class Simulator:
 
     @property
     def collision_count(self) -> int:
-        return self._collision_count
+        """Total count of unique traveler-hornet collisions, over all travelers"""
+        return int(self._collision_counts.sum())
+
+    @property
+    def collision_counts(self) -> np.ndarray:
+        """Count of unique collisions with hornets, per traveler"""
+        return self._collision_counts
 
     @property
     def traveler_run_count(self) -> int:
-        return self._traveler_run_count
+        """Total count of runs (wall to wall), over all travelers"""
+        return int(self._traveler_run_counts.sum())
 
     @property
-    def traveler(self):
-        return self._traveler
+    def traveler_run_counts(self) -> np.ndarray:
+        return self._traveler_run_counts
 
     @property
-    def hornets(self):
-        return self._hornets
+    def traveler(self) -> Agent:
+        """The first traveler"""
+        return self._travelers[0]
+
+    @property
+    def travelers(self) -> List[Agent]:
+        return self._travelers
+
+    @property
+    def interaction(self) -> Optional[InteractionConfig]:
+        return None if self._interaction is None else self._interaction.config
+
+    @property
+    def swept_collisions(self) -> bool:
+        return self._swept_collisions
+
+    @property
+    def policy(self) -> TravelerPolicy:
+        return self._policy
+
+    def traveler_positions(self) -> np.ndarray:
+        """Return the (M, 2) array of the current positions of the M travelers"""
+        return np.array([traveler.pose.position.as_list() for traveler in self._travelers])
+
+    def _policy_metadata(self) -> Optional[Dict[str, Any]]:
+        if isinstance(self._policy, DensityPlanner):
+            return asdict(self._policy.config)
+        if isinstance(self._policy, StraightPolicy):
+            return None
+        error_message = f"Cannot checkpoint the traveler policy {type(self._policy).__name__}"
+        logger.error(error_message)
+        raise ValueError(error_message)
+
+    def checkpoint(self) -> Tuple[Dict[str, Any], Dict[str, np.ndarray]]:
+        """Return the full state as (metadata, arrays): JSON values and copies of the arrays
+
+        The cell order of the hornet interaction is part of the state: it sets the order in
+        which steering terms are summed, hence the last bits of the velocities."""
+        metadata = {
+            "field_size": [int(size) for size in self._field_size],
+            "collision_index": self._collision_index,
+            "interaction": None if self.interaction is None else asdict(self.interaction),
+            "planner": self._policy_metadata(),
+            "swept_collisions": self._swept_collisions,
+            "iteration": self._iteration,
+            "collision_pass_done": self._collision_pass_done,
+            "new_collision_count": self._new_collision_count,
+        }
+        arrays = {
+            "hornet_positions": self._swarm.positions.copy(),
+            "hornet_velocities": self._swarm.velocities.copy(),
+            "hornet_radii": self._swarm.radii.copy(),
+            "traveler_positions": self.traveler_positions(),
+            "traveler_velocities": np.array(
+                [traveler.velocity.as_list() for traveler in self._travelers]
+            ),
+            "traveler_radii": np.array([traveler.collider.radius for traveler in self._travelers]),
+            "traveler_run_counts": self._traveler_run_counts.copy(),
+            "collision_counts": self._collision_counts.copy(),
+            "colliding_keys": self._colliding_keys.copy(),
+        }
+        if self._interaction is not None:
+            arrays["interaction_cell_keys"] = self._interaction.spatial_hash.keys.copy()
+            arrays["interaction_cell_order"] = self._interaction.spatial_hash.order.copy()
+        return metadata, arrays
 
     @staticmethod
-    def from_cli_arguments(args: argparse.Namespace) -> "Simulator":
-        traveler = Agent(
-            Pose(Position(0, args.field_size[1] // 2)),
-            Velocity(2, 0),
-            Collider(args.traveler_collider_radius),
+    def from_checkpoint(metadata: Dict[str, Any], arrays: Dict[str, np.ndarray]) -> "Simulator":
+        """Rebuild a simulator from the output of checkpoint
+
+        The hornet arrays are used as given, without a copy (e.g. memory-mapped from a file)."""
+        # pylint: disable=protected-access
+        travelers = [
+            Agent(Pose(Position(*position)), Velocity(*velocity), Collider(radius))
+            for position, velocity, radius in zip(
+                arrays["traveler_positions"].tolist(),
+                arrays["traveler_velocities"].tolist(),
+                arrays["traveler_radii"].tolist(),
+            )
+        ]
+        field_size = tuple(metadata["field_size"])
+        interaction = metadata["interaction"]
+        planner = metadata["planner"]
+        simulator = Simulator(
+            travelers,
+            Swarm(arrays["hornet_positions"], arrays["hornet_velocities"], arrays["hornet_radii"]),
+            field_size,
+            collision_index=metadata["collision_index"],
+            interaction=None if interaction is None else InteractionConfig(**interaction),
+            policy=(
+                None if planner is None else DensityPlanner(field_size, PlannerConfig(**planner))
+            ),
+            swept_collisions=metadata["swept_collisions"],
         )
-        hornets = [
+        simulator._iteration = metadata["iteration"]
+        simulator._collision_pass_done = metadata["collision_pass_done"]
+        simulator._new_collision_count = metadata["new_collision_count"]
+        simulator._traveler_run_counts = np.array(arrays["traveler_run_counts"])
+        simulator._collision_counts = np.array(arrays["collision_counts"])
+        simulator._colliding_keys = np.array(arrays["colliding_keys"])
+        if simulator._interaction is not None:
+            simulator._interaction.spatial_hash.restore(
+                arrays["interaction_cell_keys"], arrays["interaction_cell_order"]
+            )
+        return simulator
+
+    @property
+    def hornets(self) -> List[Agent]:
+        if self._hornets is None:
+            self._hornets = self._swarm.agents()
+        return self._hornets
+
+    @property
+    def field_size(self) -> Sequence[int]:
+        return self._field_size
+
+    @property
+    def swarm(self) -> Swarm:
+        return self._swarm
+
+    @staticmethod
+    def from_cli_arguments(
+        args: argparse.Namespace, rng: Optional[np.random.Generator] = None
+    ) -> "Simulator":
+        """Build a simulator; hornets are drawn from rng (by default seeded with args.seed)"""
+        rng = np.random.default_rng(args.seed) if rng is None else rng
+        # travelers start on the left wall, evenly spread over the height of the field
+        height = args.field_size[1]
+        travelers = [
             Agent(
-                Pose(Position.random_position(args.field_size)),
-                Velocity.random_velocity(args.hornet_velocity_range),
-                Collider(args.hornet_collider_radius),
+                Pose(Position(0, (idx + 1) * height // (args.traveler_count + 1))),
+                Velocity(2, 0),
+                Collider(args.traveler_collider_radius),
             )
-            for _ in range(args.hornet_count)
+            for idx in range(args.traveler_count)
         ]
-        return Simulator(traveler, hornets, args.field_size)
+        swarm = Swarm.random(
+            args.hornet_count,
+            args.field_size,
+            args.hornet_velocity_range,
+            args.hornet_collider_radius,
+            rng,
+        )
+        interaction = None
+        if args.hornet_interaction:
+            max_speed = max(abs(value) for value in args.hornet_velocity_range)
+            interaction = InteractionConfig(
+                sensing_radius=args.hornet_sensing_radius,
+                separation_radius=min(2 * args.hornet_collider_radius, args.hornet_sensing_radius),
+                max_speed=float(np.hypot(max_speed, max_speed)),  # as fast as initially
+            )
+        policy = None
+        if args.traveler_policy == "planner":
+            policy = DensityPlanner(args.field_size, PlannerConfig(args.planner_cell_size))
+        return Simulator(
+            travelers,
+            swarm,
+            args.field_size,
+            collision_index=args.collision_index,
+            interaction=interaction,
+            policy=policy,
+            swept_collisions=args.swept_collisions,
+        )
@@ -0,0 +1,164 @@
+"""Uniform grid spatial hash for collision lookups"""
+
+# pylint: disable=missing-function-docstring
+import logging
+from typing import Iterator, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def split_coordinates(
+    points: np.ndarray, idx: Optional[np.ndarray] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Return the x and y columns of the (N, 2) points (of their rows idx if given) as two
+    contiguous arrays, which are much faster to gather from than the rows of points"""
+    if idx is None:
+        x, y = np.ascontiguousarray(points.T)
+        return x, y
+    return points[idx, 0], points[idx, 1]
+
+
+class SpatialHash:
+    """Uniform grid over the field that buckets points by cell
+
+    Points are kept sorted by cell key (row * columns + column) in a compressed layout:
+    the indices of the points in cell k are order[starts[k]:starts[k + 1]].
+    Points outside the field are clamped into the border cells, which keeps the lookup exact
+    for the few hornets that are momentarily outside before bouncing back."""
+
+    def __init__(self, field_size: Sequence[int], cell_size: float):
+        if cell_size <= 0:
+            error_message = f"Cell size must be positive value; got {cell_size}"
+            logger.error(error_message)
+            raise ValueError(error_message)
+        width, height = field_size
+        self._cell_size = float(cell_size)
+        self._columns = max(int(np.ceil(width / cell_size)), 1)
+        self._rows = max(int(np.ceil(height / cell_size)), 1)
+        self._keys: np.ndarray = np.empty(0, dtype=np.int64)
+        self._order: np.ndarray = np.empty(0, dtype=np.int64)
+        self._starts = np.zeros(self.cell_count + 1, dtype=np.int64)
+
+    @property
+    def cell_size(self) -> float:
+        return self._cell_size
+
+    @property
+    def cell_count(self) -> int:
+        return self._rows * self._columns
+
+    @property
+    def keys(self) -> np.ndarray:
+        """Cell key of each point, as of the latest update"""
+        return self._keys
+
+    @property
+    def order(self) -> np.ndarray:
+        """Indices of the points sorted by cell, as of the latest update"""
+        return self._order
+
+    def restore(self, keys: np.ndarray, order: np.ndarray):
+        """Set the bucketing of a former update (keys and order), e.g. from a checkpoint
+
+        Points of a cell are listed in the order they had, which an update from scratch would
+        not reproduce, so pairs are then found in the same order as before."""
+        self._keys = np.array(keys, dtype=np.int64)
+        self._order = np.array(order, dtype=np.int64)
+        counts = np.bincount(self._keys, minlength=self.cell_count)
+        np.cumsum(counts, out=self._starts[1:])
+
+    def _cells(self, coordinates: np.ndarray, limit: int) -> np.ndarray:
+        cells = np.floor_divide(coordinates, self._cell_size).astype(np.int64)
+        return np.clip(cells, 0, limit - 1, out=cells)
+
+    def update(self, positions: np.ndarray):
+        """Rebucket the points, re-sorting only if some point changed cell
+
+        The previous order is re-sorted rather than sorting from scratch: from one tick to the
+        next only a few points change cell, and the stable (timsort) argsort is close to linear
+        on such nearly sorted input."""
+        keys = self._cells(positions[:, 1], self._rows) * self._columns
+        keys += self._cells(positions[:, 0], self._columns)
+        if keys.shape == self._keys.shape:
+            if np.array_equal(keys, self._keys):
+                return
+            order = self._order[np.argsort(keys[self._order], kind="stable")]
+        else:
+            order = np.argsort(keys, kind="stable")
+        counts = np.bincount(keys, minlength=self.cell_count)
+        np.cumsum(counts, out=self._starts[1:])
+        self._keys = keys
+        self._order = order
+
+    def query(self, position: Sequence[float], reach: float) -> np.ndarray:
+        """Return indices of the points in the cells overlapping the square of half-size reach
+        around position (a superset of the points closer than reach)"""
+        x, y = position
+        column_min, column_max = self._cells(np.array([x - reach, x + reach]), self._columns)
+        row_min, row_max = self._cells(np.array([y - reach, y + reach]), self._rows)
+        rows = np.arange(row_min, row_max + 1) * self._columns
+        begins = self._starts[rows + column_min]
+        ends = self._starts[rows + column_max + 1]
+        return np.concatenate(
+            [self._order[begin:end] for begin, end in zip(begins, ends)], dtype=np.int64
+        )
+
+    def _neighbor_ranges(
+        self, sorted_keys: np.ndarray
+    ) -> Iterator[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """Yield (points, begins, counts): each of the points (indices in cell order) is paired
+        with the points begin, ..., begin + count - 1 (also in cell order)
+
+        Points are paired with the following points of their own cell and with the points of 4
+        of the neighbor cells (the other 4 would give the same pairs, reversed)."""
+        points = np.arange(len(sorted_keys))
+        yield points, points + 1, self._starts[sorted_keys + 1] - points - 1
+        rows, columns = np.divmod(sorted_keys, self._columns)
+        for row_offset, column_offset in ((0, 1), (1, -1), (1, 0), (1, 1)):
+            neighbor_rows = rows + row_offset
+            neighbor_columns = columns + column_offset
+            neighbor_points = np.flatnonzero(
+                (neighbor_rows < self._rows)
+                & (neighbor_columns >= 0)
+                & (neighbor_columns < self._columns)
+            )
+            neighbor_keys = neighbor_rows[neighbor_points] * self._columns
+            neighbor_keys += neighbor_columns[neighbor_points]
+            begins = self._starts[neighbor_keys]
+            yield neighbor_points, begins, self._starts[neighbor_keys + 1] - begins
+
+    def pairs(self, positions: np.ndarray, radius: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (i, j) of the pairs of distinct points closer than radius, each pair once
+
+        positions must be those of the latest update and radius at most the cell size, so that
+        the neighbors of a point are all in the 3 x 3 cells around its own. Candidate pairs are
+        generated for the whole grid at once, one neighbor cell offset at a time."""
+        i, j = self.sorted_pairs(*split_coordinates(positions, self._order), radius)
+        return self._order[i], self._order[j]
+
+    def sorted_pairs(
+        self, sorted_x: np.ndarray, sorted_y: np.ndarray, radius: float
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Like pairs, with the coordinates of the points given and their pairs returned in cell
+        order (sorted_x is the x of the points of order, i.e. positions[order, 0])
+
+        Callers that also work in cell order save mapping the pairs back, and their gathers of
+        neighbors stay local (the points of a cell are contiguous)."""
+        if radius > self._cell_size:
+            error_message = f"Radius must not exceed the cell size; got {radius}"
+            logger.error(error_message)
+            raise ValueError(error_message)
+        pairs_i, pairs_j = [], []
+        for points, begins, counts in self._neighbor_ranges(self._keys[self._order]):
+            i = np.repeat(points, counts)
+            j = np.arange(len(i)) + np.repeat(begins - (np.cumsum(counts) - counts), counts)
+            squared_distances = sorted_x[i] - sorted_x[j]
+            squared_distances *= squared_distances
+            squared_distances += np.square(sorted_y[i] - sorted_y[j])
+            # taking the kept pairs by index is much faster than masking both i and j
+            keep = np.flatnonzero(squared_distances < radius * radius)
+            pairs_i.append(i.take(keep))
+            pairs_j.append(j.take(keep))
+        return np.concatenate(pairs_i), np.concatenate(pairs_j)
@@ -0,0 +1,345 @@
+"""Swarm of hornets stored as structure-of-arrays"""
+
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-function-docstring
+# pylint: disable=super-init-not-called
+# pylint: disable=too-few-public-methods
+import logging
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from simulation.agents import Agent, Collider, Pose, Position, Velocity
+
+logger = logging.getLogger(__name__)
+
+
+class PositionView(Position):
+    """A Position that reads and writes one row of a (N, 2) array"""
+
+    def __init__(self, array: np.ndarray, idx: int):
+        self._array = array
+        self._idx = idx
+
+    @property  # type: ignore[override]
+    def x(self) -> float:
+        return float(self._array[self._idx, 0])
+
+    @x.setter
+    def x(self, value: float):
+        self._array[self._idx, 0] = value
+
+    @property  # type: ignore[override]
+    def y(self) -> float:
+        return float(self._array[self._idx, 1])
+
+    @y.setter
+    def y(self, value: float):
+        self._array[self._idx, 1] = value
+
+    def __copy__(self) -> Position:
+        return Position(self.x, self.y)
+
+
+class VelocityView(Velocity):
+    """A Velocity that reads and writes one row of a (N, 2) array"""
+
+    def __init__(self, array: np.ndarray, idx: int):
+        self._array = array
+        self._idx = idx
+
+    @property  # type: ignore[override]
+    def x(self) -> float:
+        return float(self._array[self._idx, 0])
+
+    @x.setter
+    def x(self, value: float):
+        self._array[self._idx, 0] = value
+
+    @property  # type: ignore[override]
+    def y(self) -> float:
+        return float(self._array[self._idx, 1])
+
+    @y.setter
+    def y(self, value: float):
+        self._array[self._idx, 1] = value
+
+    def __copy__(self) -> Velocity:
+        return Velocity(self.x, self.y)
+
+
+class PoseView(Pose):
+    """A Pose whose position is backed by one row of a (N, 2) array"""
+
+    def __init__(self, array: np.ndarray, idx: int):
+        self._position_view = PositionView(array, idx)
+
+    @property  # type: ignore[override]
+    def position(self) -> Position:
+        return self._position_view
+
+    @position.setter
+    def position(self, value: Position):
+        self._position_view.x = value.x
+        self._position_view.y = value.y
+
+
+class ColliderView(Collider):
+    """A Collider that reads and writes one entry of a (N,) array"""
+
+    def __init__(self, array: np.ndarray, idx: int):
+        self._array = array
+        self._idx = idx
+
+    @property  # type: ignore[override]
+    def radius(self) -> float:
+        return float(self._array[self._idx])
+
+    @radius.setter
+    def radius(self, value: float):
+        self._array[self._idx] = value
+
+
+class Swarm:
+    """Positions, velocities and collider radii of N hornets in contiguous arrays
+
+    positions and velocities are (N, 2) float arrays, radii is a (N,) float array."""
+
+    def __init__(self, positions: np.ndarray, velocities: np.ndarray, radii: np.ndarray):
+        self._positions = np.ascontiguousarray(positions, dtype=float).reshape(-1, 2)
+        self._velocities = np.ascontiguousarray(velocities, dtype=float).reshape(-1, 2)
+        self._radii = np.ascontiguousarray(radii, dtype=float).reshape(-1)
+        count = self._positions.shape[0]
+        if self._velocities.shape[0] != count or self._radii.shape[0] != count:
+            error_message = (
+                "Swarm arrays must have the same length; got "
+                f"{self._positions.shape[0]}, {self._velocities.shape[0]}, {self._radii.shape[0]}"
+            )
+            logger.error(error_message)
+            raise ValueError(error_message)
+        if (self._radii < 0).any():
+            error_message = "Collider radius cannot be negative"
+            logger.error(error_message)
+            raise ValueError(error_message)
+        self._outside = np.empty(self._positions.shape, dtype=bool)  # scratch buffer of update
+
+    def __len__(self) -> int:
+        return self._positions.shape[0]
+
+    @property
+    def positions(self) -> np.ndarray:
+        return self._positions
+
+    @property
+    def velocities(self) -> np.ndarray:
+        return self._velocities
+
+    @property
+    def radii(self) -> np.ndarray:
+        return self._radii
+
+    def update(self, field_size: Tuple[int, int]):
+        """Vectorized Agent.update for the whole swarm
+
+        Positions are moved by velocities, then velocity components of the hornets that
+        ended up outside [0, width] x [0, height] are flipped."""
+        self._positions += self._velocities
+        outside = np.less(self._positions, 0, out=self._outside)
+        np.logical_or(outside, self._positions > np.asarray(field_size), out=outside)
+        np.negative(self._velocities, out=self._velocities, where=outside)
+
+    def colliding(
+        self, position: Sequence[float], radius: float, candidates: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """Return indices of hornets colliding with a circle at position with radius
+
+        Vectorized Agent.does_collide: squared distances to all hornets (or only to the
+        candidates, if given) are computed in one pass and compared to the squared sum of the
+        radii. Returned indices are sorted."""
+        if candidates is None:
+            positions, radii = self._positions, self._radii
+        else:
+            candidates = np.sort(candidates)
+            positions, radii = self._positions[candidates], self._radii[candidates]
+        x, y = position
+        squared_distances = positions[:, 0] - x
+        squared_distances *= squared_distances
+        delta_y = positions[:, 1] - y
+        delta_y *= delta_y
+        squared_distances += delta_y
+        reach = radii + radius
+        reach *= reach
+        colliding = (squared_distances < reach).nonzero()[0]
+        return colliding if candidates is None else candidates[colliding]
+
+    def colliding_pairs(
+        self,
+        positions: np.ndarray,
+        radii: np.ndarray,
+        candidates: Optional[np.ndarray] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (circle indices, hornet indices) of the pairs of colliding circles and hornets
+
+        Batched colliding for M circles, given as (M, 2) positions and (M,) radii: the (M, N)
+        squared distances (or (M, C) for C candidates) are computed in one pass. Pairs are
+        sorted by circle, then by hornet."""
+        positions = np.asarray(positions, dtype=float).reshape(-1, 2)
+        radii = np.asarray(radii, dtype=float).reshape(-1, 1)
+        if len(positions) == 1:  # cheaper without broadcasting
+            hornet_idx = self.colliding(positions[0].tolist(), float(radii[0, 0]), candidates)
+            return np.zeros(len(hornet_idx), dtype=int), hornet_idx
+        if candidates is None:
+            hornet_positions, hornet_radii = self._positions, self._radii
+        else:
+            candidates = np.sort(candidates)
+            hornet_positions, hornet_radii = self._positions[candidates], self._radii[candidates]
+        squared_distances = hornet_positions[:, 0] - positions[:, 0:1]
+        squared_distances *= squared_distances
+        delta_y = hornet_positions[:, 1] - positions[:, 1:2]
+        delta_y *= delta_y
+        squared_distances += delta_y
+        reach = hornet_radii + radii
+        reach *= reach
+        circle_idx, hornet_idx = (squared_distances < reach).nonzero()
+        return circle_idx, hornet_idx if candidates is None else candidates[hornet_idx]
+
+    @staticmethod
+    def _contact_times(
+        delta: np.ndarray, relative_velocity: np.ndarray, squared_reach: np.ndarray
+    ) -> np.ndarray:
+        # first s in [0, 1] with |delta + s * relative_velocity|^2 < squared_reach, else inf
+        delta_x, delta_y = delta[:, 0], delta[:, 1]
+        velocity_x, velocity_y = relative_velocity[:, 0], relative_velocity[:, 1]
+        c = delta_x * delta_x + delta_y * delta_y - squared_reach
+        b = delta_x * velocity_x + delta_y * velocity_y
+        discriminant = b * b - (velocity_x * velocity_x + velocity_y * velocity_y) * c
+        times = np.full(len(delta), np.inf)
+        times[c < 0] = 0.0
+        approaching = (c >= 0) & (b < 0) & (discriminant > 0)
+        # smaller root, in the form that does not cancel out when the speed is low
+        times[approaching] = c[approaching] / (np.sqrt(discriminant[approaching]) - b[approaching])
+        times[times > 1] = np.inf
+        return times
+
+    @classmethod
+    def _first_contact_times(
+        cls,
+        positions: np.ndarray,
+        velocities: np.ndarray,
+        squared_reach: np.ndarray,
+        field: np.ndarray,
+        horizon: int,
+    ) -> np.ndarray:
+        # positions and velocities are modified, their last row is the circle
+        times = np.full(len(squared_reach), np.inf)
+        pending: np.ndarray = np.arange(len(squared_reach))
+        for tick in range(horizon):
+            contact = cls._contact_times(
+                positions[:-1] - positions[-1], velocities[:-1] - velocities[-1], squared_reach
+            )
+            missed = contact > 1
+            times[pending[~missed]] = tick + contact[~missed]
+            pending, squared_reach = pending[missed], squared_reach[missed]
+            missed = np.append(missed, True)  # keep the circle
+            positions, velocities = positions[missed], velocities[missed]
+            # as Swarm.update and Agent.update
+            positions += velocities
+            np.negative(velocities, out=velocities, where=(positions < 0) | (positions > field))
+        return times
+
+    def _reachable(
+        self, position: np.ndarray, velocity: np.ndarray, radius: float, horizon: int
+    ) -> np.ndarray:
+        # indices of the hornets that may touch the circle if both move straight at each other
+        reach = np.hypot(self._velocities[:, 0], self._velocities[:, 1])
+        reach += np.hypot(*velocity)
+        reach *= horizon
+        reach += self._radii
+        reach += radius
+        distances = np.hypot(
+            self._positions[:, 0] - position[0], self._positions[:, 1] - position[1]
+        )
+        return np.flatnonzero(distances <= reach)
+
+    def time_to_contact(
+        self,
+        position: Sequence[float],
+        velocity: Sequence[float],
+        radius: float,
+        field_size: Sequence[float],
+        horizon: int,
+    ) -> np.ndarray:
+        """Return, for each hornet, the earliest time (in ticks from now) at which it collides
+        with a circle at position with radius, moving at velocity; inf if not within horizon ticks
+
+        Hornets and circle are moved tick by tick as Swarm.update and Agent.update would move
+        them (bouncing off the walls), and in a straight line within a tick, so contacts between
+        two ticks (e.g. a fast hornet going through the circle) are found too: within a tick the
+        relative motion is linear and the contact time is the first root of a quadratic.
+        Bounces keep the speeds, so hornets too far to reach the circle within horizon ticks
+        are discarded upfront. The swarm is not modified."""
+        if horizon < 0:
+            error_message = f"Horizon cannot be negative; got {horizon}"
+            logger.error(error_message)
+            raise ValueError(error_message)
+        circle_position = np.array(position, dtype=float)
+        circle_velocity = np.array(velocity, dtype=float)
+        followed = self._reachable(circle_position, circle_velocity, radius, horizon)
+        times = np.full(len(self), np.inf)
+        # the circle moves along the hornets, as the last row of the arrays
+        times[followed] = self._first_contact_times(
+            np.vstack([self._positions[followed], circle_position]),
+            np.vstack([self._velocities[followed], circle_velocity]),
+            (self._radii[followed] + radius) ** 2,
+            np.asarray(field_size, dtype=float),
+            horizon,
+        )
+        return times
+
+    def agent(self, idx: int) -> Agent:
+        """Return an Agent view of the idx-th hornet"""
+        return Agent(
+            PoseView(self._positions, idx),
+            VelocityView(self._velocities, idx),
+            ColliderView(self._radii, idx),
+        )
+
+    def agents(self) -> List[Agent]:
+        """Return Agent views of all hornets"""
+        return [self.agent(idx) for idx in range(len(self))]
+
+    def bind(self, agents: Sequence[Agent]):
+        """Rebind the agents' pose, velocity and collider to views of the swarm arrays
+
+        After binding, the agents reflect (and mutate) the swarm state, as long as their
+        fields are mutated in place rather than replaced."""
+        for idx, agent in enumerate(agents):
+            view = self.agent(idx)
+            agent.pose = view.pose
+            agent.velocity = view.velocity
+            agent.collider = view.collider
+
+    @staticmethod
+    def random(
+        count: int,
+        field_size: Tuple[int, int],
+        velocity_range: Tuple[float, float],
+        radius: float,
+        rng: np.random.Generator,
+    ) -> "Swarm":
+        """Return a swarm of count hornets with random positions and velocities
+
+        The whole swarm is drawn with one call per array, so for a given rng state the result
+        is reproducible bit for bit."""
+        return Swarm(
+            Position.random_positions(field_size, count, rng),
+            Velocity.random_velocities(velocity_range, count, rng),
+            np.full(count, Collider(radius).radius, dtype=float),
+        )
+
+    @staticmethod
+    def from_agents(agents: Sequence[Agent]) -> "Swarm":
+        positions = np.array([agent.pose.position.as_list() for agent in agents], dtype=float)
+        velocities = np.array([agent.velocity.as_list() for agent in agents], dtype=float)
+        radii = np.array([agent.collider.radius for agent in agents], dtype=float)
+        return Swarm(positions, velocities, radii)
@@ -0,0 +1,115 @@
+"""Parameter sweeps of independent simulation trials over a process pool"""
+
+import argparse
+import copy
+import itertools
+import logging
+import math
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Iterable, Iterator, List, Mapping, Sequence, Tuple, Union
+
+from simulation.monte_carlo import TrialResult, TrialSettings, run_trials
+
+logger = logging.getLogger(__name__)
+
+SweepValue = Union[int, float, str, Tuple[Union[int, float, str], ...]]
+
+
+def _parse_scalar(text: str) -> Union[int, float, str]:
+    for cast in (int, float):
+        try:
+            return cast(text)
+        except ValueError:
+            pass
+    return text
+
+
+def _parse_value(text: str) -> SweepValue:
+    if ":" in text:
+        return tuple(_parse_scalar(item) for item in text.split(":"))
+    return _parse_scalar(text)
+
+
+def parse_sweep(spec: str) -> Tuple[str, List[SweepValue]]:
+    """Parse a "name=value,value,..." sweep specification
+
+    name is an argument name (e.g. hornet-count) and pairs are written as "a:b",
+    e.g. "hornet-velocity-range=-5:5,-2:2"."""
+    name, separator, values = spec.partition("=")
+    if not separator or not name or not values:
+        error_message = f"Sweep must be formatted as name=value,value,...; got {spec}"
+        logger.error(error_message)
+        raise ValueError(error_message)
+    return name.replace("-", "_"), [_parse_value(value) for value in values.split(",")]
+
+
+def sweep_points(
+    args: argparse.Namespace, sweeps: Mapping[str, Sequence[SweepValue]]
+) -> List[argparse.Namespace]:
+    """Return one copy of args per combination (cartesian product) of the swept values"""
+    for name in sweeps:
+        if not hasattr(args, name):
+            error_message = f"Cannot sweep unknown argument {name}"
+            logger.error(error_message)
+            raise ValueError(error_message)
+    points = []
+    for combination in itertools.product(*sweeps.values()):
+        point = copy.copy(args)
+        for name, value in zip(sweeps.keys(), combination):
+            setattr(point, name, value)
+        points.append(point)
+    return points
+
+
+_Task = Tuple[int, argparse.Namespace, Sequence[int], TrialSettings]
+
+
+def _run_task(task: _Task) -> List[Tuple[int, TrialResult]]:
+    point_idx, args, seeds, settings = task
+    return [(point_idx, result) for result in run_trials(args, seeds, settings)]
+
+
+def chunk_size(point_count: int, seed_count: int, settings: TrialSettings, workers: int) -> int:
+    """Return the number of trials (of a sweep point) per task
+
+    Batched trials are chunked by settings.world_count, but into smaller chunks if that leaves
+    workers without a chunk. Other trials are sent a few chunks per worker, to amortize the
+    pickling cost."""
+    if workers <= 1:
+        return max(settings.world_count, 1)
+    if settings.world_count > 1:
+        return min(settings.world_count, math.ceil(seed_count / workers))
+    return max(point_count * seed_count // (16 * workers), 1)
+
+
+def run_sweep(
+    points: Sequence[argparse.Namespace],
+    seeds: Sequence[int],
+    settings: TrialSettings,
+    workers: int,
+) -> Iterator[Tuple[int, TrialResult]]:
+    """Run one trial per seed for each sweep point and yield (point index, result) as they finish
+
+    Every point is run with the same seeds (common random numbers across the points), so each
+    result only depends on its point and seed, not on the number of workers nor on the order in
+    which they finish. With a single worker, trials run in this process, otherwise they are sent
+    to the pool in chunks (see chunk_size)."""
+    size = chunk_size(len(points), len(seeds), settings, workers)
+    tasks: List[_Task] = [
+        (point_idx, point, seeds[begin : begin + size], settings)
+        for point_idx, point in enumerate(points)
+        for begin in range(0, len(seeds), size)
+    ]
+    if workers <= 1:
+        for task in tasks:
+            yield from _run_task(task)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(_run_task, task) for task in tasks]
+        for future in as_completed(futures):
+            yield from future.result()
+
+
+def describe(args: argparse.Namespace, sweeps: Iterable[str]) -> str:
+    """Return "name=value ..." of the swept arguments (names) of a sweep point"""
+    return " ".join(f"{name}={getattr(args, name)}" for name in sweeps)
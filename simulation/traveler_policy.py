@@ -0,0 +1,167 @@
+"""Traveler policies: how travelers set their velocity before each move"""
+
+import logging
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Sequence
+
+import numpy as np
+
+from simulation.agents import Agent
+from simulation.swarm import Swarm
+
+logger = logging.getLogger(__name__)
+
+TRAVELER_POLICY_CHOICES = ["straight", "planner"]
+
+
+class TravelerPolicy(ABC):
+    """Base of the traveler policies
+
+    Simulator.tick calls steer once per tick, before any agent moves; a policy may change the
+    travelers' velocities (bounces off the walls are still applied by Agent.update)."""
+
+    # pylint: disable=too-few-public-methods
+    @abstractmethod
+    def steer(self, travelers: Sequence[Agent], swarm: Swarm):
+        """Set the velocities of travelers, given the current state of the swarm"""
+
+
+class StraightPolicy(TravelerPolicy):
+    """Keep the velocity: travelers go straight and only turn around at the walls"""
+
+    # pylint: disable=too-few-public-methods
+    def steer(self, travelers: Sequence[Agent], swarm: Swarm):
+        pass
+
+
+class DensityGrid:
+    """Hornet count per cell of a coarse uniform grid over the field
+
+    Counts are held as a (rows, columns) array. update only moves the hornets that changed
+    cell since the previous call from their former cell to their new one, instead of
+    recounting the whole swarm. Points outside the field are clamped into the border cells."""
+
+    # pylint: disable=missing-function-docstring
+    def __init__(self, field_size: Sequence[int], cell_size: float):
+        if cell_size <= 0:
+            error_message = f"Cell size must be positive value; got {cell_size}"
+            logger.error(error_message)
+            raise ValueError(error_message)
+        width, height = field_size
+        self._cell_size = float(cell_size)
+        self._columns = max(int(np.ceil(width / cell_size)), 1)
+        self._rows = max(int(np.ceil(height / cell_size)), 1)
+        self._counts = np.zeros((self._rows, self._columns), dtype=np.int64)
+        self._keys: np.ndarray = np.empty(0, dtype=np.int64)
+        self._last_cell = np.array([self._columns - 1, self._rows - 1])
+
+    @property
+    def cell_size(self) -> float:
+        return self._cell_size
+
+    @property
+    def counts(self) -> np.ndarray:
+        """(rows, columns) hornet counts, as of the latest update (do not modify)"""
+        return self._counts
+
+    def column(self, x: float) -> int:
+        return min(max(int(x // self._cell_size), 0), self._columns - 1)
+
+    def row(self, y: float) -> int:
+        return min(max(int(y // self._cell_size), 0), self._rows - 1)
+
+    def update(self, positions: np.ndarray):
+        # truncating the quotients is much faster than floor_divide, and both agree once
+        # clamped (only coordinates below 0 differ, and they go to the first cell either way)
+        cells = (positions / self._cell_size).astype(np.int64)
+        np.maximum(cells, 0, out=cells)
+        np.minimum(cells, self._last_cell, out=cells)
+        keys = cells[:, 1] * self._columns
+        keys += cells[:, 0]
+        flat_counts = self._counts.reshape(-1)
+        if keys.shape != self._keys.shape:
+            flat_counts[:] = np.bincount(keys, minlength=flat_counts.size)
+        else:
+            moved = np.flatnonzero(keys != self._keys)
+            if len(moved) != 0:
+                flat_counts -= np.bincount(self._keys[moved], minlength=flat_counts.size)
+                flat_counts += np.bincount(keys[moved], minlength=flat_counts.size)
+        self._keys = keys
+
+
+@dataclass(frozen=True)
+class PlannerConfig:
+    """Parameters of the DensityPlanner
+
+    The field is split in cells of cell_size. The planner looks lookahead columns ahead of the
+    traveler and heads for the row with the fewest hornets in them (counting the rows on either
+    side too), each row of detour costing detour_cost hornets."""
+
+    cell_size: float = 50.0
+    lookahead: int = 4
+    detour_cost: float = 0.5
+
+    def __post_init__(self):
+        if self.cell_size <= 0 or self.lookahead < 1 or self.detour_cost < 0:
+            error_message = (
+                "Cell size and lookahead must be positive and detour cost non-negative; "
+                f"got {self.cell_size}, {self.lookahead}, {self.detour_cost}"
+            )
+            logger.error(error_message)
+            raise ValueError(error_message)
+
+
+class DensityPlanner(TravelerPolicy):
+    """Steer travelers vertically through the least crowded corridor ahead of them
+
+    The horizontal velocity is kept (so crossings take as long as with StraightPolicy) and the
+    vertical speed never exceeds the horizontal speed. The target row lies inside the field,
+    so travelers never bounce off the top and bottom walls."""
+
+    # pylint: disable=missing-function-docstring
+    def __init__(self, field_size: Sequence[int], config: PlannerConfig):
+        self._field_size = field_size
+        self._config = config
+        self._grid = DensityGrid(field_size, config.cell_size)
+
+    @property
+    def config(self) -> PlannerConfig:
+        return self._config
+
+    @property
+    def grid(self) -> DensityGrid:
+        return self._grid
+
+    def steer(self, travelers: Sequence[Agent], swarm: Swarm):
+        self._grid.update(swarm.positions)
+        for traveler in travelers:
+            self._steer(traveler)
+
+    def _steer(self, traveler: Agent):
+        position, velocity = traveler.pose.position, traveler.velocity
+        speed = abs(velocity.x)
+        counts = self._grid.counts
+        column, row = self._grid.column(position.x), self._grid.row(position.y)
+        if velocity.x > 0:
+            ahead = counts[:, column + 1 : column + 1 + self._config.lookahead]
+        else:
+            ahead = counts[:, max(column - self._config.lookahead, 0) : column]
+        if speed == 0 or ahead.size == 0:
+            velocity.y = 0.0
+            return
+        target_y = (self._target_row(ahead, row) + 0.5) * self._grid.cell_size
+        target_y = min(target_y, self._field_size[1])
+        velocity.y = float(np.clip(target_y - position.y, -speed, speed))
+
+    def _target_row(self, ahead: np.ndarray, row: int) -> int:
+        row_counts = ahead.sum(axis=1)
+        danger = row_counts.astype(float)
+        # the traveler overlaps the rows next to the one it is in
+        danger[1:] += row_counts[:-1]
+        danger[:-1] += row_counts[1:]
+        # within the lookahead, the traveler can move vertically by as many rows
+        first = max(row - self._config.lookahead, 0)
+        candidates = np.arange(first, min(row + self._config.lookahead + 1, len(danger)))
+        costs = danger[candidates] + self._config.detour_cost * np.abs(candidates - row)
+        return int(candidates[costs.argmin()])
@@ -0,0 +1,17 @@
+"""Helpers shared by the tests"""
+
+import argparse
+
+from simulation.arguments import add_simulation_arguments
+
+
+def simulation_arguments(**overrides) -> argparse.Namespace:
+    """Return the default arguments of add_simulation_arguments, with the given ones overridden
+
+    Overrides may also add arguments of the entry points (e.g. the colors of the visualizer)."""
+    parser = argparse.ArgumentParser()
+    add_simulation_arguments(parser)
+    args = parser.parse_args([])
+    for name, value in overrides.items():
+        setattr(args, name, value)
+    return args
@@ -56,6 +56,21 @@ def test_position_random_position_invalid_size(expected_size: Tuple[int, int]):
         Position.random_position(expected_size)
 
 
+@pytest.mark.parametrize("expected_size", [(3, 4), (40, 30), (100, 1111)])
+def test_position_random_positions(expected_size: Tuple[int, int]):
+    positions = Position.random_positions(expected_size, 1000, np.random.default_rng(0))
+    assert positions.shape == (1000, 2)
+    assert (positions >= 0).all()
+    assert (positions < expected_size).all()
+    expected = Position.random_positions(expected_size, 1000, np.random.default_rng(0))
+    assert np.array_equal(positions, expected)
+
+
+def test_position_random_position_rng():
+    position = Position.random_position((100, 100), np.random.default_rng(1))
+    assert position == Position.random_position((100, 100), np.random.default_rng(1))
+
+
 @pytest.mark.parametrize("expected_range", [(-3.0, 4.0), (4.0, 30.0), (-100.0, 0.0)])
 def test_velocity_random_velocity(expected_range: Tuple[float, float]):
     actual_velocity = Velocity.random_velocity(expected_range)
@@ -64,6 +79,16 @@ def test_velocity_random_velocity(expected_range: Tuple[float, float]):
     assert expected_range[0] <= actual_velocity.y <= expected_range[1]
 
 
+@pytest.mark.parametrize("expected_range", [(-3.0, 4.0), (4.0, 30.0), (-100.0, 0.0)])
+def test_velocity_random_velocities(expected_range: Tuple[float, float]):
+    velocities = Velocity.random_velocities(expected_range, 1000, np.random.default_rng(0))
+    assert velocities.shape == (1000, 2)
+    assert (velocities >= expected_range[0]).all()
+    assert (velocities <= expected_range[1]).all()
+    expected = Velocity.random_velocities(expected_range, 1000, np.random.default_rng(0))
+    assert np.array_equal(velocities, expected)
+
+
 @pytest.mark.parametrize("expected_range", [(3.0, -4.0), (4.0, 0.0), (-100.0, -100.01)])
 def test_velocity_random_velocity_invalid_range(expected_range: Tuple[float, float]):
     with pytest.raises(ValueError):
@@ -0,0 +1,30 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=missing-function-docstring
+import argparse
+
+import pytest
+
+from simulation.arguments import add_simulation_arguments
+from simulation.simulator import Simulator
+
+
+def test_add_simulation_arguments_defaults():
+    parser = argparse.ArgumentParser()
+    add_simulation_arguments(parser)
+    args = parser.parse_args([])
+    assert args.hornet_count == 200
+    assert args.field_size == (2400, 1200)
+    assert args.collision_index == "brute-force"
+    assert isinstance(Simulator.from_cli_arguments(args), Simulator)
+
+
+def test_add_simulation_arguments():
+    parser = argparse.ArgumentParser()
+    add_simulation_arguments(parser)
+    args = parser.parse_args(["--hornet-count", "3", "--field-size", "30", "20"])
+    assert args.hornet_count == 3
+    assert args.field_size == [30, 20]
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__]))
@@ -0,0 +1,93 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=missing-function-docstring
+import copy
+
+import numpy as np
+import pytest
+
+from simulation.agents import Agent, Collider, Pose, Position, Velocity
+from simulation.batched_simulator import BatchedSimulator
+from simulation.simulator import Simulator
+from tests.helpers import simulation_arguments
+
+
+def _simulators(world_count: int, hornet_count: int = 50):
+    args = simulation_arguments(
+        field_size=(200, 100),
+        hornet_count=hornet_count,
+        traveler_collider_radius=10,
+        seed=0,
+    )
+    rng = np.random.default_rng(0)
+    return [Simulator.from_cli_arguments(args, rng) for _ in range(world_count)]
+
+
+def test_batched_simulator_initialization():
+    simulators = _simulators(3)
+    batched = BatchedSimulator.from_simulators(simulators)
+    assert batched.world_count == 3
+    assert batched.iteration == 0
+    assert batched.hornet_positions.shape == (3, 50, 2)
+    assert batched.traveler_positions.shape == (3, 2)
+    assert np.array_equal(batched.hornet_positions[1], simulators[1].swarm.positions)
+    assert batched.collision_count.tolist() == [0, 0, 0]
+    assert batched.traveler_run_count.tolist() == [0, 0, 0]
+
+
+def test_batched_simulator_matches_simulators():
+    simulators = _simulators(4)
+    batched = BatchedSimulator.from_simulators(simulators)
+    for _ in range(300):
+        batched.tick()
+        for simulator in simulators:
+            simulator.tick()
+        assert batched.collision().tolist() == [simulator.collision() for simulator in simulators]
+    assert batched.iteration == 300
+    expected_collision_count = [simulator.collision_count for simulator in simulators]
+    assert batched.collision_count.tolist() == expected_collision_count
+    assert sum(expected_collision_count) > 0
+    expected_run_count = [simulator.traveler_run_count for simulator in simulators]
+    assert batched.traveler_run_count.tolist() == expected_run_count
+    for idx, simulator in enumerate(simulators):
+        assert np.array_equal(batched.hornet_positions[idx], simulator.swarm.positions)
+        colliding_idx = np.flatnonzero(batched.colliding[idx])
+        assert np.array_equal(colliding_idx, simulator.collision_snapshot.colliding_idx)
+
+
+def test_batched_simulator_null_velocity_is_not_a_bounce():
+    traveler = Agent(Pose(Position(0, 5)), Velocity(0, 0), Collider(0))
+    simulator = Simulator(traveler, [], (10, 10))
+    batched = BatchedSimulator.from_simulators([simulator, copy.deepcopy(simulator)])
+    batched.tick()
+    assert batched.traveler_run_count.tolist() == [0, 0]
+
+
+def test_batched_simulator_invalid_simulators():
+    with pytest.raises(ValueError):
+        BatchedSimulator.from_simulators(_simulators(1, 3) + _simulators(1, 4))
+    traveler = Agent(Pose(Position(0, 5)), Velocity(0, 0), Collider(0))
+    with pytest.raises(ValueError):
+        BatchedSimulator.from_simulators(
+            [Simulator(traveler, [], (10, 10)), Simulator(traveler, [], (10, 20))]
+        )
+    with pytest.raises(ValueError):
+        BatchedSimulator.from_simulators([Simulator(traveler, [], (10, 10), swept_collisions=True)])
+    with pytest.raises(ValueError):  # the second traveler would be dropped
+        BatchedSimulator.from_simulators([Simulator([traveler, traveler], [], (10, 10))])
+
+
+def test_batched_simulator_invalid_arrays():
+    with pytest.raises(ValueError):
+        BatchedSimulator(
+            np.zeros((2, 2)), np.zeros((3, 2)), np.zeros(2), np.zeros((2, 1, 2)),
+            np.zeros((2, 1, 2)), np.zeros((2, 1)), (10, 10),
+        )  # fmt: skip
+    with pytest.raises(ValueError):
+        BatchedSimulator(
+            np.zeros((2, 2)), np.zeros((2, 2)), np.zeros(2), np.zeros((2, 1, 2)),
+            np.zeros((2, 1, 2)), -np.ones((2, 1)), (10, 10),
+        )  # fmt: skip
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__]))
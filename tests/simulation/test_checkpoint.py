@@ -0,0 +1,149 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=missing-function-docstring
+import argparse
+import os
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from simulation.agents import Agent, Collider, Pose, Position, Velocity
+from simulation.checkpoint import (
+    CheckpointWriter,
+    load_simulator,
+    read_checkpoint,
+    save_simulator,
+    write_checkpoint,
+)
+from simulation.simulator import Simulator
+from simulation.traveler_policy import TravelerPolicy
+from tests.helpers import simulation_arguments
+
+
+def test_checkpoint_round_trip(tmp_path):
+    file_path = os.path.join(tmp_path, "state.hfc")
+    arrays = {
+        "floats": np.random.default_rng(0).normal(size=(100, 2)),
+        "ints": np.arange(-5, 12, dtype=np.int32),
+        "flags": np.array([True, False, True]),
+        "empty": np.empty((0, 2)),
+        "scalar": np.array(3.5),
+        "strided": np.arange(20.0)[::3],
+    }
+    metadata = {"iteration": 12, "name": "field", "config": None, "sizes": [1, 2]}
+    write_checkpoint(file_path, metadata, arrays)
+    read_metadata, read_arrays = read_checkpoint(file_path)
+    assert read_metadata == metadata
+    assert list(read_arrays) == list(arrays)
+    for name, array in arrays.items():
+        assert read_arrays[name].dtype == array.dtype
+        assert np.array_equal(read_arrays[name], array)
+    assert isinstance(read_arrays["floats"], np.memmap)
+    assert not os.path.exists(f"{file_path}.tmp")
+
+
+def test_checkpoint_invalid_file(tmp_path):
+    file_path = os.path.join(tmp_path, "state.hfc")
+    with open(file_path, "wb") as file:
+        file.write(b"not a checkpoint")
+    with pytest.raises(ValueError):
+        read_checkpoint(file_path)
+
+
+def _args(**kwargs) -> argparse.Namespace:
+    config = {
+        "field_size": (300, 200),
+        "hornet_count": 500,
+        "hornet_velocity_range": (-4, 4),
+        "hornet_collider_radius": 3,
+        "hornet_interaction": True,
+        "hornet_sensing_radius": 15,
+        "traveler_policy": "planner",
+        "planner_cell_size": 25,
+        "swept_collisions": True,
+        "traveler_count": 2,
+        "traveler_collider_radius": 10,
+        "collision_index": "grid",
+        "seed": 0,
+    }
+    config.update(kwargs)
+    return simulation_arguments(**config)
+
+
+def _assert_same_state(simulator: Simulator, other: Simulator):
+    assert simulator.iteration == other.iteration
+    assert np.array_equal(simulator.swarm.positions, other.swarm.positions)
+    assert np.array_equal(simulator.swarm.velocities, other.swarm.velocities)
+    assert np.array_equal(simulator.swarm.radii, other.swarm.radii)
+    assert np.array_equal(simulator.traveler_positions(), other.traveler_positions())
+    assert np.array_equal(simulator.traveler_run_counts, other.traveler_run_counts)
+    assert np.array_equal(simulator.collision_counts, other.collision_counts)
+    snapshot, other_snapshot = simulator.collision_snapshot, other.collision_snapshot
+    assert np.array_equal(snapshot.colliding_idx, other_snapshot.colliding_idx)
+    assert snapshot.new_collision_count == other_snapshot.new_collision_count
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        {},
+        {"hornet_interaction": False, "traveler_policy": "straight", "swept_collisions": False},
+        {"collision_index": "brute-force", "traveler_count": 1},
+    ],
+)
+def test_simulator_resume_is_bit_exact(tmp_path, kwargs: dict):
+    file_path = os.path.join(tmp_path, "state.hfc")
+    simulator = Simulator.from_cli_arguments(_args(**kwargs))
+    for _ in range(60):
+        simulator.tick()
+    save_simulator(simulator, file_path)
+    resumed = load_simulator(file_path)
+    _assert_same_state(simulator, resumed)
+    assert resumed.interaction == simulator.interaction
+    assert type(resumed.policy) is type(simulator.policy)
+    for _ in range(200):
+        simulator.tick()
+        resumed.tick()
+    _assert_same_state(simulator, resumed)
+    assert simulator.collision_count > 0
+    # the file is mapped copy-on-write: resuming again starts from the saved state
+    assert load_simulator(file_path).iteration == 60
+
+
+def test_simulator_checkpoint_unknown_policy():
+    class _Policy(TravelerPolicy):  # pylint: disable=too-few-public-methods
+        def steer(self, travelers, swarm):
+            pass
+
+    traveler = Agent(Pose(Position(0, 5)), Velocity(1, 0), Collider(1))
+    simulator = Simulator(traveler, [], (10, 10), policy=_Policy())
+    with pytest.raises(ValueError):
+        simulator.checkpoint()
+
+
+def test_checkpoint_writer(tmp_path):
+    simulator = Simulator.from_cli_arguments(_args())
+    with CheckpointWriter(max_pending=1) as writer:
+        for _ in range(3):
+            simulator.tick()
+            writer.submit(simulator, os.path.join(tmp_path, f"{simulator.iteration}.hfc"))
+        writer.submit(simulator, os.path.join(tmp_path, "missing", "dir.hfc"))
+    assert writer.written_count == 3
+    assert len(writer.errors) == 1
+    assert load_simulator(os.path.join(tmp_path, "2.hfc")).iteration == 2
+    with pytest.raises(ValueError):
+        CheckpointWriter(max_pending=0)
+
+
+def test_checkpoint_writer_keeps_draining_after_unexpected_errors(tmp_path):
+    simulator = Simulator.from_cli_arguments(_args())
+    with patch("simulation.checkpoint.write_checkpoint", side_effect=RuntimeError("unexpected")):
+        with CheckpointWriter(max_pending=1) as writer:
+            for idx in range(4):
+                writer.submit(simulator, os.path.join(tmp_path, f"{idx}.hfc"))
+    assert writer.written_count == 0
+    assert len(writer.errors) == 4
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__]))
@@ -0,0 +1,65 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=missing-function-docstring
+import os
+
+import numpy as np
+import pytest
+
+from simulation.events import COLLISION_EVENT_DTYPE, CollisionEventLog, CollisionEventWriter
+
+
+def test_collision_event_log_append():
+    log = CollisionEventLog(capacity=2)
+    positions = np.array([[0.0, 1.0], [2.0, 3.0], [4.0, 5.0]])
+    log.append(7, np.array([1, 3, 5]), positions, enter=True)  # travelers 0, 1, 1
+    log.append(8, np.empty(0, dtype=int), positions, enter=False)
+    log.append(8, np.array([2]), positions, enter=False)
+    assert len(log) == 4
+    events = log.events
+    assert events.dtype == COLLISION_EVENT_DTYPE
+    assert events["iteration"].tolist() == [7, 7, 7, 8]
+    assert events["hornet_idx"].tolist() == [1, 0, 2, 2]
+    assert events["traveler_idx"].tolist() == [0, 1, 1, 0]
+    assert events["position"].tolist() == [[2, 3], [0, 1], [4, 5], [4, 5]]
+    assert events["enter"].tolist() == [True, True, True, False]
+    with pytest.raises(ValueError):
+        events["iteration"][0] = 0
+
+
+def test_collision_event_log_drain():
+    log = CollisionEventLog()
+    positions = np.zeros((4, 2))
+    log.append(1, np.arange(4), positions, enter=True)
+    drained = log.drain()
+    assert len(drained) == 4
+    assert len(log) == 0
+    log.append(2, np.array([0]), positions, enter=False)
+    assert drained["iteration"].tolist() == [1, 1, 1, 1]
+    assert log.events["iteration"].tolist() == [2]
+
+
+def test_collision_event_log_invalid_capacity():
+    with pytest.raises(ValueError):
+        CollisionEventLog(capacity=0)
+
+
+def test_collision_event_writer(tmp_path: str):
+    log = CollisionEventLog()
+    positions = np.arange(20, dtype=float).reshape(10, 2)
+    file_path = os.path.join(tmp_path, "events.npy")
+    with CollisionEventWriter(log, file_path, flush_size=30) as writer:
+        for iteration in range(10):
+            log.append(iteration, np.arange(iteration), positions, enter=iteration % 2 == 0)
+            writer.write()
+            assert len(log) < 30
+        assert writer.written_count == 36  # the 9 events of the last iteration are pending
+    assert writer.written_count == 45
+    events = np.load(file_path)
+    assert events.dtype == COLLISION_EVENT_DTYPE
+    assert events["iteration"].tolist() == [idx for idx in range(10) for _ in range(idx)]
+    assert events["hornet_idx"].tolist() == [hornet for idx in range(10) for hornet in range(idx)]
+    assert events["enter"].tolist() == [idx % 2 == 0 for idx in range(10) for _ in range(idx)]
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__]))
@@ -0,0 +1,102 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=missing-function-docstring
+import argparse
+
+import numpy as np
+import pytest
+
+from simulation.batched_simulator import BatchedSimulator
+from simulation.interaction import Interaction, InteractionConfig
+from simulation.simulator import Simulator
+from simulation.swarm import Swarm
+from tests.helpers import simulation_arguments
+
+FAR_AWAY = np.array([[1000.0, 1000.0]])
+
+
+def _interaction(**kwargs) -> Interaction:
+    config = {"sensing_radius": 10.0, "separation_radius": 4.0, "max_speed": 100.0}
+    config.update(kwargs)
+    return Interaction((100, 100), InteractionConfig(**config))
+
+
+@pytest.mark.parametrize(
+    "sensing_radius, separation_radius, max_speed",
+    [(0, 0, 1), (10, 0, 0), (10, 11, 1), (10, -1, 1)],
+)
+def test_interaction_config_invalid(
+    sensing_radius: float, separation_radius: float, max_speed: float
+):
+    with pytest.raises(ValueError):
+        InteractionConfig(sensing_radius, separation_radius, max_speed)
+
+
+def test_interaction_separation():
+    swarm = Swarm(np.array([[50.0, 50.0], [52.0, 50.0], [80.0, 80.0]]), np.zeros((3, 2)), [1] * 3)
+    _interaction(alignment_weight=0).steer(swarm, FAR_AWAY)
+    assert swarm.velocities[0].tolist() == [-0.5, 0]
+    assert swarm.velocities[1].tolist() == [0.5, 0]
+    assert swarm.velocities[2].tolist() == [0, 0]
+
+
+def test_interaction_alignment():
+    velocities = np.array([[1.0, 0.0], [0.0, 1.0], [0.0, -1.0], [3.0, 3.0]])
+    positions = np.array([[50.0, 50.0], [55.0, 50.0], [45.0, 50.0], [90.0, 90.0]])
+    swarm = Swarm(positions, velocities, [1] * 4)
+    _interaction(separation_weight=0, alignment_weight=0.5).steer(swarm, FAR_AWAY)
+    # hornet 0 senses 1 and 2 (mean velocity [0, 0]), 1 and 2 only sense 0
+    assert swarm.velocities[0].tolist() == [0.5, 0]
+    assert swarm.velocities[1].tolist() == [0.5, 0.5]
+    assert swarm.velocities[2].tolist() == [0.5, -0.5]
+    assert swarm.velocities[3].tolist() == [3, 3]
+
+
+def test_interaction_attraction_and_speed_cap():
+    positions = np.array([[50.0, 50.0], [20.0, 20.0], [80.0, 50.0]])
+    swarm = Swarm(positions, np.array([[0.0, 0.0], [0.0, 0.0], [10.0, 0.0]]), [1] * 3)
+    travelers = np.array([[50.0, 56.0], [20.0, 28.0], [0.0, 0.0]])
+    _interaction(attraction_weight=2, max_speed=5).steer(swarm, travelers)
+    assert np.allclose(swarm.velocities[0], [0, 2])
+    assert np.allclose(swarm.velocities[1], [0, 2])
+    assert np.allclose(swarm.velocities[2], [5, 0])
+
+
+def test_interaction_without_hornets():
+    swarm = Swarm(np.zeros((0, 2)), np.zeros((0, 2)), [])
+    _interaction().steer(swarm, FAR_AWAY)
+    assert len(swarm) == 0
+
+
+def _args(hornet_interaction: bool) -> argparse.Namespace:
+    return simulation_arguments(
+        field_size=(400, 200),
+        hornet_count=2000,
+        hornet_velocity_range=(-3, 3),
+        hornet_collider_radius=2,
+        hornet_interaction=hornet_interaction,
+        hornet_sensing_radius=15,
+        traveler_count=2,
+        traveler_collider_radius=10,
+        seed=0,
+    )
+
+
+def test_simulator_with_interaction():
+    simulators = [Simulator.from_cli_arguments(_args(hornet_interaction=True)) for _ in range(2)]
+    ballistic = Simulator.from_cli_arguments(_args(hornet_interaction=False))
+    assert simulators[0].interaction is not None
+    assert simulators[0].interaction.separation_radius == 4
+    assert ballistic.interaction is None
+    for _ in range(50):
+        for simulator in simulators + [ballistic]:
+            simulator.tick()
+    assert np.array_equal(simulators[0].swarm.velocities, simulators[1].swarm.velocities)
+    assert not np.array_equal(simulators[0].swarm.velocities, ballistic.swarm.velocities)
+    speeds = np.hypot(*simulators[0].swarm.velocities.T)
+    assert speeds.max() <= np.hypot(3, 3) + 1e-9
+    with pytest.raises(ValueError):
+        BatchedSimulator.from_simulators(simulators)
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__]))
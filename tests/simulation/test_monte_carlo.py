@@ -0,0 +1,142 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=missing-function-docstring
+import argparse
+import math
+
+import pytest
+
+from simulation.monte_carlo import (
+    TrialResult,
+    TrialSettings,
+    crossing_estimate,
+    report,
+    run_batched_trials,
+    run_trial,
+    run_trials,
+    survival_estimate,
+    wilson_interval,
+)
+from tests.helpers import simulation_arguments
+
+
+def _args(hornet_count: int) -> argparse.Namespace:
+    return simulation_arguments(
+        field_size=(100, 50),
+        hornet_count=hornet_count,
+        traveler_collider_radius=5,
+        seed=0,
+    )
+
+
+@pytest.mark.parametrize("crossing_count", [1, 3])
+def test_run_trial_completes_crossings(crossing_count: int):
+    result = run_trial(_args(0), 0, crossing_count, float("inf"))
+    assert result.crossing_count == crossing_count
+    assert result.stung_crossing_count == 0
+    assert result.survived
+    # the traveler moves 2 units per tick across a field 100 units wide
+    assert result.iteration == pytest.approx(crossing_count * 100 / 2, abs=2 * crossing_count)
+
+
+def test_run_trial_is_reproducible():
+    assert run_trial(_args(30), 7, 3, float("inf")) == run_trial(_args(30), 7, 3, float("inf"))
+
+
+def test_run_trial_stung():
+    result = run_trial(_args(300), 0, 2, float("inf"))
+    assert not result.survived
+    assert 0 < result.stung_crossing_count <= result.crossing_count
+
+
+def test_run_trial_single_traveler():
+    args = _args(hornet_count=10)
+    args.traveler_count = 2
+    with pytest.raises(ValueError):
+        run_trial(args, seed=0, crossing_count=1, max_iteration=10)
+
+
+def test_run_trial_max_iteration():
+    result = run_trial(_args(0), 0, 1, 10)
+    assert result.iteration == 10
+    assert result.crossing_count == 0
+    assert result.collision_count == 0
+    assert not result.survived  # cut short before getting through
+
+
+@pytest.mark.parametrize("crossing_count, max_iteration", [(0, 100), (2, float("inf")), (3, 80)])
+def test_run_batched_trials_matches_run_trial(crossing_count: int, max_iteration: float):
+    seeds = list(range(10, 16))
+    expected = [run_trial(_args(15), seed, crossing_count, max_iteration) for seed in seeds]
+    assert run_batched_trials(_args(15), seeds, crossing_count, max_iteration) == expected
+
+
+@pytest.mark.parametrize("world_count", [1, 4])
+def test_run_trials(world_count: int):
+    settings = TrialSettings(crossing_count=2, max_iteration=float("inf"), world_count=world_count)
+    expected = [run_trial(_args(15), seed, 2, float("inf")) for seed in range(5)]
+    assert run_trials(_args(15), range(5), settings) == expected
+
+
+def test_run_trials_planner_is_not_batched():
+    args = _args(15)
+    args.traveler_policy = "planner"
+    settings = TrialSettings(crossing_count=2, max_iteration=float("inf"), world_count=4)
+    expected = [run_trial(args, seed, 2, float("inf")) for seed in range(5)]
+    assert run_trials(args, range(5), settings) == expected
+
+
+def test_wilson_interval():
+    low, high = wilson_interval(50, 100, 0.95)
+    assert low == pytest.approx(0.4038, abs=1e-4)
+    assert high == pytest.approx(0.5962, abs=1e-4)
+    assert wilson_interval(0, 100, 0.95)[0] == 0
+    assert wilson_interval(100, 100, 0.95)[1] == 1
+    assert wilson_interval(0, 0, 0.95) == (0.0, 1.0)
+
+
+@pytest.mark.parametrize("confidence", [0.0, 1.0, 95.0])
+def test_wilson_interval_invalid_confidence(confidence: float):
+    with pytest.raises(ValueError):
+        wilson_interval(1, 2, confidence)
+
+
+def test_estimates_and_report():
+    results = [
+        TrialResult(
+            seed=0,
+            requested_crossing_count=2,
+            crossing_count=2,
+            stung_crossing_count=0,
+            collision_count=0,
+            iteration=1,
+        ),
+        TrialResult(
+            seed=1,
+            requested_crossing_count=2,
+            crossing_count=2,
+            stung_crossing_count=1,
+            collision_count=3,
+            iteration=1,
+        ),
+        TrialResult(  # capped before the second crossing
+            seed=2,
+            requested_crossing_count=2,
+            crossing_count=1,
+            stung_crossing_count=0,
+            collision_count=0,
+            iteration=1,
+        ),
+    ]
+    survival = survival_estimate(results, 0.95)
+    assert (survival.successes, survival.total) == (1, 3)
+    crossing = crossing_estimate(results, 0.95)
+    assert (crossing.successes, crossing.total, crossing.probability) == (4, 5, 0.8)
+    assert math.isnan(survival_estimate([], 0.95).probability)
+    lines = report(results, 0.95)
+    assert lines[0] == "Trials: 3"
+    assert lines[1].startswith("Survival probability: 0.3333 (95% CI:")
+    assert lines[2].startswith("Crossing probability: 0.8000 (95% CI:")
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__]))
@@ -0,0 +1,37 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=missing-function-docstring
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from simulation.profiling import PhaseTimer
+
+
+@patch("simulation.profiling.time.perf_counter")
+def test_phase_timer(perf_counter_mock):
+    # three loops of two phases, lasting 1 and 2, 3 and 4, 5 and 6 ms
+    perf_counter_mock.side_effect = [0.0, 0.0, 0.001, 0.003, 1.0, 1.003, 1.007, 2.0, 2.005, 2.011]
+    timer = PhaseTimer(window=2)
+    for _ in range(3):
+        timer.start()
+        timer.lap("first")
+        timer.lap("second")
+    assert timer.phases == ["first", "second"]
+    percentiles = timer.percentiles([0, 50, 100])
+    assert np.allclose(percentiles["first"], [3, 4, 5])
+    assert np.allclose(percentiles["second"], [4, 5, 6])
+
+
+def test_phase_timer_summary():
+    timer = PhaseTimer()
+    assert timer.summary() == [f"{'phase (ms)':<12}{'p50':>8}{'p90':>8}{'p99':>8}"]
+    timer.start()
+    timer.lap("collisions")
+    lines = timer.summary()
+    assert len(lines) == 2
+    assert lines[1].startswith("collisions") and len(lines[1]) == len(lines[0])
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__]))
@@ -0,0 +1,91 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=missing-function-docstring
+import os
+
+import numpy as np
+import pytest
+
+from simulation.recorder import Recording, TrajectoryRecorder
+from simulation.simulator import Simulator
+from tests.helpers import simulation_arguments
+
+
+def _simulator() -> Simulator:
+    args = simulation_arguments(
+        field_size=(200, 100),
+        hornet_count=300,
+        hornet_collider_radius=3,
+        traveler_count=2,
+        traveler_collider_radius=10,
+        collision_index="grid",
+        seed=0,
+    )
+    return Simulator.from_cli_arguments(args)
+
+
+@pytest.mark.parametrize("dtype", [np.float32, np.float64])
+def test_recorder_matches_simulation(tmp_path, dtype):
+    simulator = _simulator()
+    states = []
+    with TrajectoryRecorder(str(tmp_path), np.dtype(dtype)) as recorder:
+        simulator.add_tick_listener(recorder.record)
+        for _ in range(120):
+            simulator.tick()
+            snapshot = simulator.collision_snapshot
+            states.append(
+                (
+                    simulator.swarm.positions.copy(),
+                    simulator.traveler_positions(),
+                    snapshot.colliding_idx.copy(),
+                    snapshot.colliding_travelers.copy(),
+                    simulator.collision_count,
+                )
+            )
+    assert recorder.frame_count == 120
+
+    recording = Recording(str(tmp_path))
+    assert len(recording) == 120
+    assert recording.field_size == (200, 100)
+    assert recording.column("hornet_positions").shape == (120, 300, 2)
+    assert isinstance(recording.column("hornet_positions"), np.memmap)
+    assert recording.column("iterations").tolist() == list(range(1, 121))
+    for idx, (hornets, travelers, colliding_idx, colliding_travelers, count) in enumerate(states):
+        frame = recording.frame(idx)
+        assert frame.iteration == idx + 1
+        assert np.array_equal(frame.hornet_positions, hornets.astype(dtype))
+        assert np.array_equal(frame.traveler_positions, travelers.astype(dtype))
+        assert np.array_equal(frame.colliding_idx, colliding_idx)
+        assert np.array_equal(frame.colliding_travelers, colliding_travelers)
+        assert frame.collision_count == count
+        assert np.array_equal(frame.hornet_radii, simulator.swarm.radii)
+        assert frame.traveler_radii.tolist() == [10, 10]
+    assert simulator.collision_count > 0
+
+
+def test_recorder_without_collisions(tmp_path):
+    simulator = _simulator()
+    simulator.swarm.positions[:] = 1000  # far outside of the field, away from the travelers
+    recorder = TrajectoryRecorder(os.path.join(tmp_path, "recording"))
+    recorder.record(simulator)
+    recorder.close()
+    recorder.close()
+    recording = Recording(os.path.join(tmp_path, "recording"))
+    assert len(recording) == 1
+    assert len(recording.frame(0).colliding_idx) == 0
+    assert recording.frame(0).iteration == 0
+
+
+def test_recorder_without_ticks(tmp_path):
+    simulator = _simulator()
+    with TrajectoryRecorder(os.path.join(tmp_path, "recording")) as recorder:
+        recorder.open(simulator)
+    recording = Recording(os.path.join(tmp_path, "recording"))
+    assert len(recording) == 0
+    assert tuple(recording.field_size) == tuple(simulator.field_size)
+    assert recording.column("hornet_positions").shape == (0, len(simulator.swarm), 2)
+    with pytest.raises(IndexError):
+        recording.frame(0)
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__]))
@@ -1,14 +1,16 @@
 # pylint: disable=missing-module-docstring
 # pylint: disable=missing-function-docstring
 
-import argparse
 import copy
 from itertools import chain
 
+import numpy as np
 import pytest
 
 from simulation.agents import Agent, Collider, Pose, Position, Velocity
 from simulation.simulator import Simulator
+from simulation.swarm import Swarm
+from tests.helpers import simulation_arguments
 
 
 @pytest.mark.parametrize("hornet_count", [0, 1, 10])
@@ -23,6 +25,7 @@ def test_simulator_initialization(hornet_count: int):
     assert simulator.traveler is traveler
     assert simulator.hornets is hornets
     assert len(simulator.hornets) == hornet_count
+    assert len(simulator.swarm) == hornet_count
 
 
 def test_simulator_tick():
@@ -68,6 +71,37 @@ def test_simulator_collision_count():
     assert simulator.collision_count == 4
 
 
+def test_simulator_collision_snapshot():
+    traveler = Agent(Pose(Position(5, 5)), Velocity(0, 0), Collider(1))
+    hornets = [Agent(Pose(Position(1, 1)), Velocity(0, 0), Collider(1)) for _ in range(3)]
+    simulator = Simulator(traveler, hornets, (10, 10))
+    snapshot = simulator.collision_snapshot
+    assert snapshot.iteration == 0
+    assert not snapshot.collision
+
+    simulator.hornets[0].pose.position = Position(5, 5)
+    simulator.hornets[2].pose.position = Position(5, 5)
+    simulator.tick()
+    snapshot = simulator.collision_snapshot
+    assert snapshot.iteration == 1
+    assert snapshot.collision
+    assert snapshot.colliding_idx.tolist() == [0, 2]
+    assert snapshot.new_collision_count == 2
+    with pytest.raises(ValueError):
+        snapshot.colliding_idx[0] = 1
+    assert simulator._colliding_keys.flags.writeable  # pylint: disable=protected-access
+
+    # not recomputed until the next tick or collision call
+    simulator.hornets[0].pose.position = Position(1, 1)
+    assert simulator.collision_snapshot is snapshot
+    assert simulator.collision()
+    assert simulator.collision_snapshot.colliding_idx.tolist() == [2]
+    assert simulator.collision_snapshot.new_collision_count == 0
+    simulator.tick()
+    assert simulator.collision_snapshot.new_collision_count == 0
+    assert simulator.collision_count == 2
+
+
 def test_simulator_traveler_run_count():
     traveler = Agent(Pose(Position(9, 5)), Velocity(2, 0), Collider(0))
     hornets = []
@@ -111,14 +145,50 @@ def test_do_collide():
             assert not simulator.collision()
 
 
+def test_simulator_invalid_collision_index():
+    traveler = Agent(Pose(Position(0, 0)), Velocity(0, 0), Collider(0))
+    with pytest.raises(ValueError):
+        Simulator(traveler, [], (10, 10), collision_index="kd-tree")
+
+
+@pytest.mark.parametrize("traveler_count", [1, 3])
+def test_simulator_grid_collision_index_matches_brute_force(traveler_count: int):
+    args = simulation_arguments(
+        field_size=(400, 200),
+        hornet_count=300,
+        traveler_count=traveler_count,
+        seed=0,
+    )
+    brute_force = Simulator.from_cli_arguments(args)
+    grid = Simulator(
+        copy.deepcopy(brute_force.travelers),
+        Swarm(
+            brute_force.swarm.positions.copy(),
+            brute_force.swarm.velocities.copy(),
+            brute_force.swarm.radii.copy(),
+        ),
+        args.field_size,
+        collision_index="grid",
+    )
+    for _ in range(500):
+        brute_force.tick()
+        grid.tick()
+        assert brute_force.collision() == grid.collision()
+        # pylint: disable=protected-access
+        assert np.array_equal(brute_force._colliding_keys, grid._colliding_keys)
+    assert np.array_equal(brute_force.collision_counts, grid.collision_counts)
+    assert brute_force.collision_count > 0
+
+
 def test_simulator_from_cli_arguments():
     # given
-    args = argparse.Namespace(
+    args = simulation_arguments(
         field_size=(100, 200),
         hornet_count=5,
         hornet_velocity_range=(1, 3),
         hornet_collider_radius=2,
         traveler_collider_radius=5,
+        seed=0,
     )
     # when
     simulator = Simulator.from_cli_arguments(args)
@@ -138,5 +208,199 @@ def test_simulator_from_cli_arguments():
         assert vel_min <= hornet.velocity.y <= vel_max
 
 
+def test_simulator_multiple_travelers_match_single_traveler_simulators():
+    args = simulation_arguments(
+        field_size=(300, 200),
+        traveler_count=4,
+        traveler_collider_radius=10,
+        seed=0,
+    )
+    simulator = Simulator.from_cli_arguments(args)
+    assert len(simulator.travelers) == args.traveler_count
+    assert simulator.traveler is simulator.travelers[0]
+    assert [traveler.pose.position.y for traveler in simulator.travelers] == [40, 80, 120, 160]
+    singles = [
+        Simulator(
+            copy.deepcopy(traveler),
+            Swarm(
+                simulator.swarm.positions.copy(),
+                simulator.swarm.velocities.copy(),
+                simulator.swarm.radii.copy(),
+            ),
+            args.field_size,
+        )
+        for traveler in simulator.travelers
+    ]
+    for _ in range(400):
+        simulator.tick()
+        for single in singles:
+            single.tick()
+        snapshot = simulator.collision_snapshot
+        assert snapshot.colliding_travelers.tolist() == [
+            single.collision_snapshot.collision for single in singles
+        ]
+    assert simulator.collision_counts.tolist() == [single.collision_count for single in singles]
+    assert simulator.traveler_run_counts.tolist() == [
+        single.traveler_run_count for single in singles
+    ]
+    assert simulator.collision_count == sum(single.collision_count for single in singles)
+    assert simulator.traveler_run_count == sum(single.traveler_run_count for single in singles)
+    assert simulator.collision_count > 0
+
+
+def test_simulator_without_traveler():
+    with pytest.raises(ValueError):
+        Simulator([], [], (10, 10))
+
+
+def test_simulator_from_cli_arguments_is_reproducible():
+    args = simulation_arguments(
+        field_size=(100, 200),
+        hornet_count=50,
+        hornet_velocity_range=(-3, 3),
+        hornet_collider_radius=2,
+        traveler_collider_radius=5,
+        seed=42,
+    )
+    simulators = [Simulator.from_cli_arguments(args) for _ in range(2)]
+    for _ in range(100):
+        for simulator in simulators:
+            simulator.tick()
+    assert np.array_equal(simulators[0].swarm.positions, simulators[1].swarm.positions)
+    assert np.array_equal(simulators[0].swarm.velocities, simulators[1].swarm.velocities)
+    assert simulators[0].collision_count == simulators[1].collision_count
+    args.seed = 43
+    other = Simulator.from_cli_arguments(args)
+    assert not np.array_equal(other.swarm.velocities, simulators[0].swarm.velocities)
+
+
+def test_simulator_swept_collisions():
+    # the hornet goes through the traveler between two ticks
+    def _simulator(swept_collisions: bool) -> Simulator:
+        travelers = [
+            Agent(Pose(Position(25, 50)), Velocity(0, 0), Collider(2)),
+            Agent(Pose(Position(80, 80)), Velocity(0, 0), Collider(2)),
+        ]
+        hornet = Agent(Pose(Position(10, 50)), Velocity(30, 0), Collider(2))
+        return Simulator(travelers, [hornet], (100, 100), swept_collisions=swept_collisions)
+
+    discrete, swept = _simulator(False), _simulator(True)
+    assert swept.swept_collisions and not discrete.swept_collisions
+    discrete.tick()
+    swept.tick()
+    assert discrete.collision_count == 0
+    assert swept.collision_count == 1
+    assert swept.collision_counts.tolist() == [1, 0]
+    assert swept.collision_snapshot.colliding_idx.tolist() == [0]
+
+
+def test_simulator_swept_collisions_include_discrete_collisions():
+    args = simulation_arguments(
+        field_size=(300, 200),
+        hornet_count=300,
+        hornet_velocity_range=(-8, 8),
+        hornet_collider_radius=2,
+        traveler_count=2,
+        traveler_collider_radius=5,
+        collision_index="grid",
+        seed=0,
+    )
+    discrete = Simulator.from_cli_arguments(args)
+    args.swept_collisions = True
+    swept = Simulator.from_cli_arguments(args)
+    for _ in range(300):
+        discrete.tick()
+        swept.tick()
+        # pylint: disable=protected-access
+        assert np.isin(discrete._colliding_keys, swept._colliding_keys).all()
+    assert swept.collision_count > discrete.collision_count > 0
+
+
+def test_simulator_collision_events():
+    args = simulation_arguments(
+        field_size=(300, 200),
+        hornet_count=300,
+        hornet_collider_radius=3,
+        traveler_count=3,
+        traveler_collider_radius=10,
+        collision_index="grid",
+        seed=0,
+    )
+    simulator = Simulator.from_cli_arguments(args)
+    assert simulator.collision_events is None
+    log = simulator.log_collision_events()
+    assert simulator.collision_events is log
+    pairs = set()
+    for _ in range(300):
+        simulator.tick()
+        events = log.drain()
+        assert (events["iteration"] == simulator.iteration).all()
+        assert np.array_equal(events["position"], simulator.swarm.positions[events["hornet_idx"]])
+        for event in events:
+            pair = (int(event["traveler_idx"]), int(event["hornet_idx"]))
+            if event["enter"]:
+                pairs.add(pair)
+            else:
+                pairs.remove(pair)
+            assert len(pairs) == len(set(pairs))
+        snapshot = simulator.collision_snapshot
+        assert sorted({hornet_idx for _, hornet_idx in pairs}) == snapshot.colliding_idx.tolist()
+        colliding_travelers = [idx in {idx for idx, _ in pairs} for idx in range(3)]
+        assert colliding_travelers == snapshot.colliding_travelers.tolist()
+    assert simulator.collision_count > 0
+
+
+def test_simulator_collision_events_match_collision_counts():
+    args = simulation_arguments(
+        field_size=(300, 200),
+        hornet_count=300,
+        hornet_velocity_range=(-8, 8),
+        hornet_collider_radius=2,
+        swept_collisions=True,
+        traveler_count=2,
+        traveler_collider_radius=5,
+        seed=1,
+    )
+    simulator = Simulator.from_cli_arguments(args)
+    log = simulator.log_collision_events()
+    for _ in range(300):
+        simulator.tick()
+    enters = log.events[log.events["enter"]]
+    assert len(enters) == simulator.collision_count > 0
+    counts = np.bincount(enters["traveler_idx"], minlength=2)
+    assert counts.tolist() == simulator.collision_counts.tolist()
+    exits = log.events[~log.events["enter"]]
+    assert 0 < len(exits) <= len(enters)
+
+
+@pytest.mark.parametrize("hornet_interaction", [False, True])
+def test_simulator_profile_phases(hornet_interaction: bool):
+    args = simulation_arguments(
+        field_size=(300, 200),
+        hornet_count=100,
+        hornet_collider_radius=3,
+        hornet_interaction=hornet_interaction,
+        swept_collisions=True,
+        traveler_collider_radius=10,
+        collision_index="grid",
+        seed=0,
+    )
+    profiled, reference = Simulator.from_cli_arguments(args), Simulator.from_cli_arguments(args)
+    assert profiled.phase_timer is None
+    timer = profiled.profile_phases()
+    assert profiled.phase_timer is timer
+    for _ in range(20):
+        profiled.tick()
+        reference.tick()
+    phases = ["steer", "travelers"] + (["interaction"] if hornet_interaction else [])
+    assert timer.phases == phases + ["swept", "hornets", "collisions"]
+    assert np.array_equal(profiled.swarm.positions, reference.swarm.positions)
+    assert profiled.collision_count == reference.collision_count
+    profiled.add_tick_listener(lambda _: None)
+    profiled.tick()
+    assert timer.phases[-1] == "listeners"
+    assert all(len(values) == 3 for values in timer.percentiles().values())
+
+
 if __name__ == "__main__":
     raise SystemExit(pytest.main([__file__]))
@@ -0,0 +1,114 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=missing-function-docstring
+from typing import List
+
+import numpy as np
+import pytest
+
+from simulation.spatial_hash import SpatialHash, split_coordinates
+
+
+def _brute_force(positions: np.ndarray, position: List[float], reach: float) -> List[int]:
+    distances = np.linalg.norm(positions - np.array(position), axis=1)
+    return np.flatnonzero(distances < reach).tolist()
+
+
+@pytest.mark.parametrize("cell_size", [0.0, -1.0])
+def test_spatial_hash_invalid_cell_size(cell_size: float):
+    with pytest.raises(ValueError):
+        SpatialHash((10, 10), cell_size)
+
+
+def test_spatial_hash_cell_count():
+    assert SpatialHash((100, 50), 10).cell_count == 10 * 5
+    assert SpatialHash((95, 41), 10).cell_count == 10 * 5
+    assert SpatialHash((0, 0), 10).cell_count == 1
+    assert SpatialHash((100, 50), 10).cell_size == 10
+
+
+def test_spatial_hash_empty():
+    spatial_hash = SpatialHash((100, 50), 10)
+    spatial_hash.update(np.empty((0, 2)))
+    assert spatial_hash.query([50, 25], 10).size == 0
+
+
+@pytest.mark.parametrize("reach", [1.0, 7.5, 25.0])
+def test_spatial_hash_query_is_superset_of_neighbors(reach: float):
+    rng = np.random.default_rng(0)
+    # some of the points are outside of the field
+    positions = rng.uniform(-10, 110, size=(1000, 2))
+    spatial_hash = SpatialHash((100, 100), 10)
+    spatial_hash.update(positions)
+    for position in rng.uniform(-10, 110, size=(50, 2)).tolist():
+        candidates = set(spatial_hash.query(position, reach).tolist())
+        assert set(_brute_force(positions, position, reach)) <= candidates
+        assert len(candidates) < len(positions)
+
+
+def test_spatial_hash_incremental_update():
+    rng = np.random.default_rng(1)
+    positions = rng.uniform(0, 100, size=(500, 2))
+    velocities = rng.uniform(-5, 5, size=(500, 2))
+    spatial_hash = SpatialHash((100, 100), 10)
+    for _ in range(20):
+        spatial_hash.update(positions)
+        candidates = set(spatial_hash.query([50, 50], 10).tolist())
+        assert set(_brute_force(positions, [50, 50], 10)) <= candidates
+        positions += velocities
+    spatial_hash.update(positions)
+    spatial_hash.update(positions)  # no point changed cell
+    assert set(_brute_force(positions, [50, 50], 10)) <= set(
+        spatial_hash.query([50, 50], 10).tolist()
+    )
+
+
+@pytest.mark.parametrize("radius", [4.0, 10.0])
+def test_spatial_hash_pairs_matches_brute_force(radius: float):
+    rng = np.random.default_rng(0)
+    positions = rng.uniform(-5, 105, size=(400, 2)) * [1, 0.5]
+    spatial_hash = SpatialHash((100, 50), 10)
+    spatial_hash.update(positions)
+    i, j = spatial_hash.pairs(positions, radius)
+    squared_distances = ((positions[:, np.newaxis] - positions[np.newaxis]) ** 2).sum(axis=-1)
+    expected_i, expected_j = np.nonzero(np.triu(squared_distances < radius**2, k=1))
+    assert len(i) > 0
+    assert sorted(zip(np.minimum(i, j).tolist(), np.maximum(i, j).tolist())) == sorted(
+        zip(expected_i.tolist(), expected_j.tolist())
+    )
+
+
+def test_spatial_hash_sorted_pairs_match_pairs():
+    rng = np.random.default_rng(1)
+    positions = rng.uniform(0, 100, size=(300, 2)) * [1, 0.5]
+    spatial_hash = SpatialHash((100, 50), 10)
+    spatial_hash.update(positions)
+    sorted_x, sorted_y = split_coordinates(positions, spatial_hash.order)
+    assert np.array_equal(sorted_x, positions[spatial_hash.order, 0])
+    assert np.array_equal(sorted_y, positions[spatial_hash.order, 1])
+    i, j = spatial_hash.sorted_pairs(sorted_x, sorted_y, 10)
+    expected_i, expected_j = spatial_hash.pairs(positions, 10)
+    assert np.array_equal(spatial_hash.order[i], expected_i)
+    assert np.array_equal(spatial_hash.order[j], expected_j)
+    with pytest.raises(ValueError):
+        spatial_hash.sorted_pairs(sorted_x, sorted_y, 10.5)
+
+
+def test_split_coordinates():
+    points = np.array([[1.0, 2.0], [3.0, 4.0], [5.0, 6.0]])
+    x, y = split_coordinates(points)
+    assert x.tolist() == [1, 3, 5] and y.tolist() == [2, 4, 6]
+    assert x.flags.c_contiguous and y.flags.c_contiguous
+    x, y = split_coordinates(points, np.array([2, 0]))
+    assert x.tolist() == [5, 1] and y.tolist() == [6, 2]
+
+
+def test_spatial_hash_pairs_radius_larger_than_cell():
+    spatial_hash = SpatialHash((100, 50), 10)
+    spatial_hash.update(np.zeros((0, 2)))
+    assert [len(idx) for idx in spatial_hash.pairs(np.zeros((0, 2)), 10)] == [0, 0]
+    with pytest.raises(ValueError):
+        spatial_hash.pairs(np.zeros((0, 2)), 10.5)
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__]))
@@ -0,0 +1,208 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=missing-function-docstring
+import copy
+from typing import List, Tuple
+
+import numpy as np
+import pytest
+
+from simulation.agents import Agent, Collider, Pose, Position, Velocity
+from simulation.swarm import Swarm
+
+
+def _agents() -> List[Agent]:
+    return [
+        Agent(Pose(Position(9, 5)), Velocity(1, 1), Collider(1)),
+        Agent(Pose(Position(6.5, 10)), Velocity(2.5, -1.0), Collider(2)),
+        Agent(Pose(Position(1, 1)), Velocity(-2, -2), Collider(0)),
+    ]
+
+
+def test_swarm_from_agents():
+    agents = _agents()
+    swarm = Swarm.from_agents(agents)
+    assert len(swarm) == len(agents)
+    for idx, agent in enumerate(agents):
+        assert swarm.positions[idx].tolist() == agent.pose.position.as_list()
+        assert swarm.velocities[idx].tolist() == agent.velocity.as_list()
+        assert swarm.radii[idx] == agent.collider.radius
+
+
+def test_swarm_empty():
+    swarm = Swarm.from_agents([])
+    assert len(swarm) == 0
+    assert swarm.positions.shape == (0, 2)
+    swarm.update((10, 10))
+
+
+def test_swarm_random():
+    swarm = Swarm.random(1000, (100, 50), (-2.0, 3.0), 4.0, np.random.default_rng(0))
+    assert len(swarm) == 1000
+    assert ((swarm.positions >= 0) & (swarm.positions < (100, 50))).all()
+    assert ((swarm.velocities >= -2.0) & (swarm.velocities <= 3.0)).all()
+    assert (swarm.radii == 4.0).all()
+    other = Swarm.random(1000, (100, 50), (-2.0, 3.0), 4.0, np.random.default_rng(0))
+    assert np.array_equal(swarm.positions, other.positions)
+    assert np.array_equal(swarm.velocities, other.velocities)
+    with pytest.raises(ValueError):
+        Swarm.random(1, (100, 50), (-2.0, 3.0), -1.0, np.random.default_rng(0))
+
+
+@pytest.mark.parametrize(
+    "positions, velocities, radii",
+    [
+        [np.zeros((2, 2)), np.zeros((3, 2)), np.zeros(2)],
+        [np.zeros((2, 2)), np.zeros((2, 2)), np.zeros(3)],
+        [np.zeros((2, 2)), np.zeros((2, 2)), -np.ones(2)],
+    ],
+)
+def test_swarm_invalid_arrays(positions: np.ndarray, velocities: np.ndarray, radii: np.ndarray):
+    with pytest.raises(ValueError):
+        Swarm(positions, velocities, radii)
+
+
+@pytest.mark.parametrize("field_size", [(50, 50), (10, 10)])
+def test_swarm_update_matches_agent_update(field_size: Tuple[int, int]):
+    agents = _agents()
+    swarm = Swarm.from_agents(agents)
+    for _ in range(20):
+        swarm.update(field_size)
+        for agent in agents:
+            agent.update(field_size)
+    for idx, agent in enumerate(agents):
+        assert swarm.positions[idx].tolist() == agent.pose.position.as_list()
+        assert swarm.velocities[idx].tolist() == agent.velocity.as_list()
+
+
+def test_swarm_bind():
+    agents = _agents()
+    swarm = Swarm.from_agents(agents)
+    swarm.bind(agents)
+    swarm.update((10, 10))
+    assert agents[0].pose.position == Position(10, 6)
+    agents[1].pose.position = Position(3, 4)
+    agents[1].velocity.x = 7
+    agents[2].collider.radius = 5
+    assert swarm.positions[1].tolist() == [3, 4]
+    assert swarm.velocities[1, 0] == 7
+    assert swarm.radii[2] == 5
+
+
+@pytest.mark.parametrize("traveler_radius", [0.0, 5.0, 20.0])
+def test_swarm_colliding_matches_does_collide(traveler_radius: float):
+    rng = np.random.default_rng(0)
+    positions = rng.uniform(0, 100, size=(500, 2))
+    radii = rng.uniform(0, 5, size=500)
+    swarm = Swarm(positions, np.zeros((500, 2)), radii)
+    traveler = Agent(Pose(Position(50, 50)), Velocity(0, 0), Collider(traveler_radius))
+    expected = [idx for idx, hornet in enumerate(swarm.agents()) if traveler.does_collide(hornet)]
+    actual = swarm.colliding(traveler.pose.position.as_list(), traveler.collider.radius)
+    assert actual.tolist() == expected
+
+
+@pytest.mark.parametrize("with_candidates", [False, True])
+def test_swarm_colliding_pairs_matches_colliding(with_candidates: bool):
+    rng = np.random.default_rng(0)
+    swarm = Swarm(rng.uniform(0, 100, size=(500, 2)), np.zeros((500, 2)), rng.uniform(0, 5, 500))
+    positions = rng.uniform(0, 100, size=(6, 2))
+    radii = rng.uniform(0, 20, size=6)
+    candidates = rng.permutation(500)[:300] if with_candidates else None
+    circle_idx, hornet_idx = swarm.colliding_pairs(positions, radii, candidates)
+    expected = [
+        swarm.colliding(position, radius, candidates) for position, radius in zip(positions, radii)
+    ]
+    assert len(hornet_idx) > 0
+    for idx, colliding in enumerate(expected):
+        assert hornet_idx[circle_idx == idx].tolist() == colliding.tolist()
+
+
+def test_swarm_colliding_does_not_touch_positions():
+    swarm = Swarm.from_agents(_agents())
+    positions = swarm.positions.copy()
+    assert swarm.colliding([9, 5], 1).tolist() == [0]
+    assert np.array_equal(swarm.positions, positions)
+
+
+def _substep_contact_times(
+    swarm: Swarm, circle: Agent, field_size: Tuple[int, int], horizon: int, substeps: int
+) -> np.ndarray:
+    swarm = Swarm(swarm.positions.copy(), swarm.velocities.copy(), swarm.radii)
+    circle = copy.deepcopy(circle)
+    times = np.full(len(swarm), np.inf)
+    fractions = np.linspace(0, 1, substeps + 1)[:, np.newaxis]
+    for tick in range(horizon):
+        delta = swarm.positions - circle.pose.position.as_ndarray()
+        velocity = swarm.velocities - circle.velocity.as_ndarray()
+        delta_x = delta[:, 0] + fractions * velocity[:, 0]
+        delta_y = delta[:, 1] + fractions * velocity[:, 1]
+        inside = np.hypot(delta_x, delta_y) < swarm.radii + circle.collider.radius
+        first = np.where(inside.any(axis=0), inside.argmax(axis=0) / substeps + tick, np.inf)
+        times = np.minimum(times, first)
+        swarm.update(field_size)
+        circle.update(field_size)
+    return times
+
+
+def test_swarm_time_to_contact_matches_substeps():
+    rng = np.random.default_rng(0)
+    field_size = (100, 80)
+    swarm = Swarm(
+        Position.random_positions(field_size, 300, rng),
+        Velocity.random_velocities((-8, 8), 300, rng),
+        rng.uniform(0, 3, 300),
+    )
+    positions = swarm.positions.copy()
+    circle = Agent(Pose(Position(50, 40)), Velocity(3, -7), Collider(5))
+    times = swarm.time_to_contact([50, 40], [3, -7], 5, field_size, horizon=12)
+    expected = _substep_contact_times(swarm, circle, field_size, horizon=12, substeps=1000)
+    assert np.array_equal(swarm.positions, positions)
+    assert np.isfinite(expected).sum() > 20
+    assert np.array_equal(np.isfinite(times), np.isfinite(expected))
+    finite = np.isfinite(times)
+    assert (times[finite] <= expected[finite]).all()
+    assert (expected[finite] - times[finite] <= 1e-3).all()
+
+
+def test_swarm_time_to_contact_between_ticks():
+    # the hornet jumps over the circle: no overlap at any tick, a contact in between
+    swarm = Swarm(np.array([[10.0, 50.0], [90.0, 50.0]]), np.array([[30.0, 0], [0, 0]]), [2, 2])
+    times = swarm.time_to_contact([25, 50], [0, 0], 2, (100, 100), horizon=3)
+    assert times[0] == pytest.approx(11 / 30)
+    assert times[1] == np.inf
+    assert len(swarm.colliding([25, 50], 2)) == 0
+    swarm.update((100, 100))
+    assert len(swarm.colliding([25, 50], 2)) == 0
+    assert (
+        swarm.time_to_contact([25, 50], [0, 0], 2, (100, 100), horizon=0).tolist() == [np.inf] * 2
+    )
+    with pytest.raises(ValueError):
+        swarm.time_to_contact([25, 50], [0, 0], 2, (100, 100), horizon=-1)
+
+
+def test_swarm_agent_view():
+    swarm = Swarm.from_agents(_agents())
+    agent = swarm.agent(1)
+    assert agent.pose.position.as_list() == [6.5, 10]
+    assert agent.velocity.as_list() == [2.5, -1.0]
+    assert agent.collider.radius == 2
+    agent.pose.position.y = 3
+    agent.velocity.y = 4
+    assert swarm.positions[1, 1] == 3
+    assert swarm.velocities[1, 1] == 4
+    assert len(swarm.agents()) == len(swarm)
+
+
+def test_swarm_view_copy_is_a_snapshot():
+    swarm = Swarm.from_agents(_agents())
+    agent = swarm.agent(0)
+    position = copy.copy(agent.pose.position)
+    velocity = copy.copy(agent.velocity)
+    swarm.update((100, 100))
+    assert type(position) is Position  # pylint: disable=unidiomatic-typecheck
+    assert type(velocity) is Velocity  # pylint: disable=unidiomatic-typecheck
+    assert position != agent.pose.position
+    assert velocity == Velocity(1, 1)
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__]))
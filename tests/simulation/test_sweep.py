@@ -0,0 +1,88 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=missing-function-docstring
+import argparse
+from typing import List
+
+import pytest
+
+from simulation.monte_carlo import TrialSettings
+from simulation.sweep import chunk_size, describe, parse_sweep, run_sweep, sweep_points
+from tests.helpers import simulation_arguments
+
+
+def _args() -> argparse.Namespace:
+    return simulation_arguments(
+        field_size=(100, 50),
+        hornet_count=20,
+        traveler_collider_radius=5,
+        seed=0,
+    )
+
+
+def test_parse_sweep():
+    assert parse_sweep("hornet-count=1,2") == ("hornet_count", [1, 2])
+    assert parse_sweep("hornet-collider-radius=0.5,2") == ("hornet_collider_radius", [0.5, 2])
+    assert parse_sweep("hornet-velocity-range=-5:5,-2.5:2.5") == (
+        "hornet_velocity_range",
+        [(-5, 5), (-2.5, 2.5)],
+    )
+    assert parse_sweep("collision-index=grid") == ("collision_index", ["grid"])
+
+
+@pytest.mark.parametrize("spec", ["hornet-count", "=1,2", "hornet-count="])
+def test_parse_sweep_invalid(spec: str):
+    with pytest.raises(ValueError):
+        parse_sweep(spec)
+
+
+def test_sweep_points():
+    args = _args()
+    sweeps = {"hornet_count": [1, 2, 3], "hornet_collider_radius": [1.0, 2.0]}
+    points = sweep_points(args, sweeps)
+    assert len(points) == 6
+    assert [(p.hornet_count, p.hornet_collider_radius) for p in points[:2]] == [(1, 1.0), (1, 2.0)]
+    assert args.hornet_count == 20
+    assert describe(points[-1], sweeps) == "hornet_count=3 hornet_collider_radius=2.0"
+    assert len(sweep_points(args, {})) == 1
+
+
+def test_sweep_points_unknown_argument():
+    with pytest.raises(ValueError):
+        sweep_points(_args(), {"hornet_speed": [1]})
+
+
+def _sorted_results(workers: int, world_count: int = 1) -> List:
+    points = sweep_points(_args(), {"hornet_count": [0, 40]})
+    settings = TrialSettings(2, float("inf"), world_count)
+    results = list(run_sweep(points, range(3, 7), settings, workers))
+    assert len(results) == 2 * 4
+    return sorted(results, key=lambda item: (item[0], item[1].seed))
+
+
+@pytest.mark.parametrize(
+    "point_count, seed_count, world_count, workers, expected",
+    [
+        (1, 1000, 256, 1, 256),
+        (1, 1000, 256, 8, 125),  # every worker gets a batch
+        (1, 10_000, 256, 8, 256),
+        (3, 1000, 1, 1, 1),
+        (3, 1000, 1, 4, 46),
+        (1, 10, 1, 4, 1),
+    ],
+)
+def test_chunk_size(point_count: int, seed_count: int, world_count: int, workers: int, expected):
+    settings = TrialSettings(crossing_count=1, max_iteration=10, world_count=world_count)
+    assert chunk_size(point_count, seed_count, settings, workers) == expected
+
+
+def test_run_sweep_does_not_depend_on_workers():
+    sequential = _sorted_results(workers=1)
+    assert sequential == _sorted_results(workers=2)
+    assert sequential == _sorted_results(workers=1, world_count=3)
+    assert sequential == _sorted_results(workers=2, world_count=3)
+    assert [result.seed for _, result in sequential] == 2 * [3, 4, 5, 6]
+    assert all(result.survived for point_idx, result in sequential if point_idx == 0)
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__]))
@@ -0,0 +1,140 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=missing-function-docstring
+import argparse
+
+import numpy as np
+import pytest
+
+from simulation.agents import Agent, Collider, Pose, Position, Velocity
+from simulation.batched_simulator import BatchedSimulator
+from simulation.simulator import Simulator
+from simulation.swarm import Swarm
+from simulation.traveler_policy import (
+    DensityGrid,
+    DensityPlanner,
+    PlannerConfig,
+    StraightPolicy,
+    TravelerPolicy,
+)
+from tests.helpers import simulation_arguments
+
+
+def _counts(positions: np.ndarray, field_size, cell_size: float) -> np.ndarray:
+    width, height = field_size
+    columns, rows = int(np.ceil(width / cell_size)), int(np.ceil(height / cell_size))
+    counts, _, _ = np.histogram2d(
+        np.clip(positions[:, 1] // cell_size, 0, rows - 1),
+        np.clip(positions[:, 0] // cell_size, 0, columns - 1),
+        bins=(rows, columns),
+        range=((0, rows), (0, columns)),
+    )
+    return counts
+
+
+def test_traveler_policy_is_abstract():
+    # pylint: disable=abstract-class-instantiated
+    with pytest.raises(TypeError):
+        TravelerPolicy()  # type: ignore[abstract]
+
+
+def test_density_grid_invalid_cell_size():
+    with pytest.raises(ValueError):
+        DensityGrid((100, 100), 0)
+
+
+def test_density_grid_incremental_update():
+    rng = np.random.default_rng(0)
+    field_size = (230, 170)
+    grid = DensityGrid(field_size, 20)
+    swarm = Swarm.random(500, field_size, (-6, 6), 1, rng)
+    for _ in range(30):
+        grid.update(swarm.positions)
+        assert np.array_equal(grid.counts, _counts(swarm.positions, field_size, 20))
+        swarm.update(field_size)
+    # a different hornet count is counted from scratch
+    grid.update(swarm.positions[:10])
+    assert grid.counts.sum() == 10
+
+
+@pytest.mark.parametrize("cell_size, lookahead, detour_cost", [(0, 1, 0), (10, 0, 0), (10, 1, -1)])
+def test_planner_config_invalid(cell_size: float, lookahead: int, detour_cost: float):
+    with pytest.raises(ValueError):
+        PlannerConfig(cell_size, lookahead, detour_cost)
+
+
+def _traveler(x: float, y: float, velocity_x: float) -> Agent:
+    return Agent(Pose(Position(x, y)), Velocity(velocity_x, 0), Collider(5))
+
+
+def _wall(x: float, height: int, gap_y: float) -> Swarm:
+    # a column of hornets every 10 units, but for a gap around gap_y
+    ys = np.array([y for y in range(5, height, 10) if abs(y - gap_y) > 20], dtype=float)
+    positions = np.stack([np.full(len(ys), x), ys], axis=1)
+    return Swarm(positions, np.zeros(positions.shape), np.ones(len(ys)))
+
+
+@pytest.mark.parametrize("velocity_x", [2, -2])
+def test_planner_steers_toward_gap(velocity_x: float):
+    field_size = (400, 200)
+    planner = DensityPlanner(field_size, PlannerConfig(cell_size=20, lookahead=4))
+    assert planner.config.lookahead == 4
+    assert planner.grid.cell_size == 20
+    wall_x = 250 if velocity_x > 0 else 150
+    swarm = _wall(wall_x, field_size[1], gap_y=150)
+    traveler = _traveler(200, 100, velocity_x)
+    ys = []
+    for _ in range(30):
+        planner.steer([traveler], swarm)
+        assert abs(traveler.velocity.y) <= abs(velocity_x)
+        traveler.update(field_size)
+        ys.append(traveler.pose.position.y)
+    assert traveler.velocity.x == velocity_x
+    assert abs(ys[-1] - 150) <= 10
+
+
+def test_planner_keeps_course_without_hornets():
+    planner = DensityPlanner((400, 200), PlannerConfig(cell_size=20))
+    swarm = Swarm(np.zeros((0, 2)), np.zeros((0, 2)), [])
+    traveler = _traveler(100, 110, 2)
+    planner.steer([traveler], swarm)
+    assert traveler.velocity.as_list() == [2, 0]
+    # nothing ahead at the wall
+    traveler = _traveler(399, 100, 2)
+    traveler.velocity.y = 1
+    planner.steer([traveler], swarm)
+    assert traveler.velocity.y == 0
+
+
+def _args(traveler_policy: str) -> argparse.Namespace:
+    return simulation_arguments(
+        field_size=(400, 200),
+        hornet_count=300,
+        hornet_velocity_range=(-3, 3),
+        hornet_collider_radius=2,
+        traveler_policy=traveler_policy,
+        planner_cell_size=20,
+        traveler_count=2,
+        traveler_collider_radius=10,
+        collision_index="grid",
+        seed=0,
+    )
+
+
+def test_simulator_with_planner():
+    simulator = Simulator.from_cli_arguments(_args("planner"))
+    straight = Simulator.from_cli_arguments(_args("straight"))
+    assert isinstance(simulator.policy, DensityPlanner)
+    assert isinstance(straight.policy, StraightPolicy)
+    for _ in range(450):
+        simulator.tick()
+        straight.tick()
+        for traveler in simulator.travelers:
+            assert 0 <= traveler.pose.position.y <= 200
+    # steering does not count as a run, nor slow down the crossings
+    assert simulator.traveler_run_counts.tolist() == straight.traveler_run_counts.tolist() == [2, 2]
+    with pytest.raises(ValueError):
+        BatchedSimulator.from_simulators([simulator])
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__]))
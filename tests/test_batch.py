@@ -0,0 +1,24 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=missing-function-docstring
+import subprocess
+
+import pytest
+
+
+def test_batch_entry_point_script_smoke_test():
+    cmd = ["python3", "-m", "batch", "--trial-count", "5", "--field-size", "100", "50"]
+    result = subprocess.run(cmd, capture_output=True, check=False, text=True)
+    assert result.returncode == 0
+    assert "Trials: 5" in result.stdout
+    assert "Survival probability" in result.stdout
+    assert "Crossing probability" in result.stdout
+
+
+def test_batch_does_not_import_pygame():
+    code = "import sys, batch; sys.exit('pygame' in sys.modules)"
+    result = subprocess.run(["python3", "-c", code], capture_output=True, check=False)
+    assert result.returncode == 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__]))
@@ -0,0 +1,36 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=missing-function-docstring
+import json
+import subprocess
+
+import pytest
+
+# on top of numpy, importing every simulation module (and the standard modules they need)
+# takes about 70 ms on a single core CI runner
+SIMULATION_IMPORT_BUDGET_S = 0.25
+
+_CODE = """
+import json, sys, time
+start = time.perf_counter()
+import numpy
+numpy_s = time.perf_counter() - start
+import simulation.arguments, simulation.batched_simulator, simulation.checkpoint
+import simulation.events, simulation.monte_carlo, simulation.recorder, simulation.sweep
+simulation_s = time.perf_counter() - start - numpy_s
+modules = [name for name in sys.modules if name.split(".")[0] in ("pygame", "visualization")]
+print(json.dumps({"numpy_s": numpy_s, "simulation_s": simulation_s, "modules": modules}))
+"""
+
+
+def test_simulation_import_time():
+    # best of a few runs: the first one may include writing the bytecode caches
+    runs = [
+        json.loads(subprocess.run(["python3", "-c", _CODE], capture_output=True, check=True).stdout)
+        for _ in range(3)
+    ]
+    assert all(not run["modules"] for run in runs)
+    assert min(run["simulation_s"] for run in runs) < SIMULATION_IMPORT_BUDGET_S
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__]))
@@ -2,7 +2,9 @@
 # pylint: disable=missing-function-docstring
 import os
 import subprocess
+from typing import List
 
+import numpy as np
 import pytest
 
 
@@ -12,6 +14,57 @@ def test_main_entry_point_script_smoke_test():
     assert result.returncode == 0
 
 
+def test_main_entry_point_script_headless():
+    cmd = ["python3", "-m", "main", "--headless"]
+    result = subprocess.run(cmd, capture_output=True, check=False)
+    assert result.returncode != 0
+
+    cmd.extend(["--max-iteration", str(300)])
+    result = subprocess.run(cmd, capture_output=True, check=False, text=True)
+    assert result.returncode == 0
+    assert "Iteration:          300 / 300.0" in result.stderr
+
+    cmd.append("--save-to-file")
+    result = subprocess.run(cmd, capture_output=True, check=False)
+    assert result.returncode != 0
+
+
+def test_main_entry_point_script_dirty_rects():
+    cmd = ["python3", "-m", "main", "--dirty-rects", "--hornet-count", "20"]
+    cmd.extend(["--max-iteration", str(10)])
+    result = subprocess.run(cmd, capture_output=True, check=False, text=True)
+    assert result.returncode == 0
+    assert "Iteration:           10 / 10.0" in result.stderr
+
+
+def test_main_entry_point_script_heatmap():
+    cmd = ["python3", "-m", "main", "--hornet-count", "2000", "--heatmap-hornet-count", "1000"]
+    cmd.extend(["--max-iteration", str(10)])
+    result = subprocess.run(cmd, capture_output=True, check=False, text=True)
+    assert result.returncode == 0
+    assert "Iteration:           10 / 10.0" in result.stderr
+
+
+def test_main_headless_does_not_import_pygame():
+    code = (
+        "import sys, main; main.main(['--headless', '--max-iteration', '10']); "
+        "sys.exit('pygame' in sys.modules)"
+    )
+    result = subprocess.run(["python3", "-c", code], capture_output=True, check=False)
+    assert result.returncode == 0
+
+
+def test_main_entry_point_script_render_every():
+    cmd = ["python3", "-m", "main", "--render-every", "7", "--max-iteration", str(10)]
+    result = subprocess.run(cmd, capture_output=True, check=False, text=True)
+    assert result.returncode == 0
+    assert "Iteration:           10 / 10.0" in result.stderr
+
+    cmd = ["python3", "-m", "main", "--render-every", "0", "--max-iteration", str(10)]
+    result = subprocess.run(cmd, capture_output=True, check=False)
+    assert result.returncode != 0
+
+
 def _contains_png(dir_path: str):
     for filename in os.listdir(dir_path):
         if filename.lower().endswith(".png"):
@@ -37,5 +90,121 @@ def test_main_entry_point_script_file_save(tmp_path: str):
     assert _contains_png(tmp_path)
 
 
+@pytest.mark.parametrize("save_format", ["gif", "y4m"])
+def test_main_entry_point_script_video_save(tmp_path: str, save_format: str):
+    cmd = ["python3", "-m", "main", "--save-to-file", "--output-dir", str(tmp_path)]
+    cmd.extend(["--save-format", save_format, "--max-iteration", str(3)])
+    result = subprocess.run(cmd, capture_output=True, check=False)
+    assert result.returncode == 0
+    assert os.listdir(tmp_path) == [f"hornet_field.{save_format}"]
+
+
+def test_main_entry_point_script_video_save_requires_frame_rate(tmp_path: str):
+    kept_file_path = os.path.join(tmp_path, "kept.txt")
+    with open(kept_file_path, "w", encoding="utf-8") as kept_file:
+        kept_file.write("kept")
+    cmd = ["python3", "-m", "main", "--save-to-file", "--output-dir", str(tmp_path)]
+    cmd.extend(["--save-format", "gif", "--frame-rate", "0", "--max-iteration", str(3)])
+    result = subprocess.run(cmd, capture_output=True, check=False, text=True)
+    assert result.returncode != 0
+    assert "--frame-rate must be positive" in result.stderr
+    assert os.listdir(tmp_path) == ["kept.txt"]  # rejected before the directory is cleared
+
+
+def _last_hud(stderr: str) -> List[str]:
+    # but the time, which differs from run to run
+    lines = [line.split("Last HUD: ")[-1] for line in stderr.splitlines() if "Last HUD" in line]
+    return [line for line in lines if not line.startswith("Time")]
+
+
+def test_main_entry_point_script_checkpoint_and_resume(tmp_path: str):
+    cmd = ["python3", "-m", "main", "--headless", "--hornet-count", "2000", "--seed", "3"]
+    cmd.extend(["--checkpoint-every", "10", "--checkpoint-dir", str(tmp_path)])
+    cmd.extend(["--max-iteration", "30"])
+    result = subprocess.run(cmd, capture_output=True, check=False, text=True)
+    assert result.returncode == 0
+    expected = _last_hud(result.stderr)
+    assert sorted(os.listdir(tmp_path)) == [f"checkpoint_000000{idx}0.hfc" for idx in (1, 2, 3)]
+
+    cmd = ["python3", "-m", "main", "--headless", "--max-iteration", "30"]
+    cmd.extend(["--resume", os.path.join(tmp_path, "checkpoint_00000010.hfc")])
+    result = subprocess.run(cmd, capture_output=True, check=False, text=True)
+    assert result.returncode == 0
+    assert "Resumed simulation at iteration 10" in result.stderr
+    assert _last_hud(result.stderr) == expected
+
+
+def test_main_entry_point_script_record_and_replay(tmp_path: str):
+    recording_dir = os.path.join(tmp_path, "recording")
+    cmd = ["python3", "-m", "main", "--headless", "--hornet-count", "500", "--max-iteration", "20"]
+    cmd.extend(["--record", recording_dir])
+    result = subprocess.run(cmd, capture_output=True, check=False, text=True)
+    assert result.returncode == 0
+    assert "Recorded 20 frame(s)" in result.stderr
+
+    cmd = ["python3", "-m", "main", "--replay", recording_dir, "--headless"]
+    result = subprocess.run(cmd, capture_output=True, check=False, text=True)
+    assert result.returncode != 0
+
+    cmd = ["python3", "-m", "main", "--replay", recording_dir, "--save-to-file"]
+    output_dir = os.path.join(tmp_path, "output")
+    cmd.extend(["--save-format", "gif", "--output-dir", output_dir])
+    result = subprocess.run(cmd, capture_output=True, check=False, text=True)
+    assert result.returncode == 0
+    assert os.listdir(output_dir) == ["hornet_field.gif"]
+    assert "Iteration:           20" in result.stderr
+
+    cmd = ["python3", "-m", "main", "--replay", recording_dir, "--save-to-file"]
+    cmd.extend(["--output-dir", output_dir, "--max-iteration", "5", "--render-every", "3"])
+    result = subprocess.run(cmd, capture_output=True, check=False, text=True)
+    assert result.returncode == 0
+    assert sorted(os.listdir(output_dir)) == [f"frame_{idx:05}.png" for idx in (0, 3, 4)]
+    assert "Iteration:            5" in result.stderr
+
+
+def test_main_entry_point_script_replay_empty_recording(tmp_path: str):
+    recording_dir = os.path.join(tmp_path, "recording")
+    cmd = ["python3", "-m", "main", "--headless", "--max-iteration", "0"]
+    cmd.extend(["--record", recording_dir])
+    result = subprocess.run(cmd, capture_output=True, check=False, text=True)
+    assert result.returncode == 0
+    assert "Recorded 0 frame(s)" in result.stderr
+
+    cmd = ["python3", "-m", "main", "--replay", recording_dir]
+    result = subprocess.run(cmd, capture_output=True, check=False, text=True)
+    assert result.returncode == 0
+    assert "empty recording" in result.stderr
+
+
+def test_main_entry_point_script_collision_events(tmp_path: str):
+    file_path = os.path.join(tmp_path, "events.npy")
+    cmd = ["python3", "-m", "main", "--headless", "--max-iteration", "300"]
+    cmd.extend(["--collision-events", file_path])
+    result = subprocess.run(cmd, capture_output=True, check=False, text=True)
+    assert result.returncode == 0
+    events = np.load(file_path)
+    assert f"collision count: {np.count_nonzero(events['enter']):>6}" in result.stderr
+    assert (np.diff(events["iteration"]) >= 0).all()
+
+
+def test_main_entry_point_script_profile_every():
+    cmd = ["python3", "-m", "main", "--headless", "--max-iteration", "300"]
+    cmd.extend(["--profile-every", "100"])
+    result = subprocess.run(cmd, capture_output=True, check=False, text=True)
+    assert result.returncode == 0
+    for iteration in (100, 200, 300):
+        assert f"Iteration {iteration} phase timing: collisions" in result.stderr
+    assert "Last HUD: phase (ms)" in result.stderr
+
+    cmd = ["python3", "-m", "main", "--max-iteration", "10", "--profile-every", "5"]
+    result = subprocess.run(cmd, capture_output=True, check=False, text=True)
+    assert result.returncode == 0
+    assert "Last HUD: flip" in result.stderr
+
+    cmd = ["python3", "-m", "main", "--max-iteration", "10", "--profile-every", "-1"]
+    result = subprocess.run(cmd, capture_output=True, check=False)
+    assert result.returncode != 0
+
+
 if __name__ == "__main__":
     raise SystemExit(pytest.main([__file__]))
@@ -2,7 +2,7 @@
 # pylint: disable=missing-function-docstring
 import pytest
 
-from visualization.colors import darken_color, lighten_color
+from visualization.colors import AgentColors, Palette, darken_color, lighten_color
 
 
 def test_lighten_color():
@@ -17,5 +17,18 @@ def test_darken_color():
     assert darken_color((100, 100, 100), 1) == (0, 0, 0)
 
 
+def test_palette_from_colors():
+    palette = Palette.from_colors(
+        surface=(1, 2, 3),
+        hornet=(100, 100, 100),
+        traveler=(0, 0, 0),
+        traveler_collision=(255, 0, 0),
+    )
+    assert palette.surface == (1, 2, 3)
+    assert palette.hornet == AgentColors(fill=(177, 177, 177), center=(50, 50, 50))
+    assert palette.traveler == AgentColors(fill=(127, 127, 127), center=(0, 0, 0))
+    assert palette.traveler_collision == AgentColors(fill=(255, 127, 127), center=(127, 0, 0))
+
+
 if __name__ == "__main__":
     raise SystemExit(pytest.main([__file__]))
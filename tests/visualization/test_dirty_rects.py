@@ -0,0 +1,58 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=missing-function-docstring
+import numpy as np
+import pytest
+
+from visualization.dirty_rects import DirtyRects, clip_rects
+
+
+def test_dirty_rects_update():
+    dirty_rects = DirtyRects(max_rects=6)
+    rects = np.array([[0, 0, 5, 5], [10, 10, 5, 5], [20, 20, 3, 3]])
+    keys = np.array([1, 1, 2])
+    no_overlay = np.empty((0, 4), dtype=int)
+    assert dirty_rects.update(rects, keys, no_overlay) is None  # first frame
+    assert len(dirty_rects.update(rects.copy(), keys, no_overlay)) == 0
+
+    moved = rects.copy()
+    moved[1, :2] = (11, 12)
+    overlay = np.array([[0, 0, 30, 8]])
+    dirty = dirty_rects.update(moved, keys, overlay)
+    assert dirty.tolist() == [[10, 10, 5, 5], [11, 12, 5, 5], [0, 0, 30, 8]]
+    recolored = np.array([1, 1, 3])
+    dirty = dirty_rects.update(moved, recolored, overlay)
+    assert dirty.tolist() == [[20, 20, 3, 3], [20, 20, 3, 3], [0, 0, 30, 8], [0, 0, 30, 8]]
+
+    assert dirty_rects.update(rects, recolored, overlay) is not None
+    assert dirty_rects.update(rects + 1, recolored, overlay) is None  # 8 rectangles
+    assert dirty_rects.update(rects[:2], recolored[:2], overlay) is None  # fewer sprites
+    dirty_rects.update(rects[:2], recolored[:2], overlay)
+    dirty_rects.reset()
+    assert dirty_rects.update(rects[:2], recolored[:2], overlay) is None
+    assert dirty_rects.max_rects == 6
+
+
+def test_dirty_rects_invalid_max_rects():
+    with pytest.raises(ValueError):
+        DirtyRects(max_rects=0)
+
+
+def test_dirty_rects_redraws():
+    rects = np.array([[0, 0, 10, 10], [5, 5, 10, 10], [50, 50, 4, 4], [8, 0, 4, 4]])
+    dirty = np.array([[6, 6, 2, 2], [9, 2, 20, 2], [40, 40, 1, 1]])
+    sprite_idx, parts = DirtyRects.redraws(rects, dirty)
+    # in drawing order, each sprite clipped to the dirty rectangles
+    assert sprite_idx.tolist() == [0, 0, 1, 3]
+    assert parts.tolist() == [[6, 6, 2, 2], [9, 2, 1, 2], [6, 6, 2, 2], [9, 2, 3, 2]]
+    sprite_idx, parts = DirtyRects.redraws(rects, np.empty((0, 4), dtype=int))
+    assert len(sprite_idx) == 0 and parts.shape == (0, 4)
+
+
+def test_clip_rects():
+    rects = np.array([[-6, 17, 11, 11], [55, -2, 10, 4], [-5, 0, 5, 5], [10, 10, 3, 3]])
+    clipped = clip_rects(rects, (60, 20))
+    assert clipped.tolist() == [[0, 17, 5, 3], [55, 0, 5, 2], [10, 10, 3, 3]]
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__]))
@@ -0,0 +1,92 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=missing-function-docstring
+import logging
+import os
+
+import numpy as np
+import pygame
+import pytest
+
+from visualization.frame_writer import FrameWriter
+from visualization.video import Y4MWriter
+
+
+def _frame(value: int) -> np.ndarray:
+    frame = np.zeros((10, 20, 3), dtype=np.uint8)
+    frame[:, :, 0] = value
+    return frame
+
+
+@pytest.mark.parametrize("max_pending, workers", [(1, 1), (2, 3)])
+def test_frame_writer_saves_frames(tmp_path: str, max_pending: int, workers: int):
+    file_paths = [os.path.join(tmp_path, f"frame_{idx:05}.png") for idx in range(10)]
+    with FrameWriter(max_pending=max_pending, workers=workers) as frame_writer:
+        for idx, file_path in enumerate(file_paths):
+            frame_writer.submit(_frame(10 * idx), file_path)
+    assert frame_writer.written_count == len(file_paths)
+    assert not frame_writer.errors
+    for idx, file_path in enumerate(file_paths):
+        surface = pygame.image.load(file_path)
+        assert surface.get_size() == (20, 10)
+        assert tuple(surface.get_at((3, 4)))[:3] == (10 * idx, 0, 0)
+
+
+def test_frame_writer_reports_errors(tmp_path: str, caplog: pytest.LogCaptureFixture):
+    missing_dir = os.path.join(tmp_path, "missing")
+    with caplog.at_level(logging.INFO):
+        with FrameWriter() as frame_writer:
+            frame_writer.submit(_frame(0), os.path.join(tmp_path, "ok.png"))
+            frame_writer.submit(_frame(0), os.path.join(missing_dir, "ko.png"))
+    assert frame_writer.written_count == 1
+    assert len(frame_writer.errors) == 1
+    assert "saved 1 frame(s)" in caplog.text
+    assert "failed to save" in caplog.text
+
+
+def test_frame_writer_appends_to_video_in_order(tmp_path: str):
+    file_path = os.path.join(tmp_path, "video.y4m")
+    video = Y4MWriter(file_path, (20, 10), frame_rate=25)
+    with FrameWriter(max_pending=2, workers=3, video=video) as frame_writer:
+        for idx in range(10):
+            frame_writer.submit(np.full((10, 20, 3), 10 * idx, dtype=np.uint8))
+        frame_writer.submit(_frame(0)[:5])  # wrong shape
+    assert frame_writer.written_count == 10
+    assert len(frame_writer.errors) == 1
+    with open(file_path, "rb") as video_file:
+        frames = video_file.read().split(b"FRAME\n")[1:]
+    assert [frame[0] for frame in frames] == [10 * idx for idx in range(10)]
+
+
+class _FailingVideo(Y4MWriter):
+    def _write(self, frame: np.ndarray):
+        raise TypeError("unexpected")
+
+
+def test_frame_writer_keeps_draining_after_unexpected_errors(
+    tmp_path: str, caplog: pytest.LogCaptureFixture
+):
+    video = _FailingVideo(os.path.join(tmp_path, "video.y4m"), (20, 10), frame_rate=25)
+    with caplog.at_level(logging.INFO):
+        with FrameWriter(max_pending=2, video=video) as frame_writer:
+            for _ in range(5):
+                frame_writer.submit(_frame(0))  # would block once the queue is full
+    assert frame_writer.written_count == 0
+    assert len(frame_writer.errors) == 5
+    assert "unexpected" in caplog.text
+
+
+def test_frame_writer_requires_file_path_for_images():
+    with FrameWriter() as frame_writer:
+        frame_writer.submit(_frame(0))
+    assert frame_writer.written_count == 0
+    assert len(frame_writer.errors) == 1
+
+
+@pytest.mark.parametrize("max_pending, workers", [(0, 1), (1, 0)])
+def test_frame_writer_invalid_arguments(max_pending: int, workers: int):
+    with pytest.raises(ValueError):
+        FrameWriter(max_pending=max_pending, workers=workers)
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__]))
@@ -0,0 +1,47 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=missing-function-docstring
+import numpy as np
+import pytest
+
+from visualization.heatmap import DensityHeatmap, density_colormap
+
+
+def test_density_colormap():
+    colormap = density_colormap([(0, 0, 0), (100, 0, 0), (200, 100, 0)], saturation=4)
+    assert colormap.shape == (5, 3) and colormap.dtype == np.uint8
+    assert colormap[0].tolist() == [0, 0, 0]
+    assert colormap[1].tolist() == [100, 0, 0]
+    assert colormap[4].tolist() == [200, 100, 0]
+    assert np.all(np.diff(colormap[1:, 0].astype(int)) > 0)
+    assert density_colormap([(0, 0, 0), (9, 9, 9)], saturation=1).tolist() == [[0] * 3, [9] * 3]
+
+
+@pytest.mark.parametrize("colors, saturation", [([(0, 0, 0)], 8), ([(0, 0, 0), (1, 1, 1)], 0)])
+def test_density_colormap_invalid_arguments(colors, saturation):
+    with pytest.raises(ValueError):
+        density_colormap(colors, saturation)
+
+
+def test_density_heatmap_counts():
+    heatmap = DensityHeatmap((4, 3), [(0, 0, 0), (255, 255, 255)])
+    positions = np.array([[0.5, 0.5], [0.9, 0.1], [3.9, 2.9], [1, 2], [-2, 1], [4, 1], [1, 3]])
+    counts = heatmap.counts(positions)
+    assert heatmap.size == (4, 3)
+    assert counts.shape == (4, 3)
+    assert counts[0, 0] == 2 and counts[3, 2] == 1 and counts[1, 2] == 1
+    assert counts.sum() == 4  # outside points are left out
+
+
+def test_density_heatmap_render():
+    colors = [(10, 10, 10), (100, 0, 0), (200, 0, 0)]
+    heatmap = DensityHeatmap((5, 5), colors, saturation=2)
+    positions = np.array([[1, 1], [2, 3], [2, 3], [2, 3]])
+    buffer = heatmap.render(positions)
+    assert buffer.shape == (5, 5, 3) and buffer.dtype == np.uint8
+    assert tuple(buffer[0, 0]) == colors[0]
+    assert tuple(buffer[1, 1]) == colors[1]
+    assert tuple(buffer[2, 3]) == colors[2]  # saturated
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__]))
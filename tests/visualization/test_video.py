@@ -0,0 +1,181 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=missing-function-docstring
+# pylint: disable=protected-access
+import os
+from typing import List, Tuple
+
+import numpy as np
+import pygame
+import pytest
+
+from visualization.video import GifWriter, VideoWriter, open_video
+
+
+def _frames(count: int, height: int = 12, width: int = 17) -> np.ndarray:
+    rng = np.random.default_rng(0)
+    colors = rng.integers(0, 256, size=(8, 3), dtype=np.uint8)
+    return colors[rng.integers(0, len(colors), size=(count, height, width))]
+
+
+def _lzw_decode(data: bytes) -> List[int]:
+    # reference GIF LZW decoder (minimum code size 8)
+    bits = np.unpackbits(np.frombuffer(data, dtype=np.uint8), bitorder="little")
+    indices: List[int] = []
+    table: List[List[int]] = []
+    width, position, previous = 9, 0, None
+    while True:
+        code = int(bits[position : position + width] @ (1 << np.arange(width)))
+        position += width
+        if code == 257:
+            return indices
+        if code == 256:
+            table, width, previous = [[index] for index in range(258)], 9, None
+            continue
+        if previous is None:
+            entry = table[code]
+        else:
+            entry = table[code] if code < len(table) else previous + previous[:1]
+            table.append(previous + entry[:1])
+            if len(table) == (1 << width) and width < 12:
+                width += 1
+        indices += entry
+        previous = entry
+
+
+@pytest.mark.parametrize(
+    "indices",
+    [
+        np.array([7]),
+        np.arange(1000) % 256,
+        np.zeros(100_000, dtype=int),
+        np.random.default_rng(0).integers(0, 256, 20_000),  # clears the code table
+        np.random.default_rng(0).integers(0, 3, 50_000),
+        np.repeat(np.random.default_rng(0).integers(0, 256, 3000), 7),
+    ],
+)
+def test_gif_lzw_round_trip(indices: np.ndarray):
+    assert _lzw_decode(GifWriter._lzw(indices)) == indices.tolist()
+
+
+def test_gif_lzw_compresses_runs():
+    assert len(GifWriter._lzw(np.zeros(100_000, dtype=int))) < 1000
+
+
+def _sub_blocks(data: bytes, position: int) -> Tuple[bytes, int]:
+    # return the data of the sub-blocks at position and the position after them
+    blocks = bytearray()
+    while data[position] != 0:
+        blocks += data[position + 1 : position + 1 + data[position]]
+        position += 1 + data[position]
+    return bytes(blocks), position + 1
+
+
+def _draw_gif_image(canvas: np.ndarray, data: bytes, position: int) -> int:
+    # draw the image (graphic control extension included) at position over canvas, return the
+    # position after it
+    transparent = data[position + 6]
+    left, top, width, height = np.frombuffer(data[position + 9 : position + 17], "<u2").tolist()
+    palette = np.frombuffer(data[position + 18 : position + 18 + 768], dtype=np.uint8)
+    lzw, position = _sub_blocks(data, position + 18 + 768 + 1)
+    indices = np.array(_lzw_decode(lzw)).reshape(height, width)
+    box = canvas[top : top + height, left : left + width]
+    box[indices != transparent] = palette.reshape(256, 3)[indices[indices != transparent]]
+    return position
+
+
+def _gif_frames(file_path: str) -> List[np.ndarray]:
+    # reference decoder of the GIF files GifWriter writes: each frame is drawn over the previous
+    with open(file_path, "rb") as gif_file:
+        data = gif_file.read()
+    width, height = np.frombuffer(data[6:10], dtype="<u2")
+    canvas = np.zeros((height, width, 3), dtype=np.uint8)
+    position = 13 + 19  # header, logical screen descriptor and loop extension
+    frames = []
+    while data[position] != 0x3B:
+        position = _draw_gif_image(canvas, data, position)
+        frames.append(canvas.copy())
+    return frames
+
+
+def test_gif_writer_round_trip(tmp_path: str):
+    file_path = os.path.join(tmp_path, "video.gif")
+    frames = _frames(3)
+    frames = np.concatenate([frames, frames[-1:], frames[-1:]])
+    frames[3, 2:5, 4:9] = frames[0, 2:5, 4:9]  # a part of the frame changes back
+    with open_video(file_path, (17, 12), frame_rate=20) as writer:
+        for frame in frames:
+            writer.write(frame)
+    assert writer.frame_count == 5
+    surface = pygame.image.load(file_path)  # first frame
+    assert surface.get_size() == (17, 12)
+    for x, y in [(0, 0), (5, 7), (16, 11)]:
+        assert tuple(surface.get_at((x, y)))[:3] == tuple(frames[0][y, x])
+    decoded = _gif_frames(file_path)
+    assert len(decoded) == len(frames)
+    for expected, frame in zip(frames, decoded):
+        assert np.array_equal(frame, expected)
+
+
+def test_gif_writer_only_encodes_changes(tmp_path: str):
+    file_path = os.path.join(tmp_path, "video.gif")
+    frame = np.full((300, 400, 3), 128, dtype=np.uint8)
+    frame[::7, ::5] = (255, 255, 0)
+    frames = []
+    with open_video(file_path, (400, 300), frame_rate=20) as writer:
+        for idx in range(20):
+            frame[100:110, 10 * idx : 10 * idx + 10] = (0, 0, 255)
+            writer.write(frame)
+            frames.append(frame.copy())
+    assert os.path.getsize(file_path) < sum(frame.nbytes for frame in frames) / 100
+    assert all(np.array_equal(a, b) for a, b in zip(_gif_frames(file_path), frames))
+
+
+def test_gif_writer_maps_extra_colors_to_nearest(tmp_path: str):
+    with GifWriter(os.path.join(tmp_path, "video.gif"), (16, 16), 10) as writer:
+        frame = np.zeros((16, 16, 3), dtype=np.uint8)
+        frame[..., 0] = np.arange(256).reshape(16, 16)
+        indices = writer._indices(frame)
+        # the 256th color is mapped to the nearest of the first 255 (the last one is
+        # transparent)
+        assert (writer._palette[indices[:255]] == frame.reshape(-1, 3)[:255]).all()
+        assert indices[255] == 254
+        frame[..., 1] = 2  # 256 new colors, nearest to the first ones
+        assert (writer._indices(frame) == indices).all()
+        assert writer._palette_size == 255
+
+
+def test_y4m_writer(tmp_path: str):
+    file_path = os.path.join(tmp_path, "video.y4m")
+    frame = np.zeros((2, 3, 3), dtype=np.uint8)
+    frame[0, 0] = (255, 255, 255)
+    frame[1, 2] = (255, 0, 0)
+    with open_video(file_path, (3, 2), frame_rate=200) as writer:
+        writer.write(frame)
+        writer.write(frame)
+    with open(file_path, "rb") as video_file:
+        header, *frames = video_file.read().split(b"FRAME\n")
+    assert header.startswith(b"YUV4MPEG2 W3 H2 F200:1 ")
+    assert len(frames) == 2
+    planes = np.frombuffer(frames[0], dtype=np.uint8).reshape(3, 2, 3)
+    assert planes[:, 0, 0].tolist() == [255, 128, 128]
+    assert planes[:, 0, 1].tolist() == [0, 128, 128]
+    assert planes[:, 1, 2].tolist() == [76, 85, 255]
+
+
+def test_video_writer_invalid_arguments(tmp_path: str):
+    # pylint: disable=abstract-class-instantiated
+    with pytest.raises(TypeError):  # abstract
+        VideoWriter(os.path.join(tmp_path, "video"), (3, 2), 10)  # type: ignore[abstract]
+    with pytest.raises(ValueError):
+        open_video(os.path.join(tmp_path, "video.mp4"), (3, 2), 10)
+    with pytest.raises(ValueError):
+        open_video(os.path.join(tmp_path, "video.gif"), (0, 2), 10)
+    with pytest.raises(ValueError):
+        open_video(os.path.join(tmp_path, "video.y4m"), (3, 2), 0)
+    with open_video(os.path.join(tmp_path, "video.y4m"), (3, 2), 10) as writer:
+        with pytest.raises(ValueError):
+            writer.write(np.zeros((3, 2, 3), dtype=np.uint8))
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__]))
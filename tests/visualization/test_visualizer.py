@@ -1,15 +1,26 @@
 # pylint: disable=missing-module-docstring
 # pylint: disable=missing-function-docstring
-import argparse
 import os
 from unittest.mock import Mock, patch
 
+import numpy as np
+import pygame
 import pytest
 
 from simulation.agents import Agent, Collider, Pose, Position, Velocity
+from simulation.profiling import PhaseTimer
+from simulation.recorder import Recording, TrajectoryRecorder
 from simulation.simulator import Simulator
-from visualization.colors import COLORS
-from visualization.visualizer import Visualizer, VisualizerConfig, pygame_quit
+from tests.helpers import simulation_arguments
+from visualization.colors import COLORS, Palette, darken_color, lighten_color
+from visualization.heatmap import density_colormap
+from visualization.visualizer import (
+    Visualizer,
+    VisualizerConfig,
+    monospaced_font_face,
+    pygame_quit,
+    replay_commands,
+)
 
 
 def test_visualizer_config_initialization():
@@ -46,6 +57,15 @@ def test_pygame_quit(pygame_mock):
     assert pygame_quit() is False
 
 
+@patch("visualization.visualizer.pygame")
+def test_replay_commands(pygame_mock):
+    events = [Mock(type=pygame_mock.KEYDOWN, key=key) for key in range(4)]
+    pygame_mock.K_ESCAPE, pygame_mock.K_SPACE, pygame_mock.K_LEFT, pygame_mock.K_RIGHT = range(4)
+    events.append(Mock(type=pygame_mock.QUIT))
+    pygame_mock.event.get.return_value = events
+    assert replay_commands() == ["quit", "pause", "backward", "forward", "quit"]
+
+
 @patch("visualization.visualizer.pygame")
 def test_visualizer_from_cli_arguments(pygame_mock):
     # given
@@ -56,11 +76,15 @@ def test_visualizer_from_cli_arguments(pygame_mock):
         traveler_color="blue",
         traveler_collision_color="yellow",
         frame_rate=60.0,
+        dirty_rects=False,
+        heatmap_hornet_count=100_000,
     )
     # when
     visualizer = Visualizer.from_cli_arguments(args)
     # then
     assert isinstance(visualizer, Visualizer)
+    assert visualizer.palette.surface == lighten_color(COLORS["green"])
+    assert visualizer.palette.hornet.fill == lighten_color(COLORS["red"])
     pygame_mock.init.assert_called()
     pygame_mock.display.set_mode.assert_called_with(args.field_size)
     pygame_mock.display.set_caption.assert_called_with("Hornet Field Simulation")
@@ -79,14 +103,19 @@ def test_visualizer_tick(pygame_mock):
     hornet = Agent(Pose(Position(1, 1)), Velocity(0, 0), Collider(0))
     simulator = Simulator(traveler, 3 * [hornet], (10, 10))
     visualizer = Visualizer(surface_size=(100, 200), config=config)
+    pygame_mock.font.Font.return_value.size.return_value = (0, 12)
     hud_texts = [""]
     visualizer.tick(simulator, hud_texts)
+    monospaced_font_face.cache_clear()  # the font was looked up through the pygame mock
     pygame_mock.display.flip.assert_called()
-    assert pygame_mock.draw.circle.call_count == 2 * 4  # 1 traveler + 3 hornets (twice per agent)
+    assert pygame_mock.draw.circle.call_count == 2 * 2  # one sprite for traveler, one for hornets
+    blits = pygame_mock.display.set_mode.return_value.blits
+    blits.assert_called_once()
+    assert len(blits.call_args.args[0]) == 4  # 1 traveler + 3 hornets
 
 
 def test_visualizer_tick_smoke_test():
-    args = argparse.Namespace(
+    args = simulation_arguments(
         hornet_count=1,
         hornet_color="yellow",
         hornet_collider_radius=1,
@@ -97,6 +126,9 @@ def test_visualizer_tick_smoke_test():
         field_color="green",
         field_size=(10, 10),
         frame_rate=60.0,
+        dirty_rects=False,
+        heatmap_hornet_count=100_000,
+        seed=0,
     )
     hud_texts = [""]
     simulator = Simulator.from_cli_arguments(args)
@@ -117,8 +149,278 @@ def test_visualizer_tick_smoke_test():
     visualizer.tick(simulator, hud_texts)
 
 
+def test_visualizer_tick_draws_same_circles_as_pygame_draw():
+    config = VisualizerConfig(
+        surface_color=COLORS["green"],
+        hornet_color=COLORS["red"],
+        traveler_color=COLORS["blue"],
+        traveler_collision_color=COLORS["yellow"],
+        frame_rate=1000.0,
+    )
+    rng = np.random.default_rng(0)
+    traveler = Agent(Pose(Position(20.7, 30.2)), Velocity(0, 0), Collider(3))
+    hornets = [
+        Agent(Pose(Position(*rng.uniform(-5, 65, 2))), Velocity(0, 0), Collider(radius))
+        for radius in rng.choice([0, 1, 2.5, 4], size=50)
+    ]
+    simulator = Simulator(traveler, hornets, (60, 40))
+    visualizer = Visualizer(surface_size=(60, 40), config=config)
+    visualizer.tick(simulator, [])
+
+    expected = pygame.Surface((60, 40))
+    expected.fill(config.surface_color)
+    colors = [config.traveler_color] + len(hornets) * [config.hornet_color]
+    for agent, color in zip([simulator.traveler] + simulator.hornets, colors):
+        center = agent.pose.position.as_list()
+        pygame.draw.circle(expected, lighten_color(color), center, agent.collider.radius)
+        pygame.draw.circle(expected, darken_color(color), center, 1)
+    expected_frame = pygame.surfarray.array3d(expected).transpose(1, 0, 2)
+    assert np.array_equal(visualizer.frame(), expected_frame)
+
+
+def test_visualizer_tick_draws_all_travelers():
+    config = VisualizerConfig(
+        surface_color=COLORS["green"],
+        hornet_color=COLORS["red"],
+        traveler_color=COLORS["blue"],
+        traveler_collision_color=COLORS["yellow"],
+        frame_rate=1000.0,
+    )
+    travelers = [Agent(Pose(Position(5, y)), Velocity(0, 0), Collider(2)) for y in range(5, 40, 10)]
+    hornet = Agent(Pose(Position(5, 25)), Velocity(0, 0), Collider(0))
+    simulator = Simulator(travelers, [hornet], (10, 40))
+    visualizer = Visualizer(surface_size=(10, 40), config=config)
+    simulator.tick()
+    visualizer.tick(simulator, [])
+    assert simulator.collision_snapshot.colliding_travelers.tolist() == [0, 0, 1, 0]
+    frame = visualizer.frame()
+    for idx, y in enumerate(range(5, 40, 10)):
+        colors = visualizer.palette.traveler_collision if idx == 2 else visualizer.palette.traveler
+        assert tuple(frame[y + 1, 5]) == colors.fill
+
+
+def test_visualizer_tick_without_hornets():
+    config = VisualizerConfig(
+        surface_color=COLORS["green"],
+        hornet_color=COLORS["red"],
+        traveler_color=COLORS["blue"],
+        traveler_collision_color=COLORS["yellow"],
+        frame_rate=1000.0,
+    )
+    traveler = Agent(Pose(Position(5, 5)), Velocity(0, 0), Collider(2))
+    simulator = Simulator(traveler, [], (10, 10))
+    visualizer = Visualizer(surface_size=(10, 10), config=config)
+    visualizer.tick(simulator, [])
+    assert tuple(visualizer.frame()[5, 5]) == darken_color(config.traveler_color)
+
+
+def test_visualizer_replay_tick_draws_same_frame_as_tick(tmp_path: str):
+    config = VisualizerConfig(
+        surface_color=COLORS["green"],
+        hornet_color=COLORS["red"],
+        traveler_color=COLORS["blue"],
+        traveler_collision_color=COLORS["yellow"],
+        frame_rate=1000.0,
+    )
+    rng = np.random.default_rng(0)
+    travelers = [Agent(Pose(Position(5, y)), Velocity(1, 0), Collider(3)) for y in (10, 30)]
+    hornets = [
+        Agent(Pose(Position(*rng.uniform(0, 40, 2))), Velocity(*rng.uniform(-2, 2, 2)), Collider(2))
+        for _ in range(60)
+    ]
+    simulator = Simulator(travelers, hornets, (40, 40))
+    visualizer = Visualizer(surface_size=(40, 40), config=config)
+    frames = []
+    with TrajectoryRecorder(str(tmp_path), np.dtype(np.float64)) as recorder:
+        for _ in range(10):
+            simulator.tick()
+            recorder.record(simulator)
+            visualizer.tick(simulator, ["hud"])
+            frames.append(visualizer.frame())
+    recording = Recording(str(tmp_path))
+    for idx, expected in enumerate(frames):
+        visualizer.replay_tick(recording.frame(idx), ["hud"])
+        assert np.array_equal(visualizer.frame(), expected)
+
+
+@pytest.mark.parametrize("max_dirty_rects, updates", [(256, 11), (8, 0)])
+def test_visualizer_dirty_rects_draw_same_frames_as_full_redraws(
+    tmp_path: str, max_dirty_rects: int, updates: int
+):
+    config = VisualizerConfig(
+        surface_color=COLORS["green"],
+        hornet_color=COLORS["red"],
+        traveler_color=COLORS["blue"],
+        traveler_collision_color=COLORS["yellow"],
+        frame_rate=1000.0,
+    )
+    rng = np.random.default_rng(0)
+    # most hornets stay still, some overlapping the moving ones; the travelers collide
+    travelers = [Agent(Pose(Position(5, y)), Velocity(3, 0), Collider(3)) for y in (10, 30)]
+    hornets = [
+        Agent(
+            Pose(Position(*rng.uniform(0, 60, 2))),
+            Velocity(*(rng.uniform(-2, 2, 2) if idx % 10 == 0 else (0, 0))),
+            Collider(radius),
+        )
+        for idx, radius in enumerate(rng.choice([1, 2.5, 4], size=80))
+    ]
+    simulator = Simulator(travelers, hornets, (60, 60))
+    with TrajectoryRecorder(str(tmp_path), np.dtype(np.float64)) as recorder:
+        for _ in range(12):
+            simulator.tick()
+            recorder.record(simulator)
+    recording = Recording(str(tmp_path))
+    assert recording.column("colliding_travelers").any()
+    visualizer = Visualizer(surface_size=(60, 60), config=config)
+    expected_frames = []
+    for idx in range(len(recording)):
+        visualizer.replay_tick(recording.frame(idx), [f"{idx}" * (idx % 3 + 1)])
+        expected_frames.append(visualizer.frame())
+
+    config.dirty_rects, config.max_dirty_rects = True, max_dirty_rects
+    visualizer = Visualizer(surface_size=(60, 60), config=config)
+    with patch("pygame.display.update", wraps=pygame.display.update) as update_mock:
+        for idx, expected in enumerate(expected_frames):
+            visualizer.replay_tick(recording.frame(idx), [f"{idx}" * (idx % 3 + 1)])
+            assert np.array_equal(visualizer.frame(), expected)
+    assert update_mock.call_count == updates  # all but the first frame, or none (fallback)
+
+
+def _heatmap_frame(simulator: Simulator, palette: Palette) -> np.ndarray:
+    """Return the frame of simulator in heatmap mode, drawn with pygame.draw"""
+    density = np.zeros(simulator.field_size, dtype=int)
+    np.add.at(density, tuple(simulator.swarm.positions.astype(int).T), 1)
+    assert len(np.unique(density)) > 2  # some pixels have several hornets
+    colormap = density_colormap([palette.surface, palette.hornet.fill, palette.hornet.center], 8)
+    expected = pygame.Surface(simulator.field_size)
+    pygame.surfarray.blit_array(expected, colormap[np.minimum(density, 8)])
+    agents = [(simulator.traveler, palette.traveler_collision)]
+    colliding_idx = simulator.collision_snapshot.colliding_idx
+    agents += [(simulator.hornets[idx], palette.hornet) for idx in colliding_idx]
+    for agent, colors in agents:
+        center = agent.pose.position.as_list()
+        pygame.draw.circle(expected, colors.fill, center, agent.collider.radius)
+        pygame.draw.circle(expected, colors.center, center, 1)
+    return pygame.surfarray.array3d(expected).transpose(1, 0, 2)
+
+
+@pytest.mark.parametrize("dirty_rects", [False, True])
+def test_visualizer_tick_draws_heatmap_above_hornet_count(dirty_rects: bool):
+    config = VisualizerConfig(
+        surface_color=COLORS["green"],
+        hornet_color=COLORS["red"],
+        traveler_color=COLORS["blue"],
+        traveler_collision_color=COLORS["yellow"],
+        frame_rate=1000.0,
+        dirty_rects=dirty_rects,
+        heatmap_hornet_count=10,
+    )
+    rng = np.random.default_rng(0)
+    traveler = Agent(Pose(Position(20.7, 30.2)), Velocity(0, 0), Collider(3))
+    hornets = [
+        Agent(Pose(Position(*rng.uniform((0, 0), (60, 40)))), Velocity(0, 0), Collider(2))
+        for _ in range(200)
+    ]
+    hornets[0].pose.position = Position(22, 31)
+    simulator = Simulator(traveler, hornets, (60, 40))
+    simulator.tick()
+    colliding_idx = simulator.collision_snapshot.colliding_idx
+    assert 0 < len(colliding_idx) < 10
+    visualizer = Visualizer(surface_size=(60, 40), config=config)
+    visualizer.tick(simulator, [])
+    visualizer.tick(simulator, [])
+
+    assert np.array_equal(visualizer.frame(), _heatmap_frame(simulator, visualizer.palette))
+
+
+def test_visualizer_profile_phases():
+    config = VisualizerConfig(
+        surface_color=COLORS["green"],
+        hornet_color=COLORS["red"],
+        traveler_color=COLORS["blue"],
+        traveler_collision_color=COLORS["yellow"],
+        frame_rate=1000.0,
+    )
+    traveler = Agent(Pose(Position(5, 5)), Velocity(1, 0), Collider(2))
+    hornet = Agent(Pose(Position(15, 5)), Velocity(0, 0), Collider(2))
+    simulator = Simulator(traveler, [hornet], (20, 20))
+    visualizer = Visualizer(surface_size=(20, 20), config=config)
+    assert visualizer.phase_timer is None
+    timer = simulator.profile_phases()
+    assert visualizer.profile_phases(timer) is timer
+    assert visualizer.phase_timer is timer
+    simulator.tick()
+    visualizer.tick(simulator, ["hud"])
+    assert timer.phases == [
+        "steer",
+        "travelers",
+        "hornets",
+        "collisions",
+        "layout",
+        "clear",
+        "draw",
+        "hud",
+        "flip",
+        "frame wait",
+    ]
+
+
+@pytest.mark.parametrize("dirty_rects", [False, True])
+def test_visualizer_renders_hud_text_in_hud_phase(dirty_rects: bool):
+    config = VisualizerConfig(
+        surface_color=COLORS["green"],
+        hornet_color=COLORS["red"],
+        traveler_color=COLORS["blue"],
+        traveler_collision_color=COLORS["yellow"],
+        frame_rate=1000.0,
+        dirty_rects=dirty_rects,
+    )
+    simulator = Simulator(Agent(Pose(Position(5, 5)), Velocity(0, 0), Collider(2)), [], (20, 20))
+    visualizer = Visualizer(surface_size=(20, 20), config=config)
+    timer = visualizer.profile_phases(PhaseTimer())
+    events = []
+    font = pygame.font.Font(None, 12)
+
+    def render(*args):
+        events.append("render")
+        return font.render(*args)
+
+    font_mock = Mock(size=font.size, render=render)
+    with (
+        patch("visualization.visualizer.pygame.font.Font", return_value=font_mock),
+        patch.object(timer, "lap", side_effect=events.append),
+    ):
+        visualizer.tick(simulator, ["hud", "text"])
+    assert events.index("draw") < events.index("render") < events.index("hud")
+    assert events.count("render") == 2
+
+
+@patch("visualization.visualizer.pygame.font.match_font", return_value=None)
+def test_visualizer_font_lookup_is_deferred_and_cached(match_font_mock):
+    config = VisualizerConfig(
+        surface_color=COLORS["green"],
+        hornet_color=COLORS["red"],
+        traveler_color=COLORS["blue"],
+        traveler_collision_color=COLORS["yellow"],
+        frame_rate=1000.0,
+    )
+    simulator = Simulator(Agent(Pose(Position(5, 5)), Velocity(0, 0), Collider(2)), [], (20, 20))
+    monospaced_font_face.cache_clear()
+    try:
+        visualizers = [Visualizer(surface_size=(20, 20), config=config) for _ in range(2)]
+        visualizers[0].tick(simulator, [])
+        match_font_mock.assert_not_called()
+        for visualizer in visualizers:
+            visualizer.tick(simulator, ["hud"])
+            visualizer.tick(simulator, ["hud"])
+        match_font_mock.assert_called_once_with("Courier")
+    finally:
+        monospaced_font_face.cache_clear()
+
+
 def test_visualizer_save_to_file_smoke_test(tmp_path: str):
-    args = argparse.Namespace(
+    args = simulation_arguments(
         hornet_count=1,
         hornet_color="yellow",
         hornet_collider_radius=1,
@@ -129,6 +431,9 @@ def test_visualizer_save_to_file_smoke_test(tmp_path: str):
         field_color="green",
         field_size=(10, 10),
         frame_rate=60.0,
+        dirty_rects=False,
+        heatmap_hornet_count=100_000,
+        seed=0,
     )
     hud_texts = [""]
     simulator = Simulator.from_cli_arguments(args)
@@ -137,6 +442,10 @@ def test_visualizer_save_to_file_smoke_test(tmp_path: str):
     file_path = os.path.join(tmp_path, "tmp.png")
     visualizer.save_to_file(file_path)
     assert os.path.exists(file_path)
+    frame = visualizer.frame()
+    assert frame.shape == (10, 10, 3)
+    expected = pygame.surfarray.array3d(pygame.image.load(file_path)).transpose(1, 0, 2)
+    assert np.array_equal(frame, expected)
 
 
 if __name__ == "__main__":
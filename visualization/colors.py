@@ -1,5 +1,7 @@
 """Colors and helpers"""
 
+from dataclasses import dataclass
+from functools import lru_cache
 from typing import Sequence, Tuple
 
 Color = Tuple[int, int, int]
@@ -19,6 +21,7 @@ def available_colors() -> Sequence[str]:  # pragma: no cover
     return list(COLORS.keys())
 
 
+@lru_cache(maxsize=None)
 def lighten_color(color: Color, ratio: float = 0.5) -> Color:
     """Return a lighter version of the same color
     ratio=1 makes the color WHITE
@@ -26,8 +29,44 @@ def lighten_color(color: Color, ratio: float = 0.5) -> Color:
     return tuple(int(v + ratio * (255 - v)) for v in color)  # type: ignore
 
 
+@lru_cache(maxsize=None)
 def darken_color(color: Color, ratio: float = 0.5) -> Color:
     """Return a darker version of the same color
     ratio=1 makes the color BLACK
     ratio=0 does not change the color"""
     return tuple(int(v - ratio * v) for v in color)  # type: ignore
+
+
+@dataclass(frozen=True)
+class AgentColors:
+    """Colors of an agent: its collider disk (fill) and its center dot"""
+
+    fill: Color
+    center: Color
+
+    @staticmethod
+    def from_color(color: Color) -> "AgentColors":
+        # pylint: disable=missing-function-docstring
+        return AgentColors(fill=lighten_color(color), center=darken_color(color))
+
+
+@dataclass(frozen=True)
+class Palette:
+    """All the colors of a rendered frame, derived once from the configured colors"""
+
+    surface: Color
+    hornet: AgentColors
+    traveler: AgentColors
+    traveler_collision: AgentColors
+
+    @staticmethod
+    def from_colors(
+        surface: Color, hornet: Color, traveler: Color, traveler_collision: Color
+    ) -> "Palette":
+        # pylint: disable=missing-function-docstring
+        return Palette(
+            surface=surface,
+            hornet=AgentColors.from_color(hornet),
+            traveler=AgentColors.from_color(traveler),
+            traveler_collision=AgentColors.from_color(traveler_collision),
+        )
@@ -0,0 +1,113 @@
+"""Dirty rectangles: the parts of a frame that changed since the previous one
+
+Rectangles are (x, y, width, height) rows of int arrays, in surface coordinates."""
+
+import logging
+from typing import Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def clip_rects(rects: np.ndarray, size: Tuple[int, int]) -> np.ndarray:
+    """Return the non-empty parts of rects within a surface of the given (width, height)
+
+    pygame.Surface.fill does not shrink the rectangles it moves within the surface (e.g. a
+    rectangle to the left of the surface is filled from x = 0 on, with its whole width)."""
+    x0 = np.clip(rects[:, 0], 0, size[0])
+    y0 = np.clip(rects[:, 1], 0, size[1])
+    x1 = np.clip(rects[:, 0] + rects[:, 2], 0, size[0])
+    y1 = np.clip(rects[:, 1] + rects[:, 3], 0, size[1])
+    clipped = np.stack([x0, y0, x1 - x0, y1 - y0], axis=1)
+    return clipped[(clipped[:, 2] > 0) & (clipped[:, 3] > 0)]
+
+
+def _redraws_of_width(
+    rects: np.ndarray, width: int, dirty: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Return the (sprite idx, part) pairs of the sprites of the given width that intersect a
+    dirty rectangle
+
+    Among the sprites sorted along x, those that may intersect a dirty rectangle are a range:
+    they begin less than width before it and before its end."""
+    group = np.flatnonzero(rects[:, 2] == width)
+    group = group[np.argsort(rects[group, 0], kind="stable")]
+    group_x0 = rects[group, 0]
+    begins = np.searchsorted(group_x0, dirty[:, 0] - width, side="right")
+    counts = np.maximum(
+        np.searchsorted(group_x0, dirty[:, 0] + dirty[:, 2], side="left") - begins, 0
+    )
+    dirty_idx = np.repeat(np.arange(len(dirty)), counts)
+    candidates = group[
+        np.arange(len(dirty_idx)) + np.repeat(begins - np.cumsum(counts) + counts, counts)
+    ]
+    x0 = np.maximum(rects[candidates, 0], dirty[:, 0][dirty_idx])
+    x1 = np.minimum(rects[candidates, 0] + width, (dirty[:, 0] + dirty[:, 2])[dirty_idx])
+    y0 = np.maximum(rects[candidates, 1], dirty[:, 1][dirty_idx])
+    y1 = np.minimum(
+        rects[candidates, 1] + rects[candidates, 3], (dirty[:, 1] + dirty[:, 3])[dirty_idx]
+    )
+    intersecting = np.flatnonzero((x1 > x0) & (y1 > y0))
+    x0, y0 = x0[intersecting], y0[intersecting]
+    parts = np.stack([x0, y0, x1[intersecting] - x0, y1[intersecting] - y0], axis=1)
+    return candidates[intersecting], parts
+
+
+class DirtyRects:
+    """Find the rectangles to redraw from one frame to the next
+
+    A frame is a sequence of sprites drawn in order (sprite_keys tell the sprites apart) plus
+    overlay rectangles (e.g. the HUD), redrawn on every frame. update returns the rectangles
+    of the sprites that moved or changed, where they were and where they are, and of the
+    overlays, both former and current; or None when the whole frame must be redrawn: on the
+    first frame, when the number of sprites changed or when more than max_rects rectangles
+    are dirty (a full redraw is then cheaper)."""
+
+    # pylint: disable=missing-function-docstring
+    def __init__(self, max_rects: int = 256):
+        if max_rects < 1:
+            error_message = f"Maximum rectangle count must be positive; got {max_rects}"
+            logger.error(error_message)
+            raise ValueError(error_message)
+        self._max_rects = max_rects
+        self._rects: Optional[np.ndarray] = None  # of the sprites, as of the previous frame
+        self._sprite_keys = np.empty(0, dtype=np.int64)
+        self._overlays = np.empty((0, 4), dtype=np.int64)
+
+    @property
+    def max_rects(self) -> int:
+        return self._max_rects
+
+    def reset(self):
+        """Have the next update return None (e.g. when the surface was drawn over)"""
+        self._rects = None
+
+    def update(
+        self, rects: np.ndarray, sprite_keys: np.ndarray, overlays: np.ndarray
+    ) -> Optional[np.ndarray]:
+        former_rects, former_keys, former_overlays = self._rects, self._sprite_keys, self._overlays
+        self._rects, self._sprite_keys, self._overlays = rects, sprite_keys, overlays
+        if former_rects is None or len(former_rects) != len(rects):
+            return None
+        changed = (former_rects != rects).any(axis=1) | (former_keys != sprite_keys)
+        if 2 * np.count_nonzero(changed) + len(former_overlays) + len(overlays) > self._max_rects:
+            return None
+        return np.concatenate([former_rects[changed], rects[changed], former_overlays, overlays])
+
+    @staticmethod
+    def redraws(rects: np.ndarray, dirty: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Return what to redraw of the sprites of rects so that the dirty rectangles are
+        exactly as after a full redraw: sprite indices, in drawing order, and the (K, 4)
+        parts of their rectangles to redraw
+
+        Each sprite is only redrawn within the dirty rectangles, so that it is not drawn over
+        the sprites drawn after it elsewhere."""
+        if len(rects) == 0 or len(dirty) == 0:
+            return np.empty(0, dtype=np.int64), np.empty((0, 4), dtype=np.int64)
+        redraws = [
+            _redraws_of_width(rects, width, dirty) for width in np.unique(rects[:, 2]).tolist()
+        ]
+        sprite_idx = np.concatenate([sprites for sprites, _ in redraws])
+        order = np.argsort(sprite_idx, kind="stable")
+        return sprite_idx[order], np.concatenate([parts for _, parts in redraws])[order]
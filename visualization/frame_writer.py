@@ -0,0 +1,112 @@
+"""Background writer of rendered frames"""
+
+import logging
+import os
+import queue
+import threading
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pygame
+
+from visualization.video import VideoWriter
+
+logger = logging.getLogger(__name__)
+
+
+class FrameWriter:
+    """Save frames (as returned by Visualizer.frame) to image files from background threads
+
+    Frames wait in a bounded queue, so submit only blocks when the writers fall behind by
+    more than max_pending frames. The image format is deduced from the file extension.
+    If a video writer is given, frames are instead appended in order to the video by a single
+    thread, and the video is closed by close."""
+
+    # pylint: disable=missing-function-docstring
+    # pylint: disable=no-member
+    def __init__(
+        self,
+        max_pending: int = 16,
+        workers: Optional[int] = None,
+        video: Optional[VideoWriter] = None,
+    ):
+        if video is not None:
+            workers = 1  # frames of a video must be written in order
+        if workers is None:
+            # leave a core to the simulation and rendering loop
+            workers = min(max((os.cpu_count() or 1) - 1, 1), 4)
+        if max_pending < 1 or workers < 1:
+            error_message = f"max_pending and workers must be positive; got {max_pending, workers}"
+            logger.error(error_message)
+            raise ValueError(error_message)
+        self._video = video
+        self._queue: "queue.Queue[Optional[Tuple[np.ndarray, Optional[str]]]]" = queue.Queue(
+            max_pending
+        )
+        self._lock = threading.Lock()
+        self._written_count = 0
+        self._errors: List[str] = []
+        self._threads = [threading.Thread(target=self._drain, daemon=True) for _ in range(workers)]
+        for thread in self._threads:
+            thread.start()
+
+    def _drain(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            frame, file_path = item
+            try:
+                self._write(frame, file_path)
+            except Exception as error:  # pylint: disable=broad-exception-caught
+                # whatever the error, keep draining: submit would block forever otherwise
+                if not isinstance(error, (pygame.error, OSError, ValueError)):
+                    logger.exception("Frame writer failed to save %s", file_path or "video frame")
+                with self._lock:
+                    self._errors.append(f"{file_path or 'video frame'}: {error}")
+            else:
+                with self._lock:
+                    self._written_count += 1
+
+    def _write(self, frame: np.ndarray, file_path: Optional[str]):
+        if self._video is not None:
+            self._video.write(frame)
+            return
+        if file_path is None:
+            raise ValueError("A file path is required to save a frame as an image")
+        height, width, _ = frame.shape
+        surface = pygame.image.frombuffer(np.ascontiguousarray(frame).data, (width, height), "RGB")
+        pygame.image.save(surface, file_path)
+
+    def submit(self, frame: np.ndarray, file_path: Optional[str] = None):
+        """Queue a (height, width, 3) uint8 RGB frame to be saved to file_path
+        (or appended to the video, in which case file_path is ignored)"""
+        self._queue.put((frame, file_path))
+
+    @property
+    def written_count(self) -> int:
+        with self._lock:
+            return self._written_count
+
+    @property
+    def errors(self) -> List[str]:
+        with self._lock:
+            return list(self._errors)
+
+    def close(self):
+        """Wait for all queued frames to be written and report the outcome to the logger"""
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+        if self._video is not None:
+            self._video.close()
+        logger.info("Frame writer saved %d frame(s)", self.written_count)
+        for error in self.errors:
+            logger.error("Frame writer failed to save %s", error)
+
+    def __enter__(self) -> "FrameWriter":
+        return self
+
+    def __exit__(self, *_):
+        self.close()
@@ -0,0 +1,64 @@
+"""Density heatmap: hornets rendered as the number of them per pixel, for swarms too large to
+draw one by one
+
+Buffers are indexed (x, y) like pygame.surfarray arrays."""
+
+import logging
+from typing import Sequence, Tuple
+
+import numpy as np
+
+from visualization.colors import Color
+
+logger = logging.getLogger(__name__)
+
+
+def density_colormap(colors: Sequence[Color], saturation: int) -> np.ndarray:
+    """Return the (saturation + 1, 3) uint8 colors of the densities 0, ..., saturation
+
+    Density 0 is colors[0]; the other ones go, on a logarithmic scale, from colors[1] (a
+    single hornet) to colors[-1] (saturation or more), linearly through the colors between."""
+    if saturation < 1 or len(colors) < 2:
+        error_message = (
+            f"Saturation must be positive and colors at least 2; got {saturation}, {len(colors)}"
+        )
+        logger.error(error_message)
+        raise ValueError(error_message)
+    stops = np.array(colors[1:], dtype=float)
+    levels = np.log(np.arange(1, saturation + 1)) / np.log(max(saturation, 2))
+    positions = np.linspace(0, 1, len(stops))
+    colormap = np.empty((saturation + 1, 3), dtype=np.uint8)
+    colormap[0] = colors[0]
+    for channel in range(3):
+        colormap[1:, channel] = np.round(np.interp(levels, positions, stops[:, channel]))
+    return colormap
+
+
+class DensityHeatmap:
+    """Render the density of points as an (width, height, 3) RGB buffer
+
+    Points are binned by pixel (the one a circle drawn at them would be centered on) with a
+    single bincount; the counts are then looked up in a density_colormap."""
+
+    # pylint: disable=missing-function-docstring
+    def __init__(self, size: Tuple[int, int], colors: Sequence[Color], saturation: int = 8):
+        self._width, self._height = size
+        self._colormap = density_colormap(colors, saturation)
+
+    @property
+    def size(self) -> Tuple[int, int]:
+        return self._width, self._height
+
+    def counts(self, positions: np.ndarray) -> np.ndarray:
+        """Return the (width, height) number of points per pixel (points outside are left out)"""
+        # truncated toward zero, as pygame.draw.circle does with centers
+        pixels = positions.astype(np.int64)
+        x, y = pixels[:, 0], pixels[:, 1]
+        inside = (x >= 0) & (x < self._width) & (y >= 0) & (y < self._height)
+        keys = x[inside] * self._height + y[inside]
+        counts = np.bincount(keys, minlength=self._width * self._height)
+        return counts.reshape(self._width, self._height)
+
+    def render(self, positions: np.ndarray) -> np.ndarray:
+        counts = self.counts(positions)
+        return self._colormap[np.minimum(counts, len(self._colormap) - 1)]
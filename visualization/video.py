@@ -0,0 +1,305 @@
+"""Streaming video encoders for rendered frames (animated GIF and YUV4MPEG2)
+
+Frames are (height, width, 3) uint8 RGB arrays, as returned by Visualizer.frame. Each frame is
+encoded and written as soon as it is received, so memory use does not grow with the number
+of frames."""
+
+# pylint: disable=missing-function-docstring
+import logging
+import os
+from abc import ABC, abstractmethod
+from typing import BinaryIO, Dict, List, Optional, Sequence, Tuple, TypeVar
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+VIDEO_FORMATS = ["gif", "y4m"]
+
+_VideoWriter = TypeVar("_VideoWriter", bound="VideoWriter")
+
+
+class VideoWriter(ABC):
+    """Base of the streaming encoders: opens the file and checks the frames' shape"""
+
+    def __init__(self, file_path: str, frame_size: Sequence[int], frame_rate: float):
+        width, height = frame_size
+        if width <= 0 or height <= 0 or frame_rate <= 0:
+            error_message = (
+                f"Frame size and rate must be positive values; got {frame_size}, {frame_rate}"
+            )
+            logger.error(error_message)
+            raise ValueError(error_message)
+        self._width = width
+        self._height = height
+        self._frame_rate = frame_rate
+        self._frame_count = 0
+        self._file: BinaryIO = open(file_path, "wb")  # pylint: disable=consider-using-with
+
+    @property
+    def frame_count(self) -> int:
+        return self._frame_count
+
+    def write(self, frame: np.ndarray):
+        if frame.shape != (self._height, self._width, 3):
+            error_message = (
+                f"Frame must be of shape {(self._height, self._width, 3)}; got {frame.shape}"
+            )
+            logger.error(error_message)
+            raise ValueError(error_message)
+        self._write(frame)
+        self._frame_count += 1
+
+    @abstractmethod
+    def _write(self, frame: np.ndarray):
+        """Encode and write a frame of the checked shape"""
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self: _VideoWriter) -> _VideoWriter:
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+
+class Y4MWriter(VideoWriter):
+    """Uncompressed YUV4MPEG2 stream (full range BT.601 YCbCr, no chroma subsampling)"""
+
+    _RGB_TO_YCBCR = np.array(
+        [
+            [0.299, 0.587, 0.114],
+            [-0.168736, -0.331264, 0.5],
+            [0.5, -0.418688, -0.081312],
+        ],
+        dtype=np.float32,
+    )
+
+    def __init__(self, file_path: str, frame_size: Sequence[int], frame_rate: float):
+        super().__init__(file_path, frame_size, frame_rate)
+        numerator, denominator = float(frame_rate).as_integer_ratio()
+        header = (
+            f"YUV4MPEG2 W{self._width} H{self._height} F{numerator}:{denominator} "
+            "Ip A1:1 C444 XCOLORRANGE=FULL\n"
+        )
+        self._file.write(header.encode("ascii"))
+
+    def _write(self, frame: np.ndarray):
+        planes = np.tensordot(self._RGB_TO_YCBCR, frame.astype(np.float32), axes=([1], [2]))
+        planes[1:] += 128
+        np.rint(planes, out=planes)
+        np.clip(planes, 0, 255, out=planes)
+        self._file.write(b"FRAME\n")
+        self._file.write(planes.astype(np.uint8).tobytes())
+
+
+class _LzwEncoder:
+    """GIF LZW encoder (minimum code size 8)
+
+    The code table grows with the sequences met so far, up to 12 bit codes, and is cleared
+    once full. Runs of a value are consumed in jumps: the codes of the runs of each value
+    (value, value value, ...) are kept in chains, so a run takes about the square root of its
+    length table steps rather than one per value."""
+
+    # pylint: disable=missing-function-docstring
+    # pylint: disable=too-many-instance-attributes
+    _CLEAR_CODE = 256
+    _END_CODE = 257
+    _MAX_CODE_COUNT = 4096  # 12 bit codes
+
+    def __init__(self) -> None:
+        self._codes: List[int] = [self._CLEAR_CODE]
+        self._widths: List[int] = [9]
+        self._table: Dict[int, int] = {}  # prefix code << 8 | value -> code
+        self._chains: Dict[int, List[int]] = {}  # value -> codes of its runs of 1, 2, ...
+        self._run_lengths: Dict[int, int] = {}  # code of a run of more than 1 value -> length
+        self._next_code, self._width = self._END_CODE + 1, 9
+        self._prefix: Optional[int] = None  # code of the sequence matched so far
+        self._last_value: Optional[int] = None  # the last value of that sequence
+
+    def _emit(self, prefix: int, key: int, run_value: Optional[int] = None):
+        """Write the prefix code and add its sequence followed by the value of key (a run of
+        run_value if the prefix is one)"""
+        self._codes.append(prefix)
+        self._widths.append(self._width)
+        code = self._next_code
+        self._table[key] = code
+        if run_value is not None:
+            chain = self._chains[run_value]
+            chain.append(code)
+            self._run_lengths[code] = len(chain)
+        self._next_code += 1
+        # decoders add their code one code later, and widen the codes then
+        if self._next_code > 1 << self._width and self._width < 12:
+            self._width += 1
+        if self._next_code == self._MAX_CODE_COUNT:
+            self._codes.append(self._CLEAR_CODE)
+            self._widths.append(self._width)
+            self._table.clear()
+            self._chains.clear()
+            self._run_lengths.clear()
+            self._next_code, self._width = self._END_CODE + 1, 9
+
+    def push(self, value: int, count: int):
+        """Encode count times value"""
+        table = self._table
+        prefix = self._prefix
+        done = 0
+        if prefix is None:
+            prefix, done = value, 1
+        ends_with_value = self._last_value == value
+        while done < count:
+            # once it ends with value, the prefix may be a run of value
+            length = 0
+            if done > 0 or ends_with_value:
+                length = 1 if prefix == value else self._run_lengths.get(prefix, 0)
+            if length:
+                chain = self._chains.setdefault(value, [value])
+                jump = min(len(chain) - length, count - done)  # to the longest known run
+                prefix = chain[length - 1 + jump]
+                done += jump
+                if done == count:
+                    break
+                self._emit(prefix, prefix << 8 | value, value)
+                prefix, done = value, done + 1
+                continue
+            key = prefix << 8 | value
+            code = table.get(key)
+            if code is None:
+                self._emit(prefix, key)
+                code = value
+            prefix, done = code, done + 1
+        self._prefix, self._last_value = prefix, value
+
+    def finish(self) -> bytes:
+        if self._prefix is not None:
+            self._codes.append(self._prefix)
+            self._widths.append(self._width)
+            if self._next_code + 1 > 1 << self._width and self._width < 12:
+                self._width += 1
+        self._codes.append(self._END_CODE)
+        self._widths.append(self._width)
+        codes = np.array(self._codes, dtype=np.uint16)
+        widths = np.array(self._widths, dtype=np.uint8)
+        # least significant bits first
+        bits = (codes[:, np.newaxis] >> np.arange(12)) & 1
+        return np.packbits(bits[np.arange(12) < widths[:, np.newaxis]], bitorder="little").tobytes()
+
+
+class GifWriter(VideoWriter):
+    """Looping animated GIF
+
+    Colors get palette entries in order of first appearance and keep them for the whole
+    video, so the first 255 distinct colors are exact; later colors use the nearest entry.
+    The last entry is transparent: each frame after the first only covers the box of the
+    pixels that changed, and its unchanged pixels are transparent, which leaves long runs of
+    a single code for LZW to compress. Each frame carries the palette as its local color table."""
+
+    _TRANSPARENT = 255
+
+    def __init__(self, file_path: str, frame_size: Sequence[int], frame_rate: float):
+        super().__init__(file_path, frame_size, frame_rate)
+        self._palette = np.zeros((256, 3), dtype=np.uint8)
+        self._palette_size = 0
+        self._lookup = np.full(1 << 24, -1, dtype=np.int16)  # 24 bit RGB -> palette index
+        self._previous: Optional[np.ndarray] = None  # (height, width) indices of the last frame
+        delay_cs = max(int(round(100 / frame_rate)), 2)  # most viewers treat less as slow
+        # do not dispose of the frames (the next ones are drawn over them), transparent index
+        self._graphic_control = (
+            b"\x21\xf9\x04\x05" + delay_cs.to_bytes(2, "little") + bytes([self._TRANSPARENT, 0])
+        )
+        self._file.write(b"GIF89a")
+        self._file.write(self._width.to_bytes(2, "little") + self._height.to_bytes(2, "little"))
+        self._file.write(b"\x00\x00\x00")  # no global color table
+        self._file.write(b"\x21\xff\x0bNETSCAPE2.0\x03\x01\x00\x00\x00")  # loop forever
+
+    def _indices(self, frame: np.ndarray) -> np.ndarray:
+        keys = frame[..., 0].astype(np.int32) << 16
+        keys |= frame[..., 1].astype(np.int32) << 8
+        keys |= frame[..., 2]
+        keys = keys.ravel()
+        indices = self._lookup[keys]
+        unknown = indices < 0
+        if unknown.any():
+            self._add_colors(np.unique(keys[unknown]))
+            indices[unknown] = self._lookup[keys[unknown]]
+        return indices.astype(np.uint16)
+
+    def _add_colors(self, keys: np.ndarray):
+        colors = np.stack([keys >> 16, (keys >> 8) & 0xFF, keys & 0xFF], axis=-1)
+        free = self._TRANSPARENT - self._palette_size
+        new_count = min(free, len(keys))
+        self._palette[self._palette_size : self._palette_size + new_count] = colors[:new_count]
+        self._lookup[keys[:new_count]] = np.arange(
+            self._palette_size, self._palette_size + new_count
+        )
+        self._palette_size += new_count
+        if new_count < len(keys):
+            palette = self._palette[: self._TRANSPARENT].astype(np.int32)
+            rest = colors[new_count:].astype(np.int32)
+            distances = ((rest[:, np.newaxis, :] - palette[np.newaxis, :, :]) ** 2).sum(axis=-1)
+            self._lookup[keys[new_count:]] = distances.argmin(axis=1)
+
+    @staticmethod
+    def _lzw(indices: np.ndarray) -> bytes:
+        """LZW-code indices (minimum code size 8), fed to the encoder run by run"""
+        starts = np.flatnonzero(np.diff(indices, prepend=-1))
+        counts = np.diff(starts, append=len(indices))
+        encoder = _LzwEncoder()
+        for value, count in zip(indices[starts].tolist(), counts.tolist()):
+            encoder.push(value, count)
+        return encoder.finish()
+
+    @staticmethod
+    def _sub_blocks(data: bytes) -> bytes:
+        blocks = bytearray()
+        for begin in range(0, len(data), 255):
+            block = data[begin : begin + 255]
+            blocks.append(len(block))
+            blocks += block
+        blocks.append(0)
+        return bytes(blocks)
+
+    def _changes(self, indices: np.ndarray) -> Tuple[Tuple[int, int], np.ndarray]:
+        """Return the (left, top) corner and the (height, width) indices of the box of the
+        pixels that changed since the previous frame (unchanged ones being transparent)"""
+        previous, self._previous = self._previous, indices
+        if previous is None:
+            return (0, 0), indices
+        changed = indices != previous
+        rows = np.flatnonzero(changed.any(axis=1))
+        if len(rows) == 0:  # frames hold at least a pixel
+            return (0, 0), np.full((1, 1), self._TRANSPARENT, dtype=indices.dtype)
+        columns = np.flatnonzero(changed.any(axis=0))
+        box = np.s_[rows[0] : rows[-1] + 1, columns[0] : columns[-1] + 1]
+        pixels = np.where(changed[box], indices[box], self._TRANSPARENT).astype(indices.dtype)
+        return (int(columns[0]), int(rows[0])), pixels
+
+    def _write(self, frame: np.ndarray):
+        (left, top), pixels = self._changes(self._indices(frame).reshape(self._height, self._width))
+        height, width = pixels.shape
+        self._file.write(self._graphic_control)
+        self._file.write(b"\x2c" + left.to_bytes(2, "little") + top.to_bytes(2, "little"))
+        self._file.write(width.to_bytes(2, "little") + height.to_bytes(2, "little"))
+        self._file.write(b"\x87")  # local color table of 2^(7 + 1) entries
+        self._file.write(self._palette.tobytes())
+        self._file.write(b"\x08")  # LZW minimum code size
+        self._file.write(self._sub_blocks(self._lzw(pixels.ravel())))
+
+    def close(self):
+        if not self._file.closed:
+            self._file.write(b"\x3b")
+        super().close()
+
+
+def open_video(file_path: str, frame_size: Sequence[int], frame_rate: float) -> VideoWriter:
+    """Return the video writer matching the extension (.gif or .y4m) of file_path"""
+    extension = os.path.splitext(file_path)[1].lower().lstrip(".")
+    if extension == "gif":
+        return GifWriter(file_path, frame_size, frame_rate)
+    if extension == "y4m":
+        return Y4MWriter(file_path, frame_size, frame_rate)
+    error_message = f"Video file extension must be one of {VIDEO_FORMATS}; got {file_path}"
+    logger.error(error_message)
+    raise ValueError(error_message)
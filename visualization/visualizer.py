@@ -2,14 +2,21 @@
 
 import argparse
 import logging
+import math
 from dataclasses import dataclass
-from typing import Sequence
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
 
+import numpy as np
 import pygame
 
-from simulation.agents import Agent, Cartesian
+from simulation.agents import Cartesian
+from simulation.profiling import PhaseTimer
+from simulation.recorder import RecordedFrame
 from simulation.simulator import Simulator
-from visualization.colors import COLORS, Color, darken_color, lighten_color
+from visualization.colors import COLORS, AgentColors, Color, Palette, lighten_color
+from visualization.dirty_rects import DirtyRects, clip_rects
+from visualization.heatmap import DensityHeatmap
 
 logger = logging.getLogger(__name__)
 
@@ -17,11 +24,16 @@ logger = logging.getLogger(__name__)
 @dataclass
 class VisualizerConfig:
     # pylint: disable=missing-class-docstring
+    # pylint: disable=too-many-instance-attributes
     surface_color: Color
     hornet_color: Color
     traveler_color: Color
     traveler_collision_color: Color
     frame_rate: float
+    dirty_rects: bool = False  # only redraw and update the parts of the display that changed
+    max_dirty_rects: int = 256  # beyond which the whole display is redrawn and flipped
+    # above which hornets are drawn as a density heatmap, but for the colliding ones
+    heatmap_hornet_count: int = 100_000
 
 
 @dataclass
@@ -31,13 +43,22 @@ class HeadsUpDisplayConfig:
     text_line_gap: int = 0
     font_size: int = 15
     font_color: Color = COLORS["white"]
-    font_face: str = pygame.font.match_font("Courier")  # any monospaced font
+    font_face: Optional[str] = None  # None: any monospaced font (see monospaced_font_face)
+
+
+@lru_cache(maxsize=None)
+def monospaced_font_face() -> Optional[str]:
+    """Return the path of a monospaced system font (None if there is none: pygame's default)
+
+    Font discovery may shell out to fontconfig, so it is only done on the first call."""
+    return pygame.font.match_font("Courier")
 
 
 class Visualizer:
     # pylint: disable=missing-class-docstring
     # pylint: disable=missing-function-docstring
     # pylint: disable=no-member
+    # pylint: disable=too-many-instance-attributes
     def __init__(self, surface_size: Sequence[int], config: VisualizerConfig):
         self._config = config
         pygame.init()
@@ -45,54 +66,257 @@ class Visualizer:
         pygame.display.set_caption("Hornet Field Simulation")
         self._clock = pygame.time.Clock()
         self._hud_config = HeadsUpDisplayConfig()
-        self._hud_font = pygame.font.Font(self._hud_config.font_face, self._hud_config.font_size)
+        self._hud_font: Optional[pygame.font.Font] = None  # loaded on the first HUD render
         self._time_ms = 0
+        self._palette = Palette.from_colors(
+            surface=config.surface_color,
+            hornet=config.hornet_color,
+            traveler=config.traveler_color,
+            traveler_collision=config.traveler_collision_color,
+        )
+        self._sprites: Dict[Tuple[AgentColors, float], Tuple[pygame.Surface, int]] = {}
+        self._phase_timer: Optional[PhaseTimer] = None
+        self._dirty_rects = DirtyRects(config.max_dirty_rects) if config.dirty_rects else None
+        self._heatmap = DensityHeatmap(
+            (surface_size[0], surface_size[1]),
+            [self._palette.surface, self._palette.hornet.fill, self._palette.hornet.center],
+        )
         logger.info("Created visualizer.")
 
+    @property
+    def palette(self) -> Palette:
+        return self._palette
+
     @property
     def time_ms(self) -> int:
         return self._time_ms
 
-    def _draw_agent(self, agent: Agent, color: Color):  # pragma: no cover
-        pygame.draw.circle(
-            surface=self._surface,
-            color=lighten_color(color),
-            center=agent.pose.position.as_list(),
-            radius=agent.collider.radius,
-        )
-        pygame.draw.circle(
-            surface=self._surface,
-            color=darken_color(color),
-            center=agent.pose.position.as_list(),
-            radius=1,
-        )
+    def profile_phases(self, timer: Optional[PhaseTimer] = None) -> PhaseTimer:
+        """Time the phases of every following tick with timer (a new one by default)"""
+        self._phase_timer = PhaseTimer() if timer is None else timer
+        return self._phase_timer
+
+    @property
+    def phase_timer(self) -> Optional[PhaseTimer]:
+        return self._phase_timer
+
+    def _sprite(self, colors: AgentColors, radius: float) -> Tuple[pygame.Surface, int]:
+        """Return the pre-rendered image of an agent and the offset of its center"""
+        key = (colors, radius)
+        if key not in self._sprites:
+            offset = math.ceil(radius) + 1
+            sprite = pygame.Surface((2 * offset + 1, 2 * offset + 1), pygame.SRCALPHA)
+            sprite.fill((0, 0, 0, 0))
+            pygame.draw.circle(sprite, colors.fill, (offset, offset), radius)
+            pygame.draw.circle(sprite, colors.center, (offset, offset), 1)
+            self._sprites[key] = (sprite, offset)
+        return self._sprites[key]
 
-    def _hud_overlay(self, hud_texts: Sequence[str]):  # pragma: no cover
+    def _placements(
+        self, positions: np.ndarray, radii: np.ndarray, colors: AgentColors
+    ) -> Tuple[List[pygame.Surface], np.ndarray, np.ndarray]:
+        """Return the sprite of each agent, the (N, 4) rectangles they are drawn at and keys
+        that tell the sprites apart"""
+        if len(radii) == 0:
+            return [], np.empty((0, 4), dtype=int), np.empty(0, dtype=int)
+        unique_radii, radius_idx = np.unique(radii, return_inverse=True)
+        sprites, offsets = zip(*(self._sprite(colors, radius) for radius in unique_radii.tolist()))
+        radius_idx = radius_idx.reshape(-1)
+        rects = np.empty((len(radii), 4), dtype=int)
+        # pygame.draw.circle truncates the center coordinates toward zero
+        rects[:, :2] = positions.astype(int) - np.asarray(offsets)[radius_idx, np.newaxis]
+        rects[:, 2:] = 2 * np.asarray(offsets)[radius_idx, np.newaxis] + 1
+        sprite_keys = np.array([id(sprite) for sprite in sprites])[radius_idx]
+        return [sprites[idx] for idx in radius_idx.tolist()], rects, sprite_keys
+
+    def _font(self) -> pygame.font.Font:
+        if self._hud_font is None:
+            font_face = self._hud_config.font_face
+            if font_face is None:
+                font_face = monospaced_font_face()
+            self._hud_font = pygame.font.Font(font_face, self._hud_config.font_size)
+        return self._hud_font
+
+    def _hud_layout(self, hud_texts: Sequence[str]) -> List[Tuple[str, Tuple[int, int, int, int]]]:
+        """Return the lines of the HUD with their (x, y, width, height) rectangles
+
+        The lines are only measured here; rendering them is left to the "hud" phase."""
+        if not hud_texts:
+            return []
+        font = self._font()
+        layout = []
         for idx, line in enumerate(hud_texts):
-            x = self._hud_config.text_origin.x
-            y = self._hud_config.text_origin.y
+            x = int(self._hud_config.text_origin.x)
+            y = int(self._hud_config.text_origin.y)
             y += idx * (self._hud_config.font_size + self._hud_config.text_line_gap)
-            text_surface = self._hud_font.render(line, True, self._hud_config.font_color, None)
+            width, height = font.size(line)
+            layout.append((line, (x, y, width, height)))
+        return layout
+
+    def _draw_hud(self, hud_layout: List[Tuple[str, Tuple[int, int, int, int]]]):
+        if not hud_layout:
+            return
+        font = self._font()
+        for line, (x, y, _, _) in hud_layout:
+            text_surface = font.render(line, True, self._hud_config.font_color, None)
             self._surface.blit(text_surface, (x, y))
 
     def tick(self, simulator: Simulator, hud_texts: Sequence[str]):
-        if simulator.collision():
-            traveler_color = self._config.traveler_collision_color
+        swarm = simulator.swarm
+        self._render(
+            swarm.positions,
+            swarm.radii,
+            simulator.traveler_positions(),
+            np.array([traveler.collider.radius for traveler in simulator.travelers]),
+            simulator.collision_snapshot.colliding_idx,
+            simulator.collision_snapshot.colliding_travelers,
+            hud_texts,
+        )
+
+    def replay_tick(self, frame: RecordedFrame, hud_texts: Sequence[str]):
+        """Like tick, from a frame of a recording instead of a simulator"""
+        self._render(
+            frame.hornet_positions,
+            frame.hornet_radii,
+            frame.traveler_positions,
+            frame.traveler_radii,
+            frame.colliding_idx,
+            frame.colliding_travelers,
+            hud_texts,
+        )
+
+    def _render(
+        self,
+        hornet_positions: np.ndarray,
+        hornet_radii: np.ndarray,
+        traveler_positions: np.ndarray,
+        traveler_radii: np.ndarray,
+        colliding_idx: np.ndarray,
+        colliding_travelers: np.ndarray,
+        hud_texts: Sequence[str],
+    ):
+        # pylint: disable=too-many-arguments
+        # pylint: disable=too-many-positional-arguments
+        timer = self._phase_timer
+        if timer is not None:
+            timer.start()
+        density = None
+        if len(hornet_radii) > self._config.heatmap_hornet_count:
+            # more hornets than can be told apart: only the colliding ones are drawn as circles
+            density = hornet_positions
+            hornet_positions, hornet_radii = (
+                hornet_positions[colliding_idx],
+                hornet_radii[colliding_idx],
+            )
+        # travelers first, then hornets (drawn over them)
+        placements = [
+            self._placements(
+                traveler_positions[idx : idx + 1],
+                traveler_radii[idx : idx + 1],
+                self._palette.traveler_collision if colliding else self._palette.traveler,
+            )
+            for idx, colliding in enumerate(colliding_travelers.tolist())
+        ]
+        placements.append(self._placements(hornet_positions, hornet_radii, self._palette.hornet))
+        sprites = [sprite for placement in placements for sprite in placement[0]]
+        rects = np.concatenate([placement[1] for placement in placements])
+        hud_layout = self._hud_layout(hud_texts)
+        dirty = self._dirty(placements, hud_layout, heatmap=density is not None)
+        if timer is not None:
+            timer.lap("layout")
+        if dirty is None:
+            self._draw(sprites, rects, hud_layout, density)
+        else:
+            self._draw_dirty(sprites, rects, hud_layout, dirty)
+        self._time_ms += self._clock.tick(self._config.frame_rate)
+        if timer is not None:
+            timer.lap("frame wait")  # for the frame rate
+
+    def _dirty(
+        self,
+        placements: List[Tuple[List[pygame.Surface], np.ndarray, np.ndarray]],
+        hud_layout: List[Tuple[str, Tuple[int, int, int, int]]],
+        heatmap: bool,
+    ) -> Optional[np.ndarray]:
+        """Return the dirty rectangles of the frame, or None to redraw it as a whole"""
+        if self._dirty_rects is None:
+            return None
+        if heatmap:
+            self._dirty_rects.reset()  # the heatmap is redrawn as a whole
+            return None
+        hud_rects = [rect for _, rect in hud_layout]
+        return self._dirty_rects.update(
+            np.concatenate([placement[1] for placement in placements]),
+            np.concatenate([placement[2] for placement in placements]),
+            np.array(hud_rects, dtype=int).reshape(-1, 4),
+        )
+
+    def _draw(
+        self,
+        sprites: List[pygame.Surface],
+        rects: np.ndarray,
+        hud_layout: List[Tuple[str, Tuple[int, int, int, int]]],
+        density: Optional[np.ndarray] = None,
+    ):
+        """Redraw the whole frame, over the heatmap of the density positions if any"""
+        timer = self._phase_timer
+        if density is None:
+            self._surface.fill(self._palette.surface)
         else:
-            traveler_color = self._config.traveler_color
-        self._surface.fill(self._config.surface_color)
-        agents = [simulator.traveler] + simulator.hornets
-        colors = [traveler_color] + len(simulator.hornets) * [self._config.hornet_color]
-        for agent, color in zip(agents, colors):
-            self._draw_agent(agent, color)
-        self._hud_overlay(hud_texts)
+            pygame.surfarray.blit_array(self._surface, self._heatmap.render(density))
+        if timer is not None:
+            timer.lap("clear" if density is None else "heatmap")
+        blit_sequence = [(sprite, (x, y)) for sprite, (x, y) in zip(sprites, rects[:, :2].tolist())]
+        self._surface.blits(blit_sequence, doreturn=False)
+        if timer is not None:
+            timer.lap("draw")
+        self._draw_hud(hud_layout)
+        if timer is not None:
+            timer.lap("hud")
         pygame.display.flip()
-        elapsed_time_ms = self._clock.tick(self._config.frame_rate)
-        self._time_ms += elapsed_time_ms
+        if timer is not None:
+            timer.lap("flip")
+
+    def _draw_dirty(
+        self,
+        sprites: List[pygame.Surface],
+        rects: np.ndarray,
+        hud_layout: List[Tuple[str, Tuple[int, int, int, int]]],
+        dirty: np.ndarray,
+    ):
+        timer = self._phase_timer
+        dirty = clip_rects(dirty, self._surface.get_size())
+        dirty_rects = [pygame.Rect(rect) for rect in dirty.tolist()]
+        for rect in dirty_rects:
+            self._surface.fill(self._palette.surface, rect)
+        if timer is not None:
+            timer.lap("clear")
+        sprite_idx, parts = DirtyRects.redraws(rects, dirty)
+        areas = parts.copy()
+        areas[:, :2] -= rects[sprite_idx, :2]
+        blit_sequence = [
+            (sprites[idx], (x, y), area)
+            for idx, (x, y), area in zip(sprite_idx.tolist(), parts[:, :2].tolist(), areas.tolist())
+        ]
+        self._surface.blits(blit_sequence, doreturn=False)
+        if timer is not None:
+            timer.lap("draw")
+        self._draw_hud(hud_layout)
+        if timer is not None:
+            timer.lap("hud")
+        pygame.display.update(dirty_rects)
+        if timer is not None:
+            timer.lap("flip")
 
     def save_to_file(self, file_path: str):
         pygame.image.save(self._surface, file_path)
 
+    def frame(self) -> np.ndarray:
+        """Return a (height, width, 3) RGB copy of the pixels of the last rendered frame"""
+        width, height = self._surface.get_size()
+        pixels = pygame.image.tobytes(self._surface, "RGB")
+        return np.frombuffer(pixels, dtype=np.uint8).reshape(height, width, 3)
+
     @staticmethod
     def from_cli_arguments(args: argparse.Namespace) -> "Visualizer":
         config = VisualizerConfig(
@@ -101,10 +325,31 @@ class Visualizer:
             traveler_color=COLORS[args.traveler_color],
             traveler_collision_color=COLORS[args.traveler_collision_color],
             frame_rate=args.frame_rate,
+            dirty_rects=args.dirty_rects,
+            heatmap_hornet_count=args.heatmap_hornet_count,
         )
         return Visualizer(surface_size=args.field_size, config=config)
 
 
+def replay_commands() -> List[str]:
+    """Return the replay commands given since the last call, among "quit" (display closed or
+    escape key), "pause" (space key), "backward" and "forward" (left and right arrow keys)"""
+    # pylint: disable=no-member
+    keys = {
+        pygame.K_ESCAPE: "quit",
+        pygame.K_SPACE: "pause",
+        pygame.K_LEFT: "backward",
+        pygame.K_RIGHT: "forward",
+    }
+    commands = []
+    for event in pygame.event.get():
+        if event.type == pygame.QUIT:
+            commands.append("quit")
+        elif event.type == pygame.KEYDOWN and event.key in keys:
+            commands.append(keys[event.key])
+    return commands
+
+
 def pygame_quit() -> bool:
     """Return True if a pygame.QUIT event occurred.
     pygame.QUIT: e.g. when user closes the display window."""